@@ -33,6 +33,18 @@ class PricesRefreshRequest(ApiModel):
         return value
 
 
+class PricesRangePrefetchRequest(ApiModel):
+    start: str
+    end: str
+    force_refresh: bool = False
+
+    @field_validator("start", "end")
+    @classmethod
+    def validate_date(cls, value: str):
+        datetime.strptime(value, "%Y-%m-%d")
+        return value
+
+
 class CacheInvalidateRequest(ApiModel):
     domain: Literal["prices", "consumption", "export", "pnd", "all"]
     date: str | None = None
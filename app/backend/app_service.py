@@ -3,6 +3,8 @@ import os
 import asyncio
 import atexit
 import copy
+import hashlib
+import json
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from fastapi import Body, HTTPException, Query
@@ -28,10 +30,13 @@ import threading
 # New modules
 from config_loader import (
     load_config,
+    invalidate_config_snapshot,
+    get_config_snapshot_stats,
     save_options_sync,
     save_fee_history,
     ensure_fee_history,
     get_fee_snapshot_for_date,
+    get_fee_snapshot_key,
     resolve_config_and_timezone,
     update_fees_history_logic,
     get_influx_cfg,
@@ -46,16 +51,21 @@ from config_loader import (
     has_pnd_required_cfg,
 )
 from services.runtime_state import RuntimeState
-from services.cache_manager import SeriesCache, build_series_cache_key
+from services.cache_manager import BoundedLRUCache, SeriesCache, build_series_cache_key
 from services.price_fetcher import (
     get_prices_for_date,
     build_price_map_for_date,
+    build_price_vector_for_date,
     get_spot_prices,
     apply_fee_snapshot,
     PRICES_CACHE,
     PRICES_CACHE_PROVIDER,
     get_ote_backoff_remaining_seconds,
     is_ote_unavailable,
+    prefetch_price_range,
+    PRICE_RANGE_MAX_DAYS,
+    configure_fx_rate_store,
+    get_fx_rate_store,
 )
 
 from services.battery_projection import (
@@ -95,21 +105,23 @@ from services.invoice_archive_service import InvoiceArchiveService
 from services.supervisor_service import SupervisorService, SupervisorSyncError
 
 # Re-exporting injected services (for main.py and others)
-from services.influx_service import InfluxService
+from services.influx_service import AsyncInfluxService, InfluxService
 from services.home_assistant_service import HomeAssistantService
 from services.hp_service import HPService
 from services.prices_service import PricesService
 from services.costs_service import CostsService
 from services.export_service import ExportService
 from services.billing_service import BillingService
+from services.day_ledger import DayLedger
 from services.battery_service import BatteryService
 from services.insights_service import InsightsService
 from services.schedule_service import ScheduleService
 from services.alerts_service import AlertsService
 from services.comparison_service import ComparisonService
 from services.solar_service import SolarService
-from services.data_export_service import DataExportService
+from services.data_export_service import DataExportService, month_range
 from services.recommendation_service import RecommendationService
+from services.request_memo import ACTIVE_REQUEST_MEMO, RequestMemo, memoize_in_request, memoize_in_request_async
 from services.solar_overview_service import SolarOverviewService
 
 logger = logging.getLogger("uvicorn.error")
@@ -125,12 +137,14 @@ EXPORT_CACHE_DIR = None
 PND_CACHE_DIR = None
 DIP_CACHE_DIR = None
 INVOICES_DIR = None
+DAY_LEDGER_DIR = None
 OPTIONS_BACKUP_FILE = None
 FEES_HISTORY_FILE = None
 
 # Shared State
 RUNTIME_STATE = RuntimeState()
 INFLUX_SERVICE = InfluxService(logger=logger)
+ASYNC_INFLUX_SERVICE = AsyncInfluxService(INFLUX_SERVICE)
 HOME_ASSISTANT_SERVICE = HomeAssistantService(logger=logger)
 SUPERVISOR_SERVICE = SupervisorService(logger=logger)
 
@@ -140,6 +154,10 @@ EXPORT_CACHE: Optional[SeriesCache] = None
 PND_SERVICE: Optional[PNDService] = None
 DIP_SERVICE: Optional[DIPService] = None
 INVOICE_ARCHIVE_SERVICE: Optional[InvoiceArchiveService] = None
+DAY_LEDGER: Optional[DayLedger] = None
+# (date, kind, PND day checksum, timezone) -> converted points; two kinds for a bit over a year of days.
+PND_POINTS_CACHE_MAX_ENTRIES = 800
+PND_POINTS_CACHE = BoundedLRUCache(PND_POINTS_CACHE_MAX_ENTRIES)
 
 # --- Price Cache Helpers ---
 def load_prices_cache(date_str):
@@ -263,6 +281,16 @@ def load_consumption_cache(date_str, key):
         return CONSUMPTION_CACHE.load(date_str, key)
     return None, None, None
 
+def load_consumption_cache_range(start_date, end_date, key, is_usable=None):
+    if CONSUMPTION_CACHE:
+        return CONSUMPTION_CACHE.load_range(start_date, end_date, key, is_usable=is_usable)
+    return {}, _date_strings_between(start_date, end_date)
+
+def save_consumption_cache_range(payloads, key):
+    if CONSUMPTION_CACHE:
+        return CONSUMPTION_CACHE.save_range(payloads, key)
+    return []
+
 def save_export_cache(date_str, key, data):
     if EXPORT_CACHE:
         EXPORT_CACHE.save(date_str, key, data)
@@ -272,6 +300,24 @@ def load_export_cache(date_str, key):
         return EXPORT_CACHE.load(date_str, key)
     return None, None, None
 
+def load_export_cache_range(start_date, end_date, key, is_usable=None):
+    if EXPORT_CACHE:
+        return EXPORT_CACHE.load_range(start_date, end_date, key, is_usable=is_usable)
+    return {}, _date_strings_between(start_date, end_date)
+
+def save_export_cache_range(payloads, key):
+    if EXPORT_CACHE:
+        return EXPORT_CACHE.save_range(payloads, key)
+    return []
+
+def _date_strings_between(start_date, end_date):
+    days = []
+    day = start_date
+    while day <= end_date:
+        days.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return days
+
 def get_prefetch_lock_path_legacy(storage_dir=None):
     from services.scheduler import get_prefetch_lock_path as scheduler_get_path
     return scheduler_get_path(storage_dir or STORAGE_DIR)
@@ -353,8 +399,18 @@ def _pnd_to_points(day_payload: dict, tzinfo, *, kind: str) -> dict:
 
 def _pnd_day_points(cfg, date: str, *, kind: str) -> dict | None:
     """Return PND-backed points for a finalized day, or None if PND has no data."""
-    if PND_SERVICE is None or not PND_SERVICE.has_day(date):
+    if PND_SERVICE is None:
         return None
+    stamp = PND_SERVICE.get_day_stamp(date)
+    if not stamp or not stamp.get("intervals"):
+        return None
+    # Read timezone directly from cfg — get_influx_cfg is strict about
+    # requiring host/port/… and may raise; PND override doesn't need influx.
+    tz_name = cfg.get("influxdb", {}).get("timezone", "Europe/Prague")
+    cache_key = (date, kind, stamp.get("sha1"), tz_name)
+    cached = PND_POINTS_CACHE.get(cache_key)
+    if cached is not None:
+        return dict(cached)
     try:
         result = PND_SERVICE.get_data(date, date)
     except Exception as exc:  # noqa: BLE001 - PND is best-effort; fall back to Influx
@@ -367,11 +423,23 @@ def _pnd_day_points(cfg, date: str, *, kind: str) -> dict | None:
     intervals = day.get("intervals")
     if not intervals:
         return None
-    # Read timezone directly from cfg — get_influx_cfg is strict about
-    # requiring host/port/… and may raise; PND override doesn't need influx.
-    tz_name = cfg.get("influxdb", {}).get("timezone", "Europe/Prague")
-    tzinfo = get_local_tz(tz_name)
-    return _pnd_to_points(day, tzinfo, kind=kind)
+    points = _pnd_to_points(day, get_local_tz(tz_name), kind=kind)
+    PND_POINTS_CACHE[cache_key] = points
+    return dict(points)
+
+
+class LegacyConsumptionCacheProxy:
+    def load(self, d, k): return load_consumption_cache(d, k)
+    def save(self, d, k, v): return save_consumption_cache(d, k, v)
+    def load_range(self, s, e, k, is_usable=None): return load_consumption_cache_range(s, e, k, is_usable)
+    def save_range(self, p, k): return save_consumption_cache_range(p, k)
+
+
+class LegacyExportCacheProxy:
+    def load(self, d, k): return load_export_cache(d, k)
+    def save(self, d, k, v): return save_export_cache(d, k, v)
+    def load_range(self, s, e, k, is_usable=None): return load_export_cache_range(s, e, k, is_usable)
+    def save_range(self, p, k): return save_export_cache_range(p, k)
 
 
 def get_consumption_points(cfg, date=None, start=None, end=None, cache_ttl=600):
@@ -383,11 +451,19 @@ def get_consumption_points(cfg, date=None, start=None, end=None, cache_ttl=600):
             return pnd_points
     from services.consumption_service import get_consumption_points as gcp
     import sys
-    class LegacyConsumptionCacheProxy:
-        def load(self, d, k): return load_consumption_cache(d, k)
-        def save(self, d, k, v): return save_consumption_cache(d, k, v)
     return gcp(cfg, sys.modules[__name__], LegacyConsumptionCacheProxy(), get_influx_cfg, get_local_tz, date, start, end, cache_ttl)
 
+async def get_consumption_points_async(cfg, date=None, start=None, end=None, cache_ttl=600):
+    if date and not start and not end:
+        # PND lookup reads the day store from disk, keep it off the event loop
+        pnd_points = await asyncio.to_thread(_pnd_day_points, cfg, date, kind="consumption")
+        if pnd_points is not None:
+            return pnd_points
+    from services.consumption_service import get_consumption_points_async as gcp_async
+    return await gcp_async(
+        cfg, ASYNC_INFLUX_SERVICE, LegacyConsumptionCacheProxy(), get_influx_cfg, get_local_tz, date, start, end, cache_ttl
+    )
+
 def get_export_points(cfg, date=None, start=None, end=None, cache_ttl=600):
     # PND override: finalized grid-export readings replace live Influx for past days.
     if date and not start and not end:
@@ -396,31 +472,99 @@ def get_export_points(cfg, date=None, start=None, end=None, cache_ttl=600):
             return pnd_points
     from services.consumption_service import get_export_points as gep
     import sys
-    class LegacyExportCacheProxy:
-        def load(self, d, k): return load_export_cache(d, k)
-        def save(self, d, k, v): return save_export_cache(d, k, v)
     return gep(cfg, sys.modules[__name__], LegacyExportCacheProxy(), get_influx_cfg, get_local_tz, get_export_entity_id, date, start, end, cache_ttl)
 
+async def get_export_points_async(cfg, date=None, start=None, end=None, cache_ttl=600):
+    if date and not start and not end:
+        pnd_points = await asyncio.to_thread(_pnd_day_points, cfg, date, kind="export")
+        if pnd_points is not None:
+            return pnd_points
+    from services.consumption_service import get_export_points_async as gep_async
+    return await gep_async(
+        cfg, ASYNC_INFLUX_SERVICE, LegacyExportCacheProxy(), get_influx_cfg, get_local_tz, get_export_entity_id,
+        date, start, end, cache_ttl,
+    )
+
+def prefetch_series_range(cfg, start_date, end_date, cache_ttl=600, kinds=("consumption", "export")):
+    """Warm consumption/export day caches for a date range with one Influx query per entity.
+
+    With "prices" in kinds, uncached historical prices are filled per month via prefetch_price_range.
+    Returns ``{"consumption": {date: points}, "export": {date: points}}`` with the day results the
+    range scan already loaded; PND-covered days are left to the per-day path.
+    """
+    from services.consumption_service import prefetch_series_range as psr
+    import sys
+
+    def skip_pnd_day(date_str):
+        return PND_SERVICE is not None and PND_SERVICE.has_day(date_str)
+
+    influx_module = sys.modules[__name__]
+    loaded = {}
+    if "prices" in kinds:
+        _, tzinfo = resolve_config_and_timezone(cfg)
+        PRICES_SERVICE.prefetch_price_range(
+            start=start_date.isoformat(), end=end_date.isoformat(), cfg=cfg, tzinfo=tzinfo
+        )
+    if "consumption" in kinds:
+        loaded["consumption"] = psr(
+            cfg, influx_module, LegacyConsumptionCacheProxy(), get_influx_cfg, get_local_tz,
+            get_influx_cfg(cfg).get("entity_id"), start_date, end_date,
+            label="consumption", cache_ttl=cache_ttl, skip_date_fn=skip_pnd_day,
+        )
+    export_entity_id = get_export_entity_id(cfg) if "export" in kinds else None
+    if export_entity_id:
+        loaded["export"] = psr(
+            cfg, influx_module, LegacyExportCacheProxy(), get_influx_cfg, get_local_tz,
+            export_entity_id, start_date, end_date,
+            label="export", cache_ttl=cache_ttl, skip_date_fn=skip_pnd_day,
+        )
+    return loaded
+
 # --- Service Instances ---
 PRICES_SERVICE = PricesService(
-    get_prices_for_date=lambda cfg, d, tz, force_refresh=False, include_neighbor_live=False: get_prices_for_date(
-        cfg, d, tz, 
-        force_refresh=force_refresh, 
-        include_neighbor_live=include_neighbor_live, 
-        load_prices_cache_fn=load_prices_cache, 
-        save_prices_cache_fn=save_prices_cache, 
-        get_cached_price_provider_fn=get_cached_price_provider, 
-        get_fee_snapshot_for_date_fn=get_fee_snapshot_for_date
+    get_prices_for_date=lambda cfg, d, tz, force_refresh=False, include_neighbor_live=False: (
+        get_prices_for_date(
+            cfg, d, tz,
+            force_refresh=force_refresh,
+            include_neighbor_live=include_neighbor_live,
+            load_prices_cache_fn=load_prices_cache,
+            save_prices_cache_fn=save_prices_cache,
+            get_cached_price_provider_fn=get_cached_price_provider,
+            get_fee_snapshot_for_date_fn=get_fee_snapshot_for_date,
+            get_fee_snapshot_key_fn=get_fee_snapshot_key,
+        )
+        if force_refresh
+        else memoize_in_request(
+            ("prices_for_date", d, include_neighbor_live),
+            lambda: get_prices_for_date(
+                cfg, d, tz,
+                include_neighbor_live=include_neighbor_live,
+                load_prices_cache_fn=load_prices_cache,
+                save_prices_cache_fn=save_prices_cache,
+                get_cached_price_provider_fn=get_cached_price_provider,
+                get_fee_snapshot_for_date_fn=get_fee_snapshot_for_date,
+                get_fee_snapshot_key_fn=get_fee_snapshot_key,
+            ),
+        )
     ),
     get_price_provider=get_price_provider,
     clear_prices_cache_for_date=clear_prices_cache_for_date,
+    prefetch_price_range=lambda cfg, start_date, end_date, tz, force_refresh=False: prefetch_price_range(
+        cfg, start_date, end_date, tz,
+        force_refresh=force_refresh,
+        load_prices_cache_fn=load_prices_cache,
+        save_prices_cache_fn=save_prices_cache,
+        get_cached_price_provider_fn=get_cached_price_provider,
+        get_fee_snapshot_for_date_fn=get_fee_snapshot_for_date,
+    ),
+    max_range_days=PRICE_RANGE_MAX_DAYS,
 )
 
 COSTS_SERVICE = CostsService(
     get_consumption_points=lambda cfg, date=None, start=None, end=None: get_consumption_points(
         cfg, date=date, start=start, end=end
     ),
-    build_price_map_for_date=lambda cfg, d, tz: build_price_map_for_date(
+    build_price_map_for_date=lambda cfg, d, tz: build_price_vector_for_date(
         cfg, d, tz, PRICES_SERVICE.get_prices
     ),
 )
@@ -429,13 +573,34 @@ EXPORT_SERVICE = ExportService(
     get_export_points=lambda cfg, date=None, start=None, end=None: get_export_points(
         cfg, date=date, start=start, end=end
     ),
-    build_price_map_for_date=lambda cfg, d, tz: build_price_map_for_date(
+    build_price_map_for_date=lambda cfg, d, tz: build_price_vector_for_date(
         cfg, d, tz, PRICES_SERVICE.get_prices
     ),
     get_fee_snapshot_for_date=get_fee_snapshot_for_date,
     calculate_sell_coefficient=calculate_sell_coefficient,
 )
 
+def get_day_ledger_signature(cfg, date_str, tzinfo):
+    """Everything a finalized day's billing aggregates depend on, hashed; None disables the ledger."""
+    try:
+        influx = get_influx_cfg(cfg)
+    except HTTPException:
+        return None
+    export_entity_id = get_export_entity_id(cfg)
+    fee_snapshot = get_fee_snapshot_for_date(cfg, date_str, tzinfo)
+    pnd_stamp = PND_SERVICE.get_day_stamp(date_str) if PND_SERVICE is not None else None
+    parts = {
+        "consumption": build_series_cache_key(influx, influx.get("entity_id")),
+        "export": build_series_cache_key(influx, export_entity_id) if export_entity_id else None,
+        "provider": get_price_provider(cfg),
+        "tarif": cfg.get("tarif", {}),
+        "fees": fee_snapshot,
+        "sell_coefficient": calculate_sell_coefficient(cfg, fee_snapshot),
+        "pnd_enabled": bool((cfg.get("pnd") or {}).get("enabled")),
+        "pnd": pnd_stamp,
+    }
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
 BILLING_SERVICE = BillingService(
     get_consumption_points=lambda cfg, date=None, start=None, end=None: get_consumption_points(
         cfg, date=date, start=start, end=end
@@ -443,19 +608,24 @@ BILLING_SERVICE = BillingService(
     get_export_points=lambda cfg, date=None, start=None, end=None: get_export_points(
         cfg, date=date, start=start, end=end
     ),
-    build_price_map_for_date=lambda cfg, d, tz: build_price_map_for_date(
+    build_price_map_for_date=lambda cfg, d, tz: build_price_vector_for_date(
         cfg, d, tz, PRICES_SERVICE.get_prices
     ),
     get_export_entity_id=get_export_entity_id,
     get_fee_snapshot_for_date=get_fee_snapshot_for_date,
     calculate_sell_coefficient=calculate_sell_coefficient,
     compute_fixed_breakdown_for_day=compute_fixed_breakdown_for_day,
+    prefetch_series_range=lambda cfg, start_date, end_date: prefetch_series_range(
+        cfg, start_date, end_date, kinds=("prices", "consumption", "export")
+    ),
     get_influx_cfg=get_influx_cfg,
     get_energy_entities_cfg=get_energy_entities_cfg,
     parse_influx_interval_to_minutes=parse_influx_interval_to_minutes,
     query_entity_series=INFLUX_SERVICE.query_entity_series,
     aggregate_power_points=aggregate_power_points,
     logger=logger,
+    get_day_ledger=lambda: DAY_LEDGER,
+    get_day_ledger_signature=get_day_ledger_signature,
 )
 
 BATTERY_SERVICE = BatteryService(
@@ -480,6 +650,10 @@ BATTERY_SERVICE = BatteryService(
     ),
     iso_to_display_hhmm=iso_to_display_hhmm,
     logger=logger,
+    query_last_values=INFLUX_SERVICE.safe_query_last_values,
+    query_entity_series_async=ASYNC_INFLUX_SERVICE.query_entity_series,
+    query_last_values_async=ASYNC_INFLUX_SERVICE.safe_query_last_values,
+    query_recent_slot_profile_by_day_type_async=ASYNC_INFLUX_SERVICE.query_recent_slot_profile_by_day_type,
 )
 
 INSIGHTS_SERVICE = InsightsService(
@@ -500,6 +674,7 @@ INSIGHTS_SERVICE = InsightsService(
     ),
     aggregate_hourly_from_kwh_points=aggregate_hourly_from_kwh_points,
     logger=logger,
+    prefetch_series_range=prefetch_series_range,
 )
 
 SCHEDULE_SERVICE = ScheduleService(get_prices_for_date=PRICES_SERVICE.get_prices)
@@ -572,6 +747,7 @@ def save_config(new_config: dict = Body(...)):
     import yaml
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
         yaml.safe_dump(new_config, f, allow_unicode=True)
+    invalidate_config_snapshot()
     option_sync = save_options_sync(supervisor_options)
     try:
         supervisor_sync = SUPERVISOR_SERVICE.sync_addon_options(supervisor_options)
@@ -624,7 +800,7 @@ def update_fees_history(payload: dict = Body(...), cfg=None, tzinfo=None):
     return {"history": normalized}
 
 def finalize_initialization():
-    global CONSUMPTION_CACHE, EXPORT_CACHE, PND_SERVICE, DIP_SERVICE, INVOICE_ARCHIVE_SERVICE
+    global CONSUMPTION_CACHE, EXPORT_CACHE, PND_SERVICE, DIP_SERVICE, INVOICE_ARCHIVE_SERVICE, DAY_LEDGER
     if CONSUMPTION_CACHE_DIR:
         CONSUMPTION_CACHE = SeriesCache("consumption", CONSUMPTION_CACHE_DIR, 600)
     if EXPORT_CACHE_DIR:
@@ -635,6 +811,10 @@ def finalize_initialization():
         DIP_SERVICE = DIPService(DIP_CACHE_DIR, logger=logger)
     if INVOICES_DIR:
         INVOICE_ARCHIVE_SERVICE = InvoiceArchiveService(INVOICES_DIR)
+    if DAY_LEDGER_DIR:
+        DAY_LEDGER = DayLedger(DAY_LEDGER_DIR)
+    if CACHE_DIR:
+        configure_fx_rate_store(CACHE_DIR / "fx-rates.json")
 
 def get_cache_status():
     return {
@@ -643,6 +823,8 @@ def get_cache_status():
         "export": EXPORT_CACHE.get_status() if EXPORT_CACHE else {},
         "pnd": PND_SERVICE.get_cache_status() if PND_SERVICE else {},
         "dip": DIP_SERVICE.get_status(load_config()) if DIP_SERVICE else {},
+        "day_ledger": DAY_LEDGER.get_status() if DAY_LEDGER else {},
+        "fx_rates": get_fx_rate_store().get_status(),
     }
 
 def invalidate_cache(domain: str, date: str | None = None):
@@ -680,9 +862,15 @@ def invalidate_cache(domain: str, date: str | None = None):
         remove_path(CONSUMPTION_CACHE_DIR / f"consumption-{date}.json") if date else remove_dir_files(CONSUMPTION_CACHE_DIR, "consumption-*.json")
     if "export" in domains and EXPORT_CACHE_DIR:
         remove_path(EXPORT_CACHE_DIR / f"export-{date}.json") if date else remove_dir_files(EXPORT_CACHE_DIR, "export-*.json")
+    if DAY_LEDGER is not None and domains & {"prices", "consumption", "export", "pnd"}:
+        # Aggregates derived from the removed series must be rebuilt too.
+        DAY_LEDGER.invalidate(date)
+    if "pnd" in domains:
+        PND_POINTS_CACHE.clear()
     if "pnd" in domains and PND_SERVICE:
         if date:
-            remove_path(PND_SERVICE.normalized_dir / f"{date}.json")
+            if PND_SERVICE.remove_day(date):
+                removed.append(f"pnd:{date}")
         else:
             purge = PND_SERVICE.purge_cache()
             return {"ok": True, "domain": domain, "date": date, "removed": removed, "pnd": purge}
@@ -712,6 +900,7 @@ def get_diagnostics(cfg=None):
             "prefetch_scheduler_running": bool(RUNTIME_STATE.prefetch_thread and RUNTIME_STATE.prefetch_thread.is_alive()),
             "pnd_scheduler_running": bool(RUNTIME_STATE.pnd_thread and RUNTIME_STATE.pnd_thread.is_alive()),
             "dip_scheduler_running": bool(RUNTIME_STATE.dip_thread and RUNTIME_STATE.dip_thread.is_alive()),
+            "config_snapshot": get_config_snapshot_stats(),
         },
         "pnd": get_pnd_status(cfg=cfg) if PND_SERVICE else {"enabled": False, "configured": False},
     }
@@ -720,13 +909,24 @@ def get_version(): return {"version": APP_VERSION}
 
 def get_prices(date: str = Query(default=None), cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
-    prices = PRICES_SERVICE.get_prices(cfg, date, tzinfo)
+    prices = memoize_in_request(("prices", date), lambda: PRICES_SERVICE.get_prices(cfg, date, tzinfo))
     return {"prices": prices}
 
 def refresh_prices(payload: dict = Body(default=None), cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
     return PRICES_SERVICE.refresh_prices(payload=payload, cfg=cfg, tzinfo=tzinfo)
 
+def prefetch_prices_range(payload: dict = Body(...), cfg=None, tzinfo=None):
+    cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
+    payload = payload or {}
+    return PRICES_SERVICE.prefetch_price_range(
+        start=payload.get("start"),
+        end=payload.get("end"),
+        force_refresh=bool(payload.get("force_refresh")),
+        cfg=cfg,
+        tzinfo=tzinfo,
+    )
+
 def get_consumption(date=None, start=None, end=None, cfg=None):
     cfg, _ = resolve_config_and_timezone(cfg)
     res = get_consumption_points(cfg, INFLUX_SERVICE, CONSUMPTION_CACHE, get_influx_cfg, get_local_tz, date, start, end)
@@ -734,15 +934,60 @@ def get_consumption(date=None, start=None, end=None, cfg=None):
 
 def get_costs(date=None, start=None, end=None, cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
-    return COSTS_SERVICE.get_costs(date=date, start=start, end=end, cfg=cfg, tzinfo=tzinfo)
+    return memoize_in_request(
+        ("costs", date, start, end),
+        lambda: COSTS_SERVICE.get_costs(date=date, start=start, end=end, cfg=cfg, tzinfo=tzinfo),
+    )
+
+async def get_costs_async(date=None, start=None, end=None, cfg=None, tzinfo=None):
+    # load_config čte z disku, proto v threadu
+    cfg, tzinfo = await asyncio.to_thread(resolve_config_and_timezone, cfg, tzinfo)
+
+    async def compute():
+        consumption = await get_consumption_points_async(cfg, date=date, start=start, end=end)
+        # Cenová mapa může sáhnout na síť/disk, proto v threadu
+        return await asyncio.to_thread(
+            COSTS_SERVICE.get_costs,
+            date=date, start=start, end=end, cfg=cfg, tzinfo=tzinfo, consumption=consumption,
+        )
+
+    return await memoize_in_request_async(("costs", date, start, end), compute)
 
 def get_export(date=None, start=None, end=None, cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
-    return EXPORT_SERVICE.get_export(date=date, start=start, end=end, cfg=cfg, tzinfo=tzinfo)
+    return memoize_in_request(
+        ("export", date, start, end),
+        lambda: EXPORT_SERVICE.get_export(date=date, start=start, end=end, cfg=cfg, tzinfo=tzinfo),
+    )
+
+async def get_export_async(date=None, start=None, end=None, cfg=None, tzinfo=None):
+    cfg, tzinfo = await asyncio.to_thread(resolve_config_and_timezone, cfg, tzinfo)
+
+    async def compute():
+        export = await get_export_points_async(cfg, date=date, start=start, end=end)
+        return await asyncio.to_thread(
+            EXPORT_SERVICE.get_export,
+            date=date, start=start, end=end, cfg=cfg, tzinfo=tzinfo, export=export,
+        )
+
+    return await memoize_in_request_async(("export", date, start, end), compute)
 
 def get_battery(date=None, cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
-    return BATTERY_SERVICE.get_battery(date=date, cfg=cfg, tzinfo=tzinfo)
+    return memoize_in_request(
+        ("battery", date),
+        lambda: BATTERY_SERVICE.get_battery(date=date, cfg=cfg, tzinfo=tzinfo),
+    )
+
+async def get_battery_async(date=None, cfg=None, tzinfo=None):
+    cfg, tzinfo = await asyncio.to_thread(resolve_config_and_timezone, cfg, tzinfo)
+    return await memoize_in_request_async(
+        ("battery", date),
+        lambda: BATTERY_SERVICE.get_battery_async(date=date, cfg=cfg, tzinfo=tzinfo),
+    )
+
+async def close_async_clients():
+    await ASYNC_INFLUX_SERVICE.aclose()
 
 def get_energy_balance(period="week", anchor=None, cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
@@ -756,6 +1001,10 @@ def get_schedule(duration=120, count=3, cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
     return SCHEDULE_SERVICE.get_schedule(duration=duration, count=count, cfg=cfg, tzinfo=tzinfo)
 
+def get_schedules(durations, count=3, cfg=None, tzinfo=None):
+    cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
+    return SCHEDULE_SERVICE.get_schedules(durations=durations, count=count, cfg=cfg, tzinfo=tzinfo)
+
 def get_alerts(cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
     return ALERTS_SERVICE.get_dashboard_alerts(cfg, tzinfo, PRICES_SERVICE.get_prices)
@@ -768,7 +1017,7 @@ def get_comparison(date=None, cfg=None, tzinfo=None):
 
 def get_solar_forecast(cfg=None):
     cfg = cfg if isinstance(cfg, dict) else load_config()
-    return SOLAR_SERVICE.get_solar_forecast(cfg)
+    return memoize_in_request(("solar_forecast",), lambda: SOLAR_SERVICE.get_solar_forecast(cfg))
 
 def get_solar_overview(date=None, cfg=None):
     cfg = cfg if isinstance(cfg, dict) else load_config()
@@ -829,13 +1078,15 @@ def get_billing_year(year: int, cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
     return BILLING_SERVICE.get_billing_year(year=year, cfg=cfg, tzinfo=tzinfo)
 
-def export_monthly_csv(month: str, cfg=None, tzinfo=None):
+def export_monthly_csv(month: str, cfg=None, tzinfo=None, to_month: str | None = None):
+    """CSV chunks of the daily overview for month (through to_month when given)."""
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
-    return EXPORT_DATA_SERVICE.generate_monthly_csv(cfg, month, tzinfo)
+    return EXPORT_DATA_SERVICE.iter_monthly_csv(cfg, month_range(month, to_month), tzinfo)
 
-def export_invoice_detail_csv(month: str, kind: str, cfg=None, tzinfo=None):
+def export_invoice_detail_csv(month: str, kind: str, cfg=None, tzinfo=None, to_month: str | None = None):
+    """CSV chunks of invoice interval detail for month (through to_month when given)."""
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
-    return EXPORT_DATA_SERVICE.generate_invoice_detail_csv(cfg, month, tzinfo, kind=kind)
+    return EXPORT_DATA_SERVICE.iter_invoice_detail_csv(cfg, month_range(month, to_month), tzinfo, kind=kind)
 
 
 def get_dip_status(cfg=None):
@@ -954,11 +1205,23 @@ def backfill_pnd(range_name: str, cfg=None, tzinfo=None):
     pnd_cfg = get_pnd_cfg(cfg)
     service = _require_pnd_service()
     try:
-        return service.backfill(pnd_cfg, range_name, tzinfo=tzinfo)
+        # Saved days drop their Influx series caches and converted PND points as each chunk lands.
+        return service.start_backfill(
+            pnd_cfg,
+            range_name,
+            tzinfo=tzinfo,
+            on_days_saved=lambda dates: [_invalidate_series_cache_for_day(date_str) for date_str in dates],
+        )
     except PNDServiceError as exc:
         service.record_error(exc, job_type="backfill", extra={"range": range_name})
         _handle_pnd_error(exc)
 
+def get_pnd_backfill_job(job_id: str):
+    try:
+        return _require_pnd_service().get_backfill_job(job_id)
+    except PNDServiceError as exc:
+        _handle_pnd_error(exc)
+
 def get_pnd_data(from_date: str, to_date: str, cfg=None, tzinfo=None):
     cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
     service = _require_pnd_service()
@@ -998,24 +1261,20 @@ def get_pnd_data(from_date: str, to_date: str, cfg=None, tzinfo=None):
         _handle_pnd_error(exc)
 
 def purge_pnd_cache():
-    return _require_pnd_service().purge_cache()
+    result = _require_pnd_service().purge_cache()
+    PND_POINTS_CACHE.clear()
+    return result
 
-async def get_dashboard_snapshot(date=None, cfg=None, tzinfo=None):
-    cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
-    if not date:
-        date = datetime.now(tzinfo).strftime("%Y-%m-%d")
-    today_str = datetime.now(tzinfo).strftime("%Y-%m-%d")
-    tomorrow_str = (datetime.now(tzinfo) + timedelta(days=1)).strftime("%Y-%m-%d")
-    
-    # Paralelní spuštění všech dashboardových dotazů
+async def _gather_dashboard_tasks(date, today_str, tomorrow_str, cfg, tzinfo):
+    # Paralelní spuštění všech dashboardových dotazů (costs/export/battery běží nativně async nad Influxem)
     tasks = [
         asyncio.to_thread(get_prices, date, cfg, tzinfo),
         asyncio.to_thread(get_prices, None, cfg, tzinfo),
         asyncio.to_thread(get_prices, today_str, cfg, tzinfo),
         asyncio.to_thread(get_prices, tomorrow_str, cfg, tzinfo),
-        asyncio.to_thread(get_costs, date, None, None, cfg, tzinfo),
-        asyncio.to_thread(get_export, date, None, None, cfg, tzinfo),
-        asyncio.to_thread(get_battery, date, cfg, tzinfo),
+        get_costs_async(date, None, None, cfg, tzinfo),
+        get_export_async(date, None, None, cfg, tzinfo),
+        get_battery_async(date, cfg, tzinfo),
         asyncio.to_thread(get_alerts, cfg, tzinfo),
         asyncio.to_thread(get_comparison, date, cfg, tzinfo),
         asyncio.to_thread(get_solar_forecast, cfg),
@@ -1023,9 +1282,22 @@ async def get_dashboard_snapshot(date=None, cfg=None, tzinfo=None):
         asyncio.to_thread(get_diagnostics, cfg),
         asyncio.to_thread(get_solar_overview, date, cfg),
     ]
-    
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+async def get_dashboard_snapshot(date=None, cfg=None, tzinfo=None):
+    cfg, tzinfo = resolve_config_and_timezone(cfg, tzinfo)
+    if not date:
+        date = datetime.now(tzinfo).strftime("%Y-%m-%d")
+    today_str = datetime.now(tzinfo).strftime("%Y-%m-%d")
+    tomorrow_str = (datetime.now(tzinfo) + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    # Sdílený single-flight memo: stejné (funkce, argumenty) se v rámci snapshotu spočítají jen jednou
+    memo_token = ACTIVE_REQUEST_MEMO.set(RequestMemo())
+    try:
+        results = await _gather_dashboard_tasks(date, today_str, tomorrow_str, cfg, tzinfo)
+    finally:
+        ACTIVE_REQUEST_MEMO.reset(memo_token)
+
     # Mapování výsledků (ošetření případných chyb)
     def safe_res(idx, default=None):
         res = results[idx]
@@ -1,6 +1,10 @@
 import os
+import copy
 import json
+import threading
+import time
 import yaml
+from bisect import bisect_right
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -8,6 +12,7 @@ from typing import Any
 from api import get_local_tz
 from pricing import (
     build_fee_snapshot,
+    fee_snapshot_hash,
     normalize_dph_percent,
     normalize_price_provider,
     parse_vt_periods,
@@ -28,6 +33,15 @@ else:
 OPTIONS_BACKUP_FILE = STORAGE_DIR / "options.json"
 FEES_HISTORY_FILE = STORAGE_DIR / "fees-history.json"
 
+# Files modified this recently may still change within the same mtime tick,
+# so a snapshot built from them is not reused (same idea as git's "racy clean").
+CONFIG_SNAPSHOT_RACY_SECONDS = 2.0
+_CONFIG_SNAPSHOT_LOCK = threading.Lock()
+_CONFIG_SNAPSHOT: dict[str, Any] = {"signature": None, "config": None}
+_CONFIG_SNAPSHOT_STATS = {"hits": 0, "misses": 0, "invalidations": 0}
+_FEE_HISTORY_INDEX_LOCK = threading.Lock()
+_FEE_HISTORY_INDEX: dict[str, Any] = {"signature": None, "index": None}
+
 
 def _read_json_file(path: Path) -> dict[str, Any] | None:
     if not path.exists():
@@ -72,6 +86,7 @@ def save_options_sync(options: dict[str, Any]) -> dict[str, bool]:
         if not path:
             continue
         results[str(path)] = _write_json_file(path, options)
+    invalidate_config_snapshot()
     return results
 
 def merge_config(base, override):
@@ -101,78 +116,182 @@ def save_fee_history(history):
         STORAGE_DIR.mkdir(parents=True, exist_ok=True)
     with open(FEES_HISTORY_FILE, "w", encoding="utf-8") as f:
         json.dump(history, f)
+    with _FEE_HISTORY_INDEX_LOCK:
+        _FEE_HISTORY_INDEX["signature"] = _fee_history_signature()
+        _FEE_HISTORY_INDEX["index"] = _build_fee_history_index(history)
 
-def ensure_fee_history(cfg, tzinfo):
-    history = load_fee_history()
-    history.sort(key=lambda x: x.get("effective_from", ""))
+def _parse_history_date(value):
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+def _fee_history_signature():
+    try:
+        stat = os.stat(FEES_HISTORY_FILE)
+    except (OSError, TypeError):
+        return (str(FEES_HISTORY_FILE), None, None)
+    return (str(FEES_HISTORY_FILE), stat.st_mtime_ns, stat.st_size)
+
+def _build_fee_history_index(history):
+    records = sorted(
+        (record for record in history if isinstance(record, dict)),
+        key=lambda x: x.get("effective_from", ""),
+    )
+    entries = []
+    for record in records:
+        record_from = _parse_history_date(record.get("effective_from", ""))
+        if record_from is None:
+            continue
+        entries.append((record_from, _parse_history_date(record.get("effective_to")), record))
+    entries.sort(key=lambda item: item[0])
+    # Snapshots are shared read-only, so each one's hash is computed once here.
+    snapshot_keys = {
+        id(record["snapshot"]): fee_snapshot_hash(record["snapshot"])
+        for record in records
+        if isinstance(record.get("snapshot"), dict)
+    }
+    return {
+        "history": records,
+        "dates": [item[0] for item in entries],
+        "entries": entries,
+        "snapshot_keys": snapshot_keys,
+    }
+
+def _get_fee_history_index():
+    signature = _fee_history_signature()
+    with _FEE_HISTORY_INDEX_LOCK:
+        if _FEE_HISTORY_INDEX["signature"] == signature and _FEE_HISTORY_INDEX["index"] is not None:
+            return _FEE_HISTORY_INDEX["index"]
+    index = _build_fee_history_index(load_fee_history())
+    with _FEE_HISTORY_INDEX_LOCK:
+        _FEE_HISTORY_INDEX["signature"] = signature
+        _FEE_HISTORY_INDEX["index"] = index
+    return index
+
+def _lookup_fee_record(index, target_date):
+    """Return (match, candidate) for target_date: the last record covering it and the last one started."""
+    pos = bisect_right(index["dates"], target_date)
+    if pos == 0:
+        return None, None
+    entries = index["entries"]
+    candidate = entries[pos - 1][2]
+    for record_from, record_to, record in reversed(entries[:pos]):
+        if record_to is None or target_date <= record_to:
+            return record, candidate
+    return None, candidate
+
+def _ensure_fee_history_index(cfg, tzinfo):
+    index = _get_fee_history_index()
     today_date = datetime.now(tzinfo).date()
     today_str = today_date.strftime("%Y-%m-%d")
     snapshot = build_fee_snapshot(cfg)
+    history = [dict(record) for record in index["history"]]
     if not history:
-        history = [{"effective_from": today_str, "snapshot": snapshot}]
-        save_fee_history(history)
-        return history
-    current_record = None
-    for record in history:
-        try:
-            record_from = datetime.strptime(record.get("effective_from", ""), "%Y-%m-%d").date()
-        except ValueError:
-            continue
-        if record_from > today_date:
-            continue
-        record_to = None
-        record_to_str = record.get("effective_to")
-        if record_to_str:
-            try:
-                record_to = datetime.strptime(record_to_str, "%Y-%m-%d").date()
-            except ValueError:
-                record_to = None
-        if record_to and today_date > record_to:
-            continue
-        current_record = record
+        save_fee_history([{"effective_from": today_str, "snapshot": snapshot}])
+        return _get_fee_history_index()
+    current_record, _ = _lookup_fee_record(index, today_date)
     if current_record:
-        if current_record.get("snapshot") != snapshot:
-            current_record["snapshot"] = snapshot
-            save_fee_history(history)
-        return history
-    history.append({"effective_from": today_str, "snapshot": snapshot})
+        if current_record.get("snapshot") == snapshot:
+            return index
+        position = next(i for i, record in enumerate(index["history"]) if record is current_record)
+        history[position]["snapshot"] = snapshot
+    else:
+        history.append({"effective_from": today_str, "snapshot": snapshot})
     save_fee_history(history)
-    return history
+    return _get_fee_history_index()
+
+def ensure_fee_history(cfg, tzinfo):
+    index = _ensure_fee_history_index(cfg, tzinfo)
+    return copy.deepcopy(index["history"])
 
 def get_fee_snapshot_for_date(cfg, date_str, tzinfo):
-    history = ensure_fee_history(cfg, tzinfo)
+    """Resolve the fee snapshot effective on date_str via the in-memory fee-history index.
+
+    The returned snapshot is shared with the index and must be treated as read-only.
+    """
+    index = _ensure_fee_history_index(cfg, tzinfo)
+    history = index["history"]
     if not history:
         return build_fee_snapshot(cfg)
-    try:
-        target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-    except ValueError:
+    target_date = _parse_history_date(date_str)
+    if target_date is None:
         return history[-1].get("snapshot", build_fee_snapshot(cfg))
-    candidate = None
-    match = None
-    for record in history:
-        try:
-            record_date = datetime.strptime(record.get("effective_from", ""), "%Y-%m-%d").date()
-        except ValueError:
-            continue
-        if record_date > target_date:
-            break
-        candidate = record
-        record_to = None
-        record_to_str = record.get("effective_to")
-        if record_to_str:
-            try:
-                record_to = datetime.strptime(record_to_str, "%Y-%m-%d").date()
-            except ValueError:
-                record_to = None
-        if record_to is None or target_date <= record_to:
-            match = record
+    match, candidate = _lookup_fee_record(index, target_date)
     if match:
         return match.get("snapshot", build_fee_snapshot(cfg))
     if candidate:
         return candidate.get("snapshot", build_fee_snapshot(cfg))
     return history[0].get("snapshot", build_fee_snapshot(cfg))
 
+def get_fee_snapshot_key(snapshot):
+    """Cache-key hash of a fee snapshot; precomputed for snapshots from get_fee_snapshot_for_date."""
+    with _FEE_HISTORY_INDEX_LOCK:
+        index = _FEE_HISTORY_INDEX["index"]
+    if index is not None:
+        key = index["snapshot_keys"].get(id(snapshot))
+        if key is not None:
+            return key
+    return fee_snapshot_hash(snapshot)
+
+def _config_sources_signature() -> tuple:
+    signature = []
+    for path in (CONFIG_FILE, HA_OPTIONS_FILE, OPTIONS_BACKUP_FILE):
+        try:
+            stat = os.stat(path)
+        except (OSError, TypeError):
+            signature.append((str(path), None, None))
+            continue
+        signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _is_signature_settled(signature: tuple, now: float) -> bool:
+    threshold_ns = int((now - CONFIG_SNAPSHOT_RACY_SECONDS) * 1_000_000_000)
+    return all(mtime_ns is None or mtime_ns < threshold_ns for _, mtime_ns, _ in signature)
+
+
+def invalidate_config_snapshot() -> None:
+    with _CONFIG_SNAPSHOT_LOCK:
+        _CONFIG_SNAPSHOT["signature"] = None
+        _CONFIG_SNAPSHOT["config"] = None
+        _CONFIG_SNAPSHOT_STATS["invalidations"] += 1
+
+
+def get_config_snapshot_stats() -> dict[str, Any]:
+    with _CONFIG_SNAPSHOT_LOCK:
+        stats = dict(_CONFIG_SNAPSHOT_STATS)
+        stats["cached"] = _CONFIG_SNAPSHOT["signature"] is not None
+    return stats
+
+
 def load_config():
+    """Return the effective config, reusing the last parse while the source files are unchanged.
+
+    The snapshot is keyed on (path, mtime, size) of config.yaml and both options
+    mirrors. Every caller gets its own deep copy, so mutating the result never
+    leaks into the shared snapshot.
+    """
+    signature = _config_sources_signature()
+    with _CONFIG_SNAPSHOT_LOCK:
+        if _CONFIG_SNAPSHOT["signature"] == signature:
+            _CONFIG_SNAPSHOT_STATS["hits"] += 1
+            return copy.deepcopy(_CONFIG_SNAPSHOT["config"])
+        _CONFIG_SNAPSHOT_STATS["misses"] += 1
+
+    cfg = _load_config_uncached()
+    # Loading may rewrite a stale options mirror, so key the snapshot on the post-load state.
+    signature = _config_sources_signature()
+    if _is_signature_settled(signature, time.time()):
+        with _CONFIG_SNAPSHOT_LOCK:
+            _CONFIG_SNAPSHOT["signature"] = signature
+            _CONFIG_SNAPSHOT["config"] = copy.deepcopy(cfg)
+    return cfg
+
+
+def _load_config_uncached():
     cfg = {}
     if os.path.exists(CONFIG_FILE):
         with open(CONFIG_FILE, "r", encoding="utf-8") as f:
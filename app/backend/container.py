@@ -17,6 +17,7 @@ class AppConfig:
     pnd_cache_dir: Path
     dip_cache_dir: Path
     invoices_dir: Path
+    day_ledger_dir: Path
     options_backup_file: Path
     fees_history_file: Path
 
@@ -49,6 +50,7 @@ def build_container() -> ApplicationContainer:
     pnd_cache_dir = storage_dir / "pnd-cache"
     dip_cache_dir = storage_dir / "dip-cache"
     invoices_dir = storage_dir / "invoices"
+    day_ledger_dir = storage_dir / "day-ledger"
     options_backup_file = storage_dir / "options.json"
     fees_history_file = storage_dir / "fees-history.json"
 
@@ -69,6 +71,7 @@ def build_container() -> ApplicationContainer:
             pnd_cache_dir=pnd_cache_dir,
             dip_cache_dir=dip_cache_dir,
             invoices_dir=invoices_dir,
+            day_ledger_dir=day_ledger_dir,
             options_backup_file=options_backup_file,
             fees_history_file=fees_history_file,
         ),
@@ -25,6 +25,7 @@ def _wire_service_from_container():
     app_service.PND_CACHE_DIR = cfg.pnd_cache_dir
     app_service.DIP_CACHE_DIR = cfg.dip_cache_dir
     app_service.INVOICES_DIR = cfg.invoices_dir
+    app_service.DAY_LEDGER_DIR = cfg.day_ledger_dir
     app_service.OPTIONS_BACKUP_FILE = cfg.options_backup_file
     app_service.FEES_HISTORY_FILE = cfg.fees_history_file
     config_loader.CONFIG_FILE = cfg.config_file
@@ -77,6 +78,11 @@ def startup_hook():
     app_service.log_cache_status()
 
 
+@app.on_event("shutdown")
+async def shutdown_hook():
+    await app_service.close_async_clients()
+
+
 @app.get("/health")
 def health():
     return {
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import re
 from html.parser import HTMLParser
 
@@ -122,6 +124,12 @@ def build_fee_snapshot(cfg):
     }
 
 
+def fee_snapshot_hash(snapshot):
+    """Stable content hash of a fee snapshot, for use in cache keys."""
+    payload = json.dumps(snapshot, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
 def normalize_fee_snapshot(snapshot):
     if not isinstance(snapshot, dict):
         snapshot = {}
@@ -287,7 +295,7 @@ def parse_price_html(html_text):
         except ValueError:
             continue
         rows.append((time_str, price_czk))
-    return rows
+    return rows
 
 def is_price_cache_provider_match(date_str, provider, get_cached_price_provider_fn):
     return get_cached_price_provider_fn(date_str) == normalize_price_provider(provider)
@@ -6,6 +6,9 @@ from typing import Literal
 from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 
 
+MONTH_RANGE_MAX_MONTHS = 12
+
+
 class QueryModel(BaseModel):
     model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
 
@@ -65,6 +68,32 @@ class MonthQuery(QueryModel):
         return value
 
 
+class MonthRangeQuery(QueryModel):
+    month: str
+    to_month: str | None = None
+
+    @field_validator("month", "to_month")
+    @classmethod
+    def validate_month(cls, value: str | None):
+        if value is None:
+            return value
+        datetime.strptime(value, "%Y-%m")
+        return value
+
+    @model_validator(mode="after")
+    def validate_span(self):
+        if self.to_month is None:
+            return self
+        start = datetime.strptime(self.month, "%Y-%m")
+        end = datetime.strptime(self.to_month, "%Y-%m")
+        span = (end.year - start.year) * 12 + end.month - start.month
+        if span < 0:
+            raise ValueError("to_month must not precede month.")
+        if span >= MONTH_RANGE_MAX_MONTHS:
+            raise ValueError(f"Month range is limited to {MONTH_RANGE_MAX_MONTHS} months.")
+        return self
+
+
 class HeatmapQuery(QueryModel):
     month: str
     metric: Literal["price", "buy", "export"] = "buy"
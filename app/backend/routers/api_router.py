@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Body, Depends, File, Query, Response, UploadFile
+from fastapi import APIRouter, Body, Depends, File, Query, UploadFile
+from fastapi.responses import StreamingResponse
+import itertools
 import logging
 from typing import Literal
 
@@ -8,12 +10,21 @@ from api_models import (
     FeesHistoryUpdateRequest,
     HpResolveEntityRequest,
     PndBackfillRequest,
+    PricesRangePrefetchRequest,
     PricesRefreshRequest,
     RecommendationQuery,
 )
 from config_models import AppConfigModel
 from dependencies import RequestContext, get_request_context
-from query_models import DateRangeQuery, EnergyBalanceQuery, HeatmapQuery, HpDataQuery, MonthQuery, OptionalDateQuery
+from query_models import (
+    DateRangeQuery,
+    EnergyBalanceQuery,
+    HeatmapQuery,
+    HpDataQuery,
+    MonthQuery,
+    MonthRangeQuery,
+    OptionalDateQuery,
+)
 from security import require_mutation_access
 
 
@@ -82,6 +93,11 @@ def backfill_pnd(payload: PndBackfillRequest = Body(...), ctx: RequestContext =
     return svc.backfill_pnd(range_name=payload.range, cfg=ctx.config, tzinfo=ctx.tzinfo)
 
 
+@router.get("/pnd/backfill/{job_id}")
+def get_pnd_backfill_job(job_id: str):
+    return svc.get_pnd_backfill_job(job_id)
+
+
 @router.post("/pnd/purge-cache", dependencies=[Depends(require_mutation_access)])
 def purge_pnd_cache():
     return svc.purge_pnd_cache()
@@ -163,6 +179,11 @@ def refresh_prices(payload: PricesRefreshRequest | None = Body(default=None), ct
     return svc.refresh_prices(payload=payload.model_dump(mode="python") if payload else None, cfg=ctx.config, tzinfo=ctx.tzinfo)
 
 
+@router.post("/prices/prefetch-range", dependencies=[Depends(require_mutation_access)])
+def prefetch_prices_range(payload: PricesRangePrefetchRequest = Body(...), ctx: RequestContext = Depends(get_request_context)):
+    return svc.prefetch_prices_range(payload=payload.model_dump(mode="python"), cfg=ctx.config, tzinfo=ctx.tzinfo)
+
+
 @router.get("/consumption")
 def get_consumption(
     params: DateRangeQuery = Depends(),
@@ -172,11 +193,11 @@ def get_consumption(
 
 
 @router.get("/costs")
-def get_costs(
+async def get_costs(
     params: DateRangeQuery = Depends(),
     ctx: RequestContext = Depends(get_request_context),
 ):
-    return svc.get_costs(
+    return await svc.get_costs_async(
         date=params.date,
         start=params.start,
         end=params.end,
@@ -200,8 +221,8 @@ def get_export(
 
 
 @router.get("/battery")
-def get_battery(params: OptionalDateQuery = Depends(), ctx: RequestContext = Depends(get_request_context)):
-    return svc.get_battery(date=params.date, cfg=ctx.config, tzinfo=ctx.tzinfo)
+async def get_battery(params: OptionalDateQuery = Depends(), ctx: RequestContext = Depends(get_request_context)):
+    return await svc.get_battery_async(date=params.date, cfg=ctx.config, tzinfo=ctx.tzinfo)
 
 
 @router.get("/energy-balance")
@@ -236,8 +257,12 @@ def get_schedule(
     count: int = Query(default=3, ge=1, le=3),
     duration_minutes: int = Query(default=None, ge=1, le=360, deprecated=True),
     date: str = Query(default=None, deprecated=True),
+    durations: list[int] = Query(default=None, min_length=1, max_length=12),
     ctx: RequestContext = Depends(get_request_context),
 ):
+    # Batch mode: one price load, one plan per appliance duration.
+    if isinstance(durations, list) and durations:
+        return svc.get_schedules(durations=durations, count=count, cfg=ctx.config, tzinfo=ctx.tzinfo)
     # Backward compatibility for older clients that still send duration_minutes.
     effective_duration = duration_minutes if isinstance(duration_minutes, int) else duration
     return svc.get_schedule(duration=effective_duration, count=count, cfg=ctx.config, tzinfo=ctx.tzinfo)
@@ -269,23 +294,31 @@ def get_comparison(params: OptionalDateQuery = Depends(), ctx: RequestContext =
 
 
 @router.get("/export-csv")
-def export_csv(params: MonthQuery = Depends(), ctx: RequestContext = Depends(get_request_context)):
-    csv_data = svc.export_monthly_csv(month=params.month, cfg=ctx.config, tzinfo=ctx.tzinfo)
-    filename = f"elektroapp-export-{params.month}.csv"
-    return Response(
-        content=csv_data,
+def export_csv(params: MonthRangeQuery = Depends(), ctx: RequestContext = Depends(get_request_context)):
+    chunks = svc.export_monthly_csv(month=params.month, to_month=params.to_month, cfg=ctx.config, tzinfo=ctx.tzinfo)
+    period = f"{params.month}_{params.to_month}" if params.to_month else params.month
+    filename = f"elektroapp-export-{period}.csv"
+    return StreamingResponse(
+        chunks,
         media_type="text/csv",
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
 
 @router.get("/invoice-detail-csv")
-def export_invoice_detail_csv(month: str, kind: Literal["supply", "export"], ctx: RequestContext = Depends(get_request_context)):
-    csv_data = svc.export_invoice_detail_csv(month=month, kind=kind, cfg=ctx.config, tzinfo=ctx.tzinfo)
+def export_invoice_detail_csv(
+    kind: Literal["supply", "export"],
+    params: MonthRangeQuery = Depends(),
+    ctx: RequestContext = Depends(get_request_context),
+):
+    chunks = svc.export_invoice_detail_csv(
+        month=params.month, kind=kind, to_month=params.to_month, cfg=ctx.config, tzinfo=ctx.tzinfo
+    )
     suffix = "dodavka" if kind == "supply" else "vykup"
-    filename = f"elektroapp-detail-{suffix}-{month}.csv"
-    return Response(
-        content="\ufeff" + csv_data,
+    period = f"{params.month}_{params.to_month}" if params.to_month else params.month
+    filename = f"elektroapp-detail-{suffix}-{period}.csv"
+    return StreamingResponse(
+        itertools.chain(["\ufeff"], chunks),
         media_type="text/csv; charset=utf-8",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
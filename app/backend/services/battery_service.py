@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Any, Callable
 
@@ -29,6 +30,10 @@ class BatteryService:
         build_battery_projection: Callable[..., dict[str, Any] | None],
         iso_to_display_hhmm: Callable[[Any], str | None],
         logger,
+        query_last_values: Callable[..., dict[str, dict[str, Any] | None]] | None = None,
+        query_entity_series_async: Callable[..., Any] | None = None,
+        query_last_values_async: Callable[..., Any] | None = None,
+        query_recent_slot_profile_by_day_type_async: Callable[..., Any] | None = None,
     ):
         self._get_influx_cfg = get_influx_cfg
         self._get_local_tz = get_local_tz
@@ -48,8 +53,34 @@ class BatteryService:
         self._build_battery_projection = build_battery_projection
         self._iso_to_display_hhmm = iso_to_display_hhmm
         self._logger = logger
+        self._query_last_values = query_last_values
+        self._query_entity_series_async = query_entity_series_async
+        self._query_last_values_async = query_last_values_async
+        self._query_recent_slot_profile_by_day_type_async = query_recent_slot_profile_by_day_type_async
 
-    def get_battery(self, *, date: str | None, cfg: dict[str, Any], tzinfo=None) -> dict[str, Any]:
+    def _query_latest_values(self, influx, specs: dict[str, dict[str, Any]], tzinfo) -> dict[str, dict[str, Any] | None]:
+        # One batched Influx request when available, otherwise one query per entity.
+        specs = {key: spec for key, spec in specs.items() if spec.get("entity_id")}
+        if self._query_last_values is not None:
+            return self._query_last_values(influx, specs, tzinfo=tzinfo)
+        return {
+            key: self._safe_query_entity_last_value(
+                influx,
+                spec["entity_id"],
+                tzinfo=tzinfo,
+                numeric=spec.get("numeric", True),
+                label=key,
+                measurement_candidates=spec.get("measurement_candidates"),
+            )
+            for key, spec in specs.items()
+        }
+
+    @property
+    def supports_async(self) -> bool:
+        return self._query_entity_series_async is not None and self._query_last_values_async is not None
+
+    def _plan_battery(self, date: str | None, cfg: dict[str, Any], tzinfo) -> dict[str, Any]:
+        # Everything get_battery needs before touching Influx; "payload" short-circuits disabled configs.
         influx = self._get_influx_cfg(cfg)
         tzinfo = tzinfo or self._get_local_tz(influx.get("timezone"))
         battery_cfg = self._get_battery_cfg(cfg)
@@ -62,17 +93,21 @@ class BatteryService:
 
         if not battery_cfg.get("enabled"):
             return {
-                "enabled": False,
-                "configured": False,
-                "date": selected_date,
-                "detail": "Battery feature is disabled in config.",
+                "payload": {
+                    "enabled": False,
+                    "configured": False,
+                    "date": selected_date,
+                    "detail": "Battery feature is disabled in config.",
+                }
             }
         if not self._has_battery_required_cfg(battery_cfg):
             return {
-                "enabled": True,
-                "configured": False,
-                "date": selected_date,
-                "detail": "Missing battery config (soc_entity_id, power_entity_id, usable_capacity_kwh).",
+                "payload": {
+                    "enabled": True,
+                    "configured": False,
+                    "date": selected_date,
+                    "detail": "Missing battery config (soc_entity_id, power_entity_id, usable_capacity_kwh).",
+                }
             }
 
         history_interval = influx.get("interval", "15m")
@@ -80,74 +115,202 @@ class BatteryService:
         power_measurements = ["W", "kW"]
         soc_measurements = ["%", "percent"]
         state_measurements = ["state"]
-        soc_series = self._query_entity_series(
-            influx,
-            battery_cfg["soc_entity_id"],
-            start_utc,
-            end_utc,
-            interval=history_interval,
-            tzinfo=tzinfo,
-            numeric=True,
-            measurement_candidates=soc_measurements,
-        )
-        power_series = self._query_entity_series(
-            influx,
-            battery_cfg["power_entity_id"],
-            start_utc,
-            end_utc,
-            interval=history_interval,
-            tzinfo=tzinfo,
-            numeric=True,
-            measurement_candidates=power_measurements,
-        )
 
-        def _normalize_points_to_w(ps):
-            for p in ps:
-                if p.get("value") is not None and str(p.get("unit") or "").lower() == "kw":
-                    p["value"] = float(p["value"]) * 1000.0
-            return ps
+        def _spec(entity_id, measurements, numeric=True):
+            return {"entity_id": entity_id, "measurement_candidates": measurements, "numeric": numeric}
 
-        power_series = _normalize_points_to_w(power_series)
-        history_points = self._build_battery_history_points(soc_series, power_series)
-        last_soc_point = self._get_last_non_null_value(soc_series)
-        last_power_point = self._get_last_non_null_value(power_series)
+        latest_specs = {
+            "soc": _spec(battery_cfg["soc_entity_id"], soc_measurements),
+            "battery_power": _spec(battery_cfg["power_entity_id"], power_measurements),
+            "house_load": _spec(energy_cfg.get("house_load_power_entity_id"), power_measurements),
+            "grid_import": _spec(energy_cfg.get("grid_import_power_entity_id"), power_measurements),
+            "grid_export": _spec(energy_cfg.get("grid_export_power_entity_id"), power_measurements),
+            "pv_total": _spec(energy_cfg.get("pv_power_total_entity_id"), power_measurements),
+            "pv_1": _spec(energy_cfg.get("pv_power_1_entity_id"), power_measurements),
+            "pv_2": _spec(energy_cfg.get("pv_power_2_entity_id"), power_measurements),
+            "battery_input_today": _spec(battery_cfg.get("input_energy_today_entity_id"), kwh_measurements),
+            "battery_output_today": _spec(battery_cfg.get("output_energy_today_entity_id"), kwh_measurements),
+        }
+        if forecast_cfg.get("enabled"):
+            latest_specs.update(
+                {
+                    "forecast_power_now": _spec(forecast_cfg.get("power_now_entity_id"), power_measurements),
+                    "forecast_energy_current_hour": _spec(
+                        forecast_cfg.get("energy_current_hour_entity_id"), kwh_measurements
+                    ),
+                    "forecast_energy_next_hour": _spec(forecast_cfg.get("energy_next_hour_entity_id"), kwh_measurements),
+                    "forecast_energy_today": _spec(
+                        forecast_cfg.get("energy_production_today_entity_id"), kwh_measurements
+                    ),
+                    "forecast_energy_today_remaining": _spec(
+                        forecast_cfg.get("energy_production_today_remaining_entity_id"), kwh_measurements
+                    ),
+                    "forecast_energy_tomorrow": _spec(
+                        forecast_cfg.get("energy_production_tomorrow_entity_id"), kwh_measurements
+                    ),
+                    "forecast_peak_time_today": _spec(
+                        forecast_cfg.get("power_highest_peak_time_today_entity_id"), state_measurements, numeric=False
+                    ),
+                    "forecast_peak_time_tomorrow": _spec(
+                        forecast_cfg.get("power_highest_peak_time_tomorrow_entity_id"), state_measurements, numeric=False
+                    ),
+                }
+            )
 
         now_local = datetime.now(tzinfo)
-        avg_power_w = None
+        history_kwargs = {"interval": history_interval, "tzinfo": tzinfo, "numeric": True}
+        series_requests = {
+            "soc": (
+                battery_cfg["soc_entity_id"],
+                start_utc,
+                end_utc,
+                {**history_kwargs, "measurement_candidates": soc_measurements},
+            ),
+            "power": (
+                battery_cfg["power_entity_id"],
+                start_utc,
+                end_utc,
+                {**history_kwargs, "measurement_candidates": power_measurements},
+            ),
+        }
+        profile_requests = {}
         if is_today:
             smoothing_start_utc = (now_local - timedelta(minutes=battery_cfg["eta_smoothing_minutes"])).astimezone(
                 timezone.utc
             )
             smoothing_end_utc = now_local.astimezone(timezone.utc) + timedelta(minutes=1)
-            trend_series = self._query_entity_series(
-                influx,
+            series_requests["trend"] = (
                 battery_cfg["power_entity_id"],
                 smoothing_start_utc,
                 smoothing_end_utc,
-                interval="1m",
-                tzinfo=tzinfo,
-                numeric=True,
-                measurement_candidates=power_measurements,
+                {"interval": "1m", "tzinfo": tzinfo, "numeric": True, "measurement_candidates": power_measurements},
             )
-            trend_series = _normalize_points_to_w(trend_series)
-            avg_power_w = self._average_recent_power(trend_series)
-
-        latest_soc = self._safe_query_entity_last_value(
-            influx,
-            battery_cfg["soc_entity_id"],
-            tzinfo=tzinfo,
-            numeric=True,
-            label="soc",
-            measurement_candidates=soc_measurements,
-        )
-        latest_power = self._safe_query_entity_last_value(
-            influx,
-            battery_cfg["power_entity_id"],
-            tzinfo=tzinfo,
-            numeric=True,
-            label="battery_power",
-            measurement_candidates=power_measurements,
+            profile_kwargs = {
+                "target_date": now_local.date(),
+                "days": 28,
+                "interval": history_interval,
+                "measurement_candidates": power_measurements,
+            }
+            if energy_cfg.get("house_load_power_entity_id"):
+                profile_requests["load"] = (energy_cfg.get("house_load_power_entity_id"), profile_kwargs)
+            if energy_cfg.get("pv_power_total_entity_id"):
+                profile_requests["pv"] = (energy_cfg.get("pv_power_total_entity_id"), profile_kwargs)
+
+        return {
+            "influx": influx,
+            "tzinfo": tzinfo,
+            "battery_cfg": battery_cfg,
+            "energy_cfg": energy_cfg,
+            "forecast_cfg": forecast_cfg,
+            "selected_date": selected_date,
+            "is_today": is_today,
+            "now_local": now_local,
+            "history_interval": history_interval,
+            "series_requests": series_requests,
+            "latest_specs": {key: spec for key, spec in latest_specs.items() if spec.get("entity_id")},
+            "profile_requests": profile_requests,
+        }
+
+    def _fetch_battery_inputs(self, plan: dict[str, Any]) -> dict[str, Any]:
+        influx, tzinfo = plan["influx"], plan["tzinfo"]
+        series = {
+            key: self._query_entity_series(influx, entity_id, start, end, **kwargs)
+            for key, (entity_id, start, end, kwargs) in plan["series_requests"].items()
+        }
+        profiles = {}
+        for key, (entity_id, kwargs) in plan["profile_requests"].items():
+            try:
+                profiles[key] = self._query_recent_slot_profile_by_day_type(influx, entity_id, tzinfo, **kwargs)
+            except (HTTPException, RequestException, ValueError, TypeError) as exc:
+                self._logger.warning("Battery projection %s profile query failed: %s", key, exc)
+        return {
+            "series": series,
+            "latest_values": self._query_latest_values(influx, plan["latest_specs"], tzinfo),
+            "profiles": profiles,
+        }
+
+    async def _fetch_battery_inputs_async(self, plan: dict[str, Any]) -> dict[str, Any]:
+        # Same inputs as _fetch_battery_inputs, with all Influx requests in flight at once.
+        influx, tzinfo = plan["influx"], plan["tzinfo"]
+        series_keys = list(plan["series_requests"])
+        profile_keys = list(plan["profile_requests"])
+        profile_fn = self._query_recent_slot_profile_by_day_type_async
+        results = await asyncio.gather(
+            *(
+                self._query_entity_series_async(influx, entity_id, start, end, **kwargs)
+                for entity_id, start, end, kwargs in plan["series_requests"].values()
+            ),
+            self._query_last_values_async(influx, plan["latest_specs"], tzinfo=tzinfo),
+            *(
+                profile_fn(influx, entity_id, tzinfo, **kwargs)
+                if profile_fn is not None
+                else asyncio.to_thread(self._query_recent_slot_profile_by_day_type, influx, entity_id, tzinfo, **kwargs)
+                for entity_id, kwargs in plan["profile_requests"].values()
+            ),
+            return_exceptions=True,
         )
+        series_results = results[: len(series_keys)]
+        latest_values = results[len(series_keys)]
+        profile_results = results[len(series_keys) + 1 :]
+        for value in (*series_results, latest_values):
+            if isinstance(value, BaseException):
+                raise value
+        profiles = {}
+        for key, value in zip(profile_keys, profile_results):
+            if isinstance(value, (HTTPException, RequestException, ValueError, TypeError)):
+                self._logger.warning("Battery projection %s profile query failed: %s", key, value)
+            elif isinstance(value, BaseException):
+                raise value
+            else:
+                profiles[key] = value
+        return {"series": dict(zip(series_keys, series_results)), "latest_values": latest_values, "profiles": profiles}
+
+    def get_battery(self, *, date: str | None, cfg: dict[str, Any], tzinfo=None) -> dict[str, Any]:
+        plan = self._plan_battery(date, cfg, tzinfo)
+        if "payload" in plan:
+            return plan["payload"]
+        return self._build_battery_payload(plan, self._fetch_battery_inputs(plan))
+
+    async def get_battery_async(self, *, date: str | None, cfg: dict[str, Any], tzinfo=None) -> dict[str, Any]:
+        plan = self._plan_battery(date, cfg, tzinfo)
+        if "payload" in plan:
+            return plan["payload"]
+        if not self.supports_async:
+            inputs = await asyncio.to_thread(self._fetch_battery_inputs, plan)
+        else:
+            inputs = await self._fetch_battery_inputs_async(plan)
+        return self._build_battery_payload(plan, inputs)
+
+    def _build_battery_payload(self, plan: dict[str, Any], inputs: dict[str, Any]) -> dict[str, Any]:
+        tzinfo = plan["tzinfo"]
+        battery_cfg = plan["battery_cfg"]
+        energy_cfg = plan["energy_cfg"]
+        forecast_cfg = plan["forecast_cfg"]
+        selected_date = plan["selected_date"]
+        is_today = plan["is_today"]
+        now_local = plan["now_local"]
+        history_interval = plan["history_interval"]
+        latest_values = inputs["latest_values"]
+        soc_series = inputs["series"]["soc"]
+        power_series = inputs["series"]["power"]
+
+        def _normalize_points_to_w(ps):
+            for p in ps:
+                if p.get("value") is not None and str(p.get("unit") or "").lower() == "kw":
+                    p["value"] = float(p["value"]) * 1000.0
+            return ps
+
+        power_series = _normalize_points_to_w(power_series)
+        history_points = self._build_battery_history_points(soc_series, power_series)
+        last_soc_point = self._get_last_non_null_value(soc_series)
+        last_power_point = self._get_last_non_null_value(power_series)
+
+        avg_power_w = None
+        if "trend" in inputs["series"]:
+            avg_power_w = self._average_recent_power(_normalize_points_to_w(inputs["series"]["trend"]))
+
+        latest_soc = latest_values.get("soc")
+        latest_power = latest_values.get("battery_power")
         if (latest_soc is None or latest_soc.get("value") is None) and last_soc_point:
             latest_soc = {
                 "time": last_soc_point["time"],
@@ -186,15 +349,8 @@ class BatteryService:
         else:
             battery_state = "idle"
 
-        def _latest_numeric(entity_id, label, measurements=None):
-            record = self._safe_query_entity_last_value(
-                influx,
-                entity_id,
-                tzinfo=tzinfo,
-                numeric=True,
-                label=label,
-                measurement_candidates=measurements,
-            )
+        def _latest_numeric(label):
+            record = latest_values.get(label)
             if not record or record.get("value") is None:
                 return None
             val = float(record["value"])
@@ -202,82 +358,33 @@ class BatteryService:
                 return val * 1000.0
             return val
 
-        def _latest_raw(entity_id, label, measurements=None):
-            record = self._safe_query_entity_last_value(
-                influx,
-                entity_id,
-                tzinfo=tzinfo,
-                numeric=False,
-                label=label,
-                measurement_candidates=measurements,
-            )
+        def _latest_raw(label):
+            record = latest_values.get(label)
             return None if not record else record.get("raw_value")
 
         current_energy = {
-            "house_load_w": _latest_numeric(energy_cfg.get("house_load_power_entity_id"), "house_load", power_measurements),
-            "grid_import_w": _latest_numeric(
-                energy_cfg.get("grid_import_power_entity_id"), "grid_import", power_measurements
-            ),
-            "grid_export_w": _latest_numeric(
-                energy_cfg.get("grid_export_power_entity_id"), "grid_export", power_measurements
-            ),
-            "pv_power_total_w": _latest_numeric(energy_cfg.get("pv_power_total_entity_id"), "pv_total", power_measurements),
-            "pv_power_1_w": _latest_numeric(energy_cfg.get("pv_power_1_entity_id"), "pv_1", power_measurements),
-            "pv_power_2_w": _latest_numeric(energy_cfg.get("pv_power_2_entity_id"), "pv_2", power_measurements),
-            "battery_input_today_kwh": _latest_numeric(
-                battery_cfg.get("input_energy_today_entity_id"),
-                "battery_input_today",
-                kwh_measurements,
-            ),
-            "battery_output_today_kwh": _latest_numeric(
-                battery_cfg.get("output_energy_today_entity_id"),
-                "battery_output_today",
-                kwh_measurements,
-            ),
+            "house_load_w": _latest_numeric("house_load"),
+            "grid_import_w": _latest_numeric("grid_import"),
+            "grid_export_w": _latest_numeric("grid_export"),
+            "pv_power_total_w": _latest_numeric("pv_total"),
+            "pv_power_1_w": _latest_numeric("pv_1"),
+            "pv_power_2_w": _latest_numeric("pv_2"),
+            "battery_input_today_kwh": _latest_numeric("battery_input_today"),
+            "battery_output_today_kwh": _latest_numeric("battery_output_today"),
         }
 
         forecast_payload = {"enabled": bool(forecast_cfg.get("enabled")), "available": False}
         if forecast_cfg.get("enabled"):
             forecast_payload.update(
                 {
-                    "power_now_w": _latest_numeric(
-                        forecast_cfg.get("power_now_entity_id"), "forecast_power_now", power_measurements
-                    ),
-                    "energy_current_hour_kwh": _latest_numeric(
-                        forecast_cfg.get("energy_current_hour_entity_id"),
-                        "forecast_energy_current_hour",
-                        kwh_measurements,
-                    ),
-                    "energy_next_hour_kwh": _latest_numeric(
-                        forecast_cfg.get("energy_next_hour_entity_id"),
-                        "forecast_energy_next_hour",
-                        kwh_measurements,
-                    ),
-                    "energy_production_today_kwh": _latest_numeric(
-                        forecast_cfg.get("energy_production_today_entity_id"),
-                        "forecast_energy_today",
-                        kwh_measurements,
-                    ),
-                    "energy_production_today_remaining_kwh": _latest_numeric(
-                        forecast_cfg.get("energy_production_today_remaining_entity_id"),
-                        "forecast_energy_today_remaining",
-                        kwh_measurements,
-                    ),
-                    "energy_production_tomorrow_kwh": _latest_numeric(
-                        forecast_cfg.get("energy_production_tomorrow_entity_id"),
-                        "forecast_energy_tomorrow",
-                        kwh_measurements,
-                    ),
-                    "peak_time_today": _latest_raw(
-                        forecast_cfg.get("power_highest_peak_time_today_entity_id"),
-                        "forecast_peak_time_today",
-                        state_measurements,
-                    ),
-                    "peak_time_tomorrow": _latest_raw(
-                        forecast_cfg.get("power_highest_peak_time_tomorrow_entity_id"),
-                        "forecast_peak_time_tomorrow",
-                        state_measurements,
-                    ),
+                    "power_now_w": _latest_numeric("forecast_power_now"),
+                    "energy_current_hour_kwh": _latest_numeric("forecast_energy_current_hour"),
+                    "energy_next_hour_kwh": _latest_numeric("forecast_energy_next_hour"),
+                    "energy_production_today_kwh": _latest_numeric("forecast_energy_today"),
+                    "energy_production_today_remaining_kwh": _latest_numeric("forecast_energy_today_remaining"),
+                    "energy_production_tomorrow_kwh": _latest_numeric("forecast_energy_tomorrow"),
+                    "peak_time_today": _latest_raw("forecast_peak_time_today"),
+                    "peak_time_tomorrow": _latest_raw("forecast_peak_time_tomorrow"),
                 }
             )
             forecast_payload["peak_time_today_hhmm"] = self._iso_to_display_hhmm(forecast_payload.get("peak_time_today"))
@@ -301,34 +408,8 @@ class BatteryService:
         projection = None
         if is_today:
             interval_minutes = self._parse_influx_interval_to_minutes(history_interval, default_minutes=15)
-            load_profile = {}
-            pv_profile = {}
-            if energy_cfg.get("house_load_power_entity_id"):
-                try:
-                    load_profile = self._query_recent_slot_profile_by_day_type(
-                        influx,
-                        energy_cfg.get("house_load_power_entity_id"),
-                        tzinfo,
-                        target_date=now_local.date(),
-                        days=28,
-                        interval=history_interval,
-                        measurement_candidates=power_measurements,
-                    )
-                except (HTTPException, RequestException, ValueError, TypeError) as exc:
-                    self._logger.warning("Battery projection load profile query failed: %s", exc)
-            if energy_cfg.get("pv_power_total_entity_id"):
-                try:
-                    pv_profile = self._query_recent_slot_profile_by_day_type(
-                        influx,
-                        energy_cfg.get("pv_power_total_entity_id"),
-                        tzinfo,
-                        target_date=now_local.date(),
-                        days=28,
-                        interval=history_interval,
-                        measurement_candidates=power_measurements,
-                    )
-                except (HTTPException, RequestException, ValueError, TypeError) as exc:
-                    self._logger.warning("Battery projection PV profile query failed: %s", exc)
+            load_profile = inputs["profiles"].get("load", {})
+            pv_profile = inputs["profiles"].get("pv", {})
 
             projection = self._build_hybrid_battery_projection(
                 now_local=now_local,
@@ -1,13 +1,179 @@
 from __future__ import annotations
 
 import calendar
+import contextvars
 import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta, timezone
 import re
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 from fastapi import HTTPException
 
+from services.day_ledger import DayLedger, is_finalized_day
+from services.price_vector import DayPriceVector, as_price_lookup, local_hour_minute
+
+# Months of a billing year computed concurrently; each month is a sequential per-day walk.
+BILLING_YEAR_MAX_WORKERS = 4
+
+@lru_cache(maxsize=32)
+def _vt_slot_mask(periods: tuple[tuple[int, int], ...]) -> tuple[bool, ...]:
+    return tuple(any(start <= slot // 4 < end for start, end in periods) for slot in range(96))
+
+
+def build_vt_slot_mask(vt_periods) -> tuple[bool, ...]:
+    """VT flag for each of the 96 local quarter-hour slots (hour * 4 + minute // 15)."""
+    try:
+        periods = tuple((start, end) for start, end in vt_periods or ())
+    except (TypeError, ValueError):
+        periods = ()
+    return _vt_slot_mask(periods)
+
+
+def invoice_kernel(
+    kwh: list[float],
+    spot: list[float],
+    final: list[float],
+    vt: list[bool],
+    fees: dict[str, Any],
+) -> tuple[dict[str, float], float, float]:
+    """Invoice items for aligned per-slot kWh/price arrays in a single pass.
+
+    Per-kWh fees are flat for the day, so they are applied once to the kWh
+    totals instead of per point. Returns (items, total_kwh, variable_cost).
+    """
+    total_kwh = 0.0
+    vt_kwh = 0.0
+    spot_cost = 0.0
+    variable_cost = 0.0
+    for kwh_value, spot_value, final_value, is_vt in zip(kwh, spot, final, vt):
+        total_kwh += kwh_value
+        spot_cost += kwh_value * spot_value
+        variable_cost += kwh_value * final_value
+        if is_vt:
+            vt_kwh += kwh_value
+    nt_kwh = total_kwh - vt_kwh
+    distribution = fees.get("distribuce", {})
+    items = {
+        "spot": spot_cost,
+        "supplier_service": total_kwh * float(fees.get("komodita_sluzba") or 0.0),
+        "distribution_nt": nt_kwh * float(distribution.get("NT") or 0.0),
+        "distribution_vt": vt_kwh * float(distribution.get("VT") or 0.0),
+        "oze": total_kwh * float(fees.get("oze") or 0.0),
+        "electricity_tax": total_kwh * float(fees.get("dan") or 0.0),
+        "system_services": total_kwh * float(fees.get("systemove_sluzby") or 0.0),
+        "nt_kwh": nt_kwh,
+        "vt_kwh": vt_kwh,
+    }
+    return items, total_kwh, variable_cost
+
+
+def invoice_slot_arrays(
+    prices: DayPriceVector,
+    points: list[dict[str, Any]],
+    vt_mask: tuple[bool, ...],
+) -> tuple[list[float], list[float], list[float], list[bool]]:
+    """kWh/spot/final/VT arrays aligned by the vector's slot index for invoice_kernel.
+
+    Points are bucketed by slot in one pass; prices and the VT flag are then
+    read per slot, the VT flag from the slot's own local wall-clock time.
+    """
+    slot_prices = prices.prices
+    kwh_by_slot: list[float | None] = [None] * prices.slot_count
+    for entry in points:
+        kwh = entry.get("kwh")
+        if kwh is None:
+            continue
+        index = prices.index_for_point(entry)
+        if index is None or slot_prices[index] is None:
+            continue
+        previous = kwh_by_slot[index]
+        kwh_by_slot[index] = kwh if previous is None else previous + kwh
+    indices = [index for index, kwh in enumerate(kwh_by_slot) if kwh is not None]
+    wall_slots = prices.wall_slots
+    return (
+        [kwh_by_slot[index] for index in indices],
+        [slot_prices[index]["spot"] for index in indices],
+        [slot_prices[index]["final"] for index in indices],
+        [vt_mask[wall_slots[index]] for index in indices],
+    )
+
+
+class _MonthContext:
+    """One request's view of a billing month; each day's inputs and aggregates load once.
+
+    The daily summary, its settlement estimate and invoice detail share it, so a
+    day's series, price vector and fee snapshot are never fetched twice.
+    """
+
+    def __init__(self, service: "BillingService", cfg: dict[str, Any], month_str: str, tzinfo):
+        year, month_num = map(int, month_str.split("-"))
+        self.service = service
+        self.cfg = cfg
+        self.month = month_str
+        self.tzinfo = tzinfo
+        self.days_in_month = calendar.monthrange(year, month_num)[1]
+        self.start_date = datetime(year, month_num, 1).date()
+        self.end_date = self.start_date + timedelta(days=self.days_in_month - 1)
+        self.today = datetime.now(tzinfo).date()
+        self._prefetched = False
+        self._preloaded: dict[str, dict[str, dict[str, Any]]] = {}
+        self._consumption: dict[str, dict[str, Any]] = {}
+        self._export: dict[str, dict[str, Any]] = {}
+        self._prices: dict[str, Any] = {}
+        self._fees: dict[str, dict[str, Any]] = {}
+        self._aggregates: dict[str, dict[str, dict[str, Any]]] = {}
+
+    def _prefetch(self) -> None:
+        # Warm the series caches only once a day actually needs raw series (i.e. misses the day ledger).
+        # Days the range scan already loaded are kept and handed out once instead of being read again.
+        if not self._prefetched:
+            self._prefetched = True
+            if self.start_date <= self.today:
+                self._preloaded = self.service._prefetch_month_series(self.cfg, self.start_date, self.end_date)
+
+    def _preloaded_day(self, kind: str, date_str: str) -> dict[str, Any] | None:
+        return (self._preloaded.get(kind) or {}).pop(date_str, None)
+
+    def consumption(self, date_str: str) -> dict[str, Any]:
+        if date_str not in self._consumption:
+            self._prefetch()
+            self._consumption[date_str] = self._preloaded_day("consumption", date_str) or self.service._get_consumption_points(
+                self.cfg, date=date_str
+            )
+        return self._consumption[date_str]
+
+    def export(self, date_str: str) -> dict[str, Any]:
+        if date_str not in self._export:
+            self._prefetch()
+            self._export[date_str] = self._preloaded_day("export", date_str) or self.service._get_export_points(
+                self.cfg, date=date_str
+            )
+        return self._export[date_str]
+
+    def prices(self, date_str: str, tzinfo=None):
+        if date_str not in self._prices:
+            self._prices[date_str] = as_price_lookup(
+                self.service._build_price_map_for_date(self.cfg, date_str, tzinfo or self.tzinfo)
+            )
+        return self._prices[date_str]
+
+    def fee_snapshot(self, date_str: str) -> dict[str, Any]:
+        if date_str not in self._fees:
+            self._fees[date_str] = self.service._get_fee_snapshot_for_date(self.cfg, date_str, self.tzinfo)
+        return self._fees[date_str]
+
+    def release_day(self, date_str: str) -> None:
+        self._consumption.pop(date_str, None)
+        self._export.pop(date_str, None)
+        self._prices.pop(date_str, None)
+
+    def aggregates(self, date_str: str) -> dict[str, dict[str, Any]]:
+        if date_str not in self._aggregates:
+            self._aggregates[date_str] = self.service._day_aggregates(self, date_str)
+        return self._aggregates[date_str]
+
 
 class BillingService:
     def __init__(
@@ -15,7 +181,7 @@ class BillingService:
         *,
         get_consumption_points: Callable[..., dict[str, Any]],
         get_export_points: Callable[..., dict[str, Any]],
-        build_price_map_for_date: Callable[..., tuple[dict[str, dict[str, float]], dict[str, dict[str, float]]]],
+        build_price_map_for_date: Callable[..., DayPriceVector | tuple[dict[str, dict[str, float]], dict[str, dict[str, float]]]],
         get_export_entity_id: Callable[[dict[str, Any]], str | None],
         get_fee_snapshot_for_date: Callable[..., dict[str, Any]],
         compute_fixed_breakdown_for_day: Callable[..., tuple[dict[str, float], dict[str, float]]],
@@ -26,7 +192,11 @@ class BillingService:
         parse_influx_interval_to_minutes: Callable[..., int] | None = None,
         query_entity_series: Callable[..., list[dict[str, Any]]] | None = None,
         aggregate_power_points: Callable[..., dict[str, float]] | None = None,
+        prefetch_series_range: Callable[..., dict[str, dict[str, Any]] | None] | None = None,
         logger=None,
+        get_day_ledger: Callable[[], DayLedger | None] | None = None,
+        get_day_ledger_signature: Callable[..., str | None] | None = None,
+        year_workers: int = BILLING_YEAR_MAX_WORKERS,
     ):
         self._get_consumption_points = get_consumption_points
         self._get_export_points = get_export_points
@@ -42,28 +212,52 @@ class BillingService:
         self._parse_influx_interval_to_minutes = parse_influx_interval_to_minutes
         self._query_entity_series = query_entity_series
         self._aggregate_power_points = aggregate_power_points
+        self._prefetch_series_range = prefetch_series_range
         self._logger = logger
+        self._get_day_ledger = get_day_ledger
+        self._get_day_ledger_signature = get_day_ledger_signature
+        self._year_workers = max(1, int(year_workers or 1))
 
     def calculate_daily_totals(self, cfg: dict[str, Any], date_str: str) -> dict[str, Any]:
         consumption = self._get_consumption_points(cfg, date=date_str)
-        tzinfo = consumption["tzinfo"]
+        return self._day_totals(
+            consumption,
+            lambda: as_price_lookup(self._build_price_map_for_date(cfg, date_str, consumption["tzinfo"])),
+        )
+
+    def calculate_daily_invoice(self, cfg: dict[str, Any], date_str: str) -> dict[str, Any]:
+        consumption = self._get_consumption_points(cfg, date=date_str)
+        return self._day_invoice(
+            cfg,
+            consumption,
+            lambda: as_price_lookup(self._build_price_map_for_date(cfg, date_str, consumption["tzinfo"])),
+            lambda: self._get_fee_snapshot_for_date(cfg, date_str, consumption["tzinfo"]),
+        )
+
+    def calculate_daily_export_totals(self, cfg: dict[str, Any], date_str: str) -> dict[str, Any]:
+        if not self._get_export_entity_id(cfg):
+            return {"export_kwh_total": None, "sell_total": None, "has_series": False}
+        export = self._get_export_points(cfg, date=date_str)
+        return self._day_export_totals(
+            cfg,
+            export,
+            lambda: as_price_lookup(self._build_price_map_for_date(cfg, date_str, export["tzinfo"])),
+            lambda: self._get_fee_snapshot_for_date(cfg, date_str, export["tzinfo"]),
+        )
+
+    @staticmethod
+    def _day_totals(consumption: dict[str, Any], get_prices: Callable[[], Any]) -> dict[str, Any]:
         has_series = consumption.get("has_series", False)
         if not has_series:
             return {"kwh_total": None, "cost_total": None, "has_series": has_series}
-        price_map, price_map_utc = self._build_price_map_for_date(cfg, date_str, tzinfo)
+        prices = get_prices()
 
         total_kwh = 0.0
         total_cost = 0.0
         count = 0
         for entry in consumption["points"]:
             kwh = entry["kwh"]
-            time_local = datetime.fromisoformat(entry["time"])
-            key = time_local.strftime("%Y-%m-%d %H:%M")
-            price = price_map.get(key)
-            if price is None:
-                time_utc = datetime.fromisoformat(entry["time_utc"].replace("Z", "+00:00"))
-                key_utc = time_utc.strftime("%Y-%m-%d %H:%M")
-                price = price_map_utc.get(key_utc)
+            price = prices.price_for_point(entry)
             final_price = price["final"] if price else None
             if kwh is not None and final_price is not None:
                 total_kwh += kwh
@@ -74,55 +268,46 @@ class BillingService:
             return {"kwh_total": None, "cost_total": None, "has_series": has_series}
         return {"kwh_total": round(total_kwh, 5), "cost_total": round(total_cost, 5), "has_series": has_series}
 
-    def calculate_daily_invoice(self, cfg: dict[str, Any], date_str: str) -> dict[str, Any]:
-        consumption = self._get_consumption_points(cfg, date=date_str)
-        tzinfo = consumption["tzinfo"]
+    def _day_invoice(
+        self,
+        cfg: dict[str, Any],
+        consumption: dict[str, Any],
+        get_prices: Callable[[], Any],
+        get_fee_snapshot: Callable[[], dict[str, Any]],
+    ) -> dict[str, Any]:
         if not consumption.get("has_series", False):
             return {"has_series": False, "kwh_total": None, "variable_cost": None, "items": {}}
 
-        price_map, price_map_utc = self._build_price_map_for_date(cfg, date_str, tzinfo)
-        fee_snapshot = self._get_fee_snapshot_for_date(cfg, date_str, tzinfo)
+        prices = get_prices()
+        fee_snapshot = get_fee_snapshot()
         fees = fee_snapshot.get("kwh_fees", {})
-        distribution = fees.get("distribuce", {})
         vt_periods = cfg.get("tarif", {}).get("vt_periods", [])
         dph_multiplier = 1 + (float(fee_snapshot.get("dph_percent") or 0.0) / 100.0)
-        items = {
-            "spot": 0.0,
-            "supplier_service": 0.0,
-            "distribution_nt": 0.0,
-            "distribution_vt": 0.0,
-            "oze": 0.0,
-            "electricity_tax": 0.0,
-            "system_services": 0.0,
-            "nt_kwh": 0.0,
-            "vt_kwh": 0.0,
-        }
-        total_kwh = 0.0
-        variable_cost = 0.0
-
-        for entry in consumption["points"]:
-            kwh = entry.get("kwh")
-            if kwh is None:
-                continue
-            time_local = datetime.fromisoformat(entry["time"])
-            price = price_map.get(time_local.strftime("%Y-%m-%d %H:%M"))
-            if price is None:
-                time_utc = datetime.fromisoformat(entry["time_utc"].replace("Z", "+00:00"))
-                price = price_map_utc.get(time_utc.strftime("%Y-%m-%d %H:%M"))
-            if price is None:
-                continue
-            is_vt = any(start <= time_local.hour < end for start, end in vt_periods)
-            tariff = "VT" if is_vt else "NT"
-            total_kwh += kwh
-            items["spot"] += kwh * price["spot"]
-            items["supplier_service"] += kwh * float(fees.get("komodita_sluzba") or 0.0)
-            items["oze"] += kwh * float(fees.get("oze") or 0.0)
-            items["electricity_tax"] += kwh * float(fees.get("dan") or 0.0)
-            items["system_services"] += kwh * float(fees.get("systemove_sluzby") or 0.0)
-            items[f"{tariff.lower()}_kwh"] += kwh
-            items[f"distribution_{tariff.lower()}"] += kwh * float(distribution.get(tariff) or 0.0)
-            variable_cost += kwh * price["final"]
-
+        vt_mask = build_vt_slot_mask(vt_periods)
+        if isinstance(prices, DayPriceVector):
+            kwh_values, spot_values, final_values, vt_flags = invoice_slot_arrays(prices, consumption["points"], vt_mask)
+        else:
+            kwh_values, spot_values, final_values, vt_flags = [], [], [], []
+            skipped = 0
+            for entry in consumption["points"]:
+                kwh = entry.get("kwh")
+                if kwh is None:
+                    continue
+                price = prices.price_for_point(entry)
+                if price is None:
+                    continue
+                hour_minute = local_hour_minute(entry.get("time"))
+                if hour_minute is None:
+                    skipped += 1
+                    continue
+                kwh_values.append(kwh)
+                spot_values.append(price["spot"])
+                final_values.append(price["final"])
+                vt_flags.append(vt_mask[(hour_minute[0] * 4 + hour_minute[1] // 15) % 96])
+            if skipped and self._logger:
+                self._logger.warning("Skipped %d priced points with unparseable time in the invoice", skipped)
+
+        items, total_kwh, variable_cost = invoice_kernel(kwh_values, spot_values, final_values, vt_flags, fees)
         return {
             "has_series": True,
             "kwh_total": round(total_kwh, 5),
@@ -131,31 +316,25 @@ class BillingService:
             "items": items,
         }
 
-    def calculate_daily_export_totals(self, cfg: dict[str, Any], date_str: str) -> dict[str, Any]:
-        export_entity_id = self._get_export_entity_id(cfg)
-        if not export_entity_id:
-            return {"export_kwh_total": None, "sell_total": None, "has_series": False}
-        export = self._get_export_points(cfg, date=date_str)
-        tzinfo = export["tzinfo"]
+    def _day_export_totals(
+        self,
+        cfg: dict[str, Any],
+        export: dict[str, Any],
+        get_prices: Callable[[], Any],
+        get_fee_snapshot: Callable[[], dict[str, Any]],
+    ) -> dict[str, Any]:
         has_series = export.get("has_series", False)
         if not has_series:
             return {"export_kwh_total": None, "sell_total": None, "has_series": has_series}
-        price_map, price_map_utc = self._build_price_map_for_date(cfg, date_str, tzinfo)
-        fee_snapshot = self._get_fee_snapshot_for_date(cfg, date_str, tzinfo)
-        coef_kwh = self._calculate_sell_coefficient(cfg, fee_snapshot)
+        prices = get_prices()
+        coef_kwh = self._calculate_sell_coefficient(cfg, get_fee_snapshot())
 
         total_kwh = 0.0
         total_sell = 0.0
         count = 0
         for entry in export["points"]:
             kwh = entry["kwh"]
-            time_local = datetime.fromisoformat(entry["time"])
-            key = time_local.strftime("%Y-%m-%d %H:%M")
-            price = price_map.get(key)
-            if price is None:
-                time_utc = datetime.fromisoformat(entry["time_utc"].replace("Z", "+00:00"))
-                key_utc = time_utc.strftime("%Y-%m-%d %H:%M")
-                price = price_map_utc.get(key_utc)
+            price = prices.price_for_point(entry)
             spot_price = price["spot"] if price else None
             sell_price = spot_price - coef_kwh if spot_price is not None else None
             if kwh is not None and sell_price is not None:
@@ -206,6 +385,82 @@ class BillingService:
                 self._logger.warning("Monthly PV production query failed (%s): %s", pv_entity_id, exc)
             return {}
 
+    def _prefetch_month_series(self, cfg: dict[str, Any], start_date, end_date) -> dict[str, dict[str, dict[str, Any]]]:
+        # Warm the per-day series caches with one range query per entity so the
+        # day loops below are cache hits instead of one Influx round trip per day.
+        # Returns the day results the prefetch already loaded, per series kind.
+        if self._prefetch_series_range is None:
+            return {}
+        try:
+            return self._prefetch_series_range(cfg, start_date, end_date) or {}
+        except Exception as exc:
+            if self._logger:
+                self._logger.warning("Series range prefetch failed (%s..%s): %s", start_date, end_date, exc)
+            return {}
+
+    def _month_context(self, cfg: dict[str, Any], month_str: str, tzinfo) -> _MonthContext:
+        if not re.match(r"^\d{4}-\d{2}$", month_str):
+            raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM.")
+        return _MonthContext(self, cfg, month_str, tzinfo)
+
+    def _day_aggregates(self, ctx: _MonthContext, date_str: str) -> dict[str, dict[str, Any]]:
+        """Per-day "totals", "invoice" and "export" aggregates; finalized days come from the day ledger.
+
+        Returned records may be shared with the ledger and must be treated as read-only.
+        """
+        cfg = ctx.cfg
+        ledger = self._get_day_ledger() if self._get_day_ledger else None
+        signature = None
+        if ledger is not None and self._get_day_ledger_signature is not None and is_finalized_day(date_str, ctx.today):
+            signature = self._get_day_ledger_signature(cfg, date_str, ctx.tzinfo)
+            if signature:
+                record = ledger.get(date_str, signature)
+                if record is not None:
+                    return record
+
+        consumption = ctx.consumption(date_str)
+        record = {
+            "totals": self._day_totals(consumption, lambda: ctx.prices(date_str, consumption["tzinfo"])),
+            "invoice": self._day_invoice(
+                cfg, consumption, lambda: ctx.prices(date_str, consumption["tzinfo"]), lambda: ctx.fee_snapshot(date_str)
+            ),
+        }
+        if self._get_export_entity_id(cfg):
+            export = ctx.export(date_str)
+            record["export"] = self._day_export_totals(
+                cfg, export, lambda: ctx.prices(date_str, export["tzinfo"]), lambda: ctx.fee_snapshot(date_str)
+            )
+        else:
+            record["export"] = {"export_kwh_total": None, "sell_total": None, "has_series": False}
+
+        # Days without data may still be backfilled and prices missing after a failed or throttled
+        # OTE/CNB fetch may still arrive, so only days whose every kWh is priced are persisted.
+        if signature and self._is_fully_priced(consumption, ctx.prices(date_str, consumption["tzinfo"])):
+            if not self._get_export_entity_id(cfg) or self._is_fully_priced(
+                export, ctx.prices(date_str, export["tzinfo"])
+            ):
+                ledger.put(date_str, signature, record)
+        return record
+
+    @staticmethod
+    def _is_fully_priced(series: dict[str, Any], prices) -> bool:
+        if not series.get("has_series"):
+            return False
+        priced = False
+        for entry in series.get("points") or []:
+            if entry.get("kwh") is None:
+                continue
+            if prices.price_for_point(entry) is None:
+                return False
+            priced = True
+        return priced
+
+    def _flush_day_ledger(self) -> None:
+        # Ledger puts are buffered per month; one write per touched month at the end of a month pass.
+        ledger = self._get_day_ledger() if self._get_day_ledger else None
+        if ledger is not None:
+            ledger.flush()
+
     def compute_monthly_billing(
         self,
         cfg: dict[str, Any],
@@ -213,12 +468,17 @@ class BillingService:
         tzinfo,
         require_data: bool | None = None,
     ) -> dict[str, Any]:
-        if not re.match(r"^\d{4}-\d{2}$", month_str):
-            raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM.")
-        year, month_num = map(int, month_str.split("-"))
-        days_in_month = calendar.monthrange(year, month_num)[1]
-        start_date = datetime(year, month_num, 1).date()
-        today = datetime.now(tzinfo).date()
+        try:
+            return self._compute_monthly_billing(self._month_context(cfg, month_str, tzinfo), require_data)
+        finally:
+            self._flush_day_ledger()
+
+    def _compute_monthly_billing(self, ctx: _MonthContext, require_data: bool | None = None) -> dict[str, Any]:
+        cfg = ctx.cfg
+        month_str = ctx.month
+        days_in_month = ctx.days_in_month
+        start_date = ctx.start_date
+        today = ctx.today
         if require_data is None:
             require_data = start_date.year == today.year and start_date.month == today.month
 
@@ -247,7 +507,7 @@ class BillingService:
             date_obj = start_date + timedelta(days=day_offset)
             date_str = date_obj.strftime("%Y-%m-%d")
 
-            fee_snapshot = self._get_fee_snapshot_for_date(cfg, date_str, tzinfo)
+            fee_snapshot = ctx.fee_snapshot(date_str)
             fixed_cfg = fee_snapshot.get("fixed", {})
             daily_cfg = fixed_cfg.get("daily", {})
             monthly_cfg = fixed_cfg.get("monthly", {})
@@ -262,7 +522,8 @@ class BillingService:
             fixed_total += sum(daily_fixed.values()) + sum(monthly_fixed.values())
 
             if date_obj <= today:
-                invoice_day = self.calculate_daily_invoice(cfg, date_str)
+                aggregates = ctx.aggregates(date_str)
+                invoice_day = aggregates["invoice"]
                 totals = {
                     "kwh_total": invoice_day.get("kwh_total"),
                     "cost_total": invoice_day.get("variable_cost"),
@@ -273,7 +534,7 @@ class BillingService:
                     days_with_data += 1
                     for key in invoice_variable:
                         invoice_variable[key] += float(invoice_day.get("items", {}).get(key) or 0.0)
-                export_totals = self.calculate_daily_export_totals(cfg, date_str)
+                export_totals = aggregates["export"]
                 if export_totals["export_kwh_total"] is not None:
                     actual_export_kwh += export_totals["export_kwh_total"]
                 if export_totals["sell_total"] is not None:
@@ -435,20 +696,27 @@ class BillingService:
         return result
 
     def get_daily_summary(self, *, month: str, cfg: dict[str, Any], tzinfo) -> dict[str, Any]:
-        if not re.match(r"^\d{4}-\d{2}$", month):
-            raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM.")
+        try:
+            return self._get_daily_summary(self._month_context(cfg, month, tzinfo))
+        finally:
+            self._flush_day_ledger()
+
+    def _get_daily_summary(self, ctx: _MonthContext) -> dict[str, Any]:
+        cfg = ctx.cfg
+        month = ctx.month
+        tzinfo = ctx.tzinfo
         year, month_num = map(int, month.split("-"))
         start = datetime(year, month_num, 1)
         if month_num == 12:
             next_month = datetime(year + 1, 1, 1)
         else:
             next_month = datetime(year, month_num + 1, 1)
-        today = datetime.now(tzinfo).date()
+        today = ctx.today
         start_local = start.replace(tzinfo=tzinfo)
         next_month_local = next_month.replace(tzinfo=tzinfo)
         pv_totals_by_day = self._get_monthly_pv_totals(cfg, start_local, next_month_local, tzinfo)
 
-        days_in_month = calendar.monthrange(year, month_num)[1]
+        days_in_month = ctx.days_in_month
         days = []
         current = start
         total_kwh = 0.0
@@ -462,8 +730,9 @@ class BillingService:
         any_export_series = False
         while current < next_month and current.date() <= today:
             date_str = current.strftime("%Y-%m-%d")
-            totals = self.calculate_daily_totals(cfg, date_str)
-            export_totals = self.calculate_daily_export_totals(cfg, date_str)
+            aggregates = ctx.aggregates(date_str)
+            totals = aggregates["totals"]
+            export_totals = aggregates["export"]
             pv_kwh = pv_totals_by_day.get(date_str)
             if pv_kwh is not None:
                 any_pv_series = True
@@ -474,7 +743,7 @@ class BillingService:
                 any_export_series = True
 
             # Denní podíl fixních poplatků (aby měsíční součet = faktuře 1:1)
-            fee_snapshot = self._get_fee_snapshot_for_date(cfg, date_str, tzinfo)
+            fee_snapshot = ctx.fee_snapshot(date_str)
             daily_fixed, monthly_fixed = self._compute_fixed_breakdown_for_day(fee_snapshot, days_in_month)
             fixed_cost = sum(daily_fixed.values()) + sum(monthly_fixed.values())
             variable_cost = totals["cost_total"] or 0.0
@@ -520,7 +789,8 @@ class BillingService:
         }
         monthly_advance = max(float(cfg.get("mesicni_zaloha") or 0.0), 0.0)
         if monthly_advance > 0:
-            billing = self.compute_monthly_billing(cfg, month, tzinfo, require_data=False)
+            # Same context: every day's aggregates and fee snapshot are already loaded.
+            billing = self._compute_monthly_billing(ctx, require_data=False)
             projected_net_total = billing.get("projected", {}).get("net_total")
             if projected_net_total is not None:
                 summary.update(
@@ -539,36 +809,53 @@ class BillingService:
         }
 
     def get_invoice_detail_rows(self, cfg: dict[str, Any], month_str: str, tzinfo, *, kind: str) -> list[dict[str, Any]]:
+        return list(self.iter_invoice_detail_rows(cfg, month_str, tzinfo, kind=kind))
+
+    def iter_invoice_detail_rows(self, cfg: dict[str, Any], month_str: str, tzinfo, *, kind: str) -> Iterator[dict[str, Any]]:
+        """Invoice detail rows of one month, yielded day by day.
+
+        Arguments are validated and the first day's series, prices and fees (and
+        with them the month's series prefetch) are loaded eagerly, so the usual
+        failures (Influx down, bad config) raise before a streamed response starts.
+        """
         if kind not in {"supply", "export"}:
             raise ValueError("Invoice detail kind must be 'supply' or 'export'.")
-        if not re.match(r"^\d{4}-\d{2}$", month_str):
-            raise HTTPException(status_code=400, detail="Invalid month format. Use YYYY-MM.")
-        year, month_num = map(int, month_str.split("-"))
-        days_in_month = calendar.monthrange(year, month_num)[1]
-        today = datetime.now(tzinfo).date()
-        rows: list[dict[str, Any]] = []
-
-        for day_num in range(1, days_in_month + 1):
-            date_obj = datetime(year, month_num, day_num).date()
-            if date_obj > today:
+        ctx = self._month_context(cfg, month_str, tzinfo)
+        if ctx.start_date <= ctx.today:
+            first_day = ctx.start_date.isoformat()
+            if kind == "supply":
+                ctx.consumption(first_day)
+            else:
+                ctx.export(first_day)
+            ctx.prices(first_day)
+            ctx.fee_snapshot(first_day)
+        return self._iter_invoice_detail_rows(ctx, kind)
+
+    def _iter_invoice_detail_rows(self, ctx: _MonthContext, kind: str) -> Iterator[dict[str, Any]]:
+        cfg = ctx.cfg
+        for day_offset in range(ctx.days_in_month):
+            date_obj = ctx.start_date + timedelta(days=day_offset)
+            if date_obj > ctx.today:
                 break
             date_str = date_obj.isoformat()
-            series = self._get_consumption_points(cfg, date=date_str) if kind == "supply" else self._get_export_points(cfg, date=date_str)
-            price_map, price_map_utc = self._build_price_map_for_date(cfg, date_str, tzinfo)
-            fee_snapshot = self._get_fee_snapshot_for_date(cfg, date_str, tzinfo)
+            series = ctx.consumption(date_str) if kind == "supply" else ctx.export(date_str)
+            prices = ctx.prices(date_str)
+            fee_snapshot = ctx.fee_snapshot(date_str)
             coefficient_mwh = self._calculate_sell_coefficient(cfg, fee_snapshot) * 1000.0
+            skipped = 0
             for entry in series.get("points", []):
                 kwh = entry.get("kwh")
                 if kwh is None:
                     continue
-                time_local = datetime.fromisoformat(entry["time"])
-                price = price_map.get(time_local.strftime("%Y-%m-%d %H:%M"))
-                if price is None:
-                    time_utc = datetime.fromisoformat(entry["time_utc"].replace("Z", "+00:00"))
-                    price = price_map_utc.get(time_utc.strftime("%Y-%m-%d %H:%M"))
+                price = prices.price_for_point(entry)
                 if price is None:
                     continue
-                start_minutes = time_local.hour * 60 + time_local.minute
+                hour_minute = local_hour_minute(entry.get("time"))
+                if hour_minute is None:
+                    skipped += 1
+                    continue
+                hour, minute = hour_minute
+                start_minutes = hour * 60 + minute
                 end_minutes = start_minutes + 14
                 interval = f"{start_minutes // 60:02d}:{start_minutes % 60:02d} - {end_minutes // 60:02d}:{end_minutes % 60:02d}"
                 spot_czk_mwh = float(price.get("price_czk_mwh") or price["spot"] * 1000.0)
@@ -580,25 +867,49 @@ class BillingService:
                     effective_eur_mwh = float(spot_eur_mwh)
                     if kind == "export" and exchange_rate:
                         effective_eur_mwh -= coefficient_mwh / float(exchange_rate)
-                rows.append(
-                    {
-                        "date": date_str,
-                        "interval": interval,
-                        "spot_eur_mwh": spot_eur_mwh,
-                        "spot_czk_mwh": spot_czk_mwh,
-                        "effective_eur_mwh": effective_eur_mwh,
-                        "effective_czk_mwh": effective_czk_mwh,
-                        "kwh": float(kwh),
-                        "exchange_rate": exchange_rate,
-                        "result_eur": None if effective_eur_mwh is None else float(kwh) * effective_eur_mwh / 1000.0,
-                        "result_czk": float(kwh) * effective_czk_mwh / 1000.0,
-                    }
-                )
-        return rows
+                yield {
+                    "date": date_str,
+                    "interval": interval,
+                    "spot_eur_mwh": spot_eur_mwh,
+                    "spot_czk_mwh": spot_czk_mwh,
+                    "effective_eur_mwh": effective_eur_mwh,
+                    "effective_czk_mwh": effective_czk_mwh,
+                    "kwh": float(kwh),
+                    "exchange_rate": exchange_rate,
+                    "result_eur": None if effective_eur_mwh is None else float(kwh) * effective_eur_mwh / 1000.0,
+                    "result_czk": float(kwh) * effective_czk_mwh / 1000.0,
+                }
+            if skipped and self._logger:
+                self._logger.warning("Skipped %d priced points with unparseable time on %s", skipped, date_str)
+            # Only this day's rows are needed; drop its series so a streamed month stays small.
+            ctx.release_day(date_str)
 
     def get_billing_month(self, *, month: str, cfg: dict[str, Any], tzinfo) -> dict[str, Any]:
         return self.compute_monthly_billing(cfg, month, tzinfo)
 
+    def _compute_months(self, cfg: dict[str, Any], month_strs: list[str], tzinfo) -> list[dict[str, Any]]:
+        """compute_monthly_billing for each month, fanned out over a bounded pool; results keep input order."""
+        workers = min(self._year_workers, len(month_strs))
+        if workers <= 1:
+            return [self.compute_monthly_billing(cfg, month_str, tzinfo, require_data=False) for month_str in month_strs]
+        # Resolve the fee index on this thread first: it may persist today's snapshot, which
+        # must not race between workers. After that it and the price caches are read-mostly and locked.
+        self._get_fee_snapshot_for_date(cfg, datetime.now(tzinfo).strftime("%Y-%m-%d"), tzinfo)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="billing-year") as executor:
+            # Each task runs in a copy of the caller's context so the request memo stays visible.
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run,
+                    self.compute_monthly_billing,
+                    cfg,
+                    month_str,
+                    tzinfo,
+                    False,
+                )
+                for month_str in month_strs
+            ]
+            return [future.result() for future in futures]
+
     def get_billing_year(self, *, year: int, cfg: dict[str, Any], tzinfo) -> dict[str, Any]:
         now = datetime.now(tzinfo)
         current_year = now.year
@@ -617,9 +928,7 @@ class BillingService:
         totals_projected_total = 0.0
         totals_projected_net = 0.0
 
-        for month_num in range(1, end_month + 1):
-            month_str = f"{year}-{month_num:02d}"
-            data = self.compute_monthly_billing(cfg, month_str, tzinfo, require_data=False)
+        for data in self._compute_months(cfg, [f"{year}-{month_num:02d}" for month_num in range(1, end_month + 1)], tzinfo):
             months.append(
                 {
                     "month": data["month"],
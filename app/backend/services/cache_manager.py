@@ -1,9 +1,12 @@
 import json
 import logging
+import os
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from datetime import datetime, timezone
-from typing import Any, Tuple, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple, Optional
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -19,6 +22,54 @@ class SeriesCache:
         return self.cache_dir / f"{self.prefix}-{date_str}.json"
 
     def load(self, date_str: str, cache_key: Any) -> Tuple[Optional[Any], Optional[Path], Optional[dict]]:
+        return self._load_day(date_str, cache_key, None)
+
+    def load_range(
+        self,
+        start_date: date,
+        end_date: date,
+        cache_key: Any,
+        *,
+        is_usable: Optional[Callable[[str, Path, dict], bool]] = None,
+    ) -> Tuple[Dict[str, Tuple[Any, Path, dict]], List[str]]:
+        """Load every day in [start_date, end_date] with a single directory scan.
+
+        Returns ``(cached, missing)``: ``cached`` maps date strings to the same
+        ``(data, path, meta)`` triple ``load`` returns, ``missing`` lists days
+        with no entry, a key mismatch, or an entry rejected by ``is_usable``
+        (e.g. a stale file for today), in date order.
+        """
+        try:
+            present = {entry.name for entry in os.scandir(self.cache_dir)}
+        except OSError:
+            present = set()
+        cached: Dict[str, Tuple[Any, Path, dict]] = {}
+        missing: List[str] = []
+        day = start_date
+        while day <= end_date:
+            date_str = day.strftime("%Y-%m-%d")
+            day += timedelta(days=1)
+            data, path, meta = self._load_day(date_str, cache_key, present) if present else (None, None, None)
+            if data is None or (is_usable is not None and not is_usable(date_str, path, meta)):
+                missing.append(date_str)
+                continue
+            cached[date_str] = (data, path, meta)
+        return cached, missing
+
+    def save_range(self, payloads: Dict[str, Any], cache_key: Any, *, source: str | None = None, status: str = "complete") -> List[str]:
+        """Write several day payloads (date string -> data) under one cache key."""
+        saved = []
+        for date_str in sorted(payloads):
+            self.save(date_str, cache_key, payloads[date_str], source=source, status=status)
+            saved.append(date_str)
+        return saved
+
+    def _load_day(self, date_str: str, cache_key: Any, present: Optional[set]) -> Tuple[Optional[Any], Optional[Path], Optional[dict]]:
+        if present is not None and self.build_path(date_str).name not in present:
+            return None, None, None
+        return self._load_json(date_str, cache_key)
+
+    def _load_json(self, date_str: str, cache_key: Any) -> Tuple[Optional[Any], Optional[Path], Optional[dict]]:
         path = self.build_path(date_str)
         if not path.exists():
             return None, None, None
@@ -91,6 +142,49 @@ class SeriesCache:
             total_size = sum(file_path.stat().st_size for file_path in files)
         return {"dir": str(self.cache_dir), "count": len(files), "latest": latest, "size_bytes": total_size}
 
+class BoundedLRUCache:
+    """Thread-safe, size-bounded dict replacement with least-recently-used eviction."""
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock:
+            value = self._data[key]
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
 def build_series_cache_key(influx_cfg: dict, entity_id: str, version: int = 2) -> dict:
     return {
         "cache_version": version,
@@ -1,10 +1,11 @@
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException
 from requests import RequestException
 from api import parse_time_range, to_rfc3339
 from services.cache_manager import build_series_cache_key, SeriesCache
 from cache import should_use_daily_cache
+from services.influx_service import run_query_steps, run_query_steps_async
 from influx import (
     build_influx_from_clause_for_measurement,
     escape_influx_tag_value,
@@ -14,42 +15,11 @@ from influx import (
 
 logger = logging.getLogger("uvicorn.error")
 
-def get_consumption_points(
-    cfg, 
-    influx_service, 
-    consumption_cache: SeriesCache,
-    get_influx_cfg_fn,
-    get_total_tz_fn,
-    date=None, 
-    start=None, 
-    end=None,
-    cache_ttl=600
-):
-    influx = get_influx_cfg_fn(cfg)
-    tzinfo = get_total_tz_fn(influx.get("timezone"))
-    
-    cache_key = None
-    cached = None
-    cache_path = None
-    cache_meta = None
-    
-    if date and not start and not end:
-        cache_key = build_series_cache_key(influx, influx.get("entity_id"))
-        cached, cache_path, cache_meta = consumption_cache.load(date, cache_key)
-        if cached and should_use_daily_cache(date, cache_path, cache_meta, tzinfo, cache_ttl):
-            cached["tzinfo"] = tzinfo
-            cached["from_cache"] = True
-            cached["cache_fallback"] = False
-            return cached
-
-    start_utc, end_utc = parse_time_range(date, start, end, tzinfo)
 
+def _build_counter_query(influx, entity_id, start_utc, end_utc, interval):
     from_clause = build_influx_from_clause_for_measurement(influx, influx["measurement"])
     field = quote_influx_identifier(influx["field"])
-    entity_id = influx["entity_id"]
-    interval = validate_influx_interval(influx.get("interval", "15m"))
-
-    q = (
+    return (
         f'SELECT last({field}) AS "kwh_total" '
         f"FROM {from_clause} "
         f"WHERE time >= '{to_rfc3339(start_utc)}' AND time < '{to_rfc3339(end_utc)}' "
@@ -57,24 +27,10 @@ def get_consumption_points(
         f"GROUP BY time({interval}) fill(null)"
     )
 
-    try:
-        data = influx_service.influx_query(influx, q)
-    except (HTTPException, RequestException) as exc:
-        logger.warning("Influx consumption query failed (date=%s start=%s end=%s): %s", date, start, end, exc)
-        if cached:
-            cached["tzinfo"] = tzinfo
-            cached["from_cache"] = True
-            cached["cache_fallback"] = True
-            return cached
-        raise
-        
-    series = data.get("results", [{}])[0].get("series", [])
-    has_series = bool(series)
-    values = series[0]["values"] if series else []
 
+def _build_kwh_points(values, start_utc_ts, tzinfo):
     points = []
     prev_total = None
-    start_utc_ts = int(start_utc.timestamp())
     for ts, total in values:
         if total is None:
             kwh = None
@@ -99,54 +55,27 @@ def get_consumption_points(
                 "kwh": kwh,
             }
         )
+    return points
 
-    result = {
-        "range": {"start": to_rfc3339(start_utc), "end": to_rfc3339(end_utc)},
-        "interval": interval,
-        "entity_id": entity_id,
-        "points": points,
-        "tzinfo": tzinfo,
-        "has_series": has_series,
-        "from_cache": False,
-        "cache_fallback": False,
-    }
-    if date and not start and not end and has_series:
-        cache_payload = {
-            "range": result["range"],
-            "interval": result["interval"],
-            "entity_id": result["entity_id"],
-            "points": result["points"],
-            "has_series": result["has_series"],
-        }
-        consumption_cache.save(date, cache_key, cache_payload)
-    return result
-
-def get_export_points(
-    cfg, 
-    influx_service, 
-    export_cache: SeriesCache,
-    get_influx_cfg_fn,
-    get_total_tz_fn,
-    get_export_entity_id_fn,
-    date=None, 
-    start=None, 
+def _series_points_steps(
+    influx,
+    series_cache: SeriesCache,
+    tzinfo,
+    entity_id,
+    label,
+    date=None,
+    start=None,
     end=None,
     cache_ttl=600
 ):
-    influx = get_influx_cfg_fn(cfg)
-    tzinfo = get_total_tz_fn(influx.get("timezone"))
-    export_entity_id = get_export_entity_id_fn(cfg)
-    if not export_entity_id:
-        raise HTTPException(status_code=500, detail="Missing influxdb export_entity_id.")
-    
     cache_key = None
     cached = None
     cache_path = None
     cache_meta = None
-    
+
     if date and not start and not end:
-        cache_key = build_series_cache_key(influx, export_entity_id)
-        cached, cache_path, cache_meta = export_cache.load(date, cache_key)
+        cache_key = build_series_cache_key(influx, entity_id)
+        cached, cache_path, cache_meta = series_cache.load(date, cache_key)
         if cached and should_use_daily_cache(date, cache_path, cache_meta, tzinfo, cache_ttl):
             cached["tzinfo"] = tzinfo
             cached["from_cache"] = True
@@ -155,65 +84,31 @@ def get_export_points(
 
     start_utc, end_utc = parse_time_range(date, start, end, tzinfo)
 
-    from_clause = build_influx_from_clause_for_measurement(influx, influx["measurement"])
-    field = quote_influx_identifier(influx["field"])
     interval = validate_influx_interval(influx.get("interval", "15m"))
 
-    q = (
-        f'SELECT last({field}) AS "kwh_total" '
-        f"FROM {from_clause} "
-        f"WHERE time >= '{to_rfc3339(start_utc)}' AND time < '{to_rfc3339(end_utc)}' "
-        f'AND "entity_id"=\'{escape_influx_tag_value(export_entity_id)}\' '
-        f"GROUP BY time({interval}) fill(null)"
-    )
+    q = _build_counter_query(influx, entity_id, start_utc, end_utc, interval)
 
     try:
-        data = influx_service.influx_query(influx, q)
+        data = yield q
     except (HTTPException, RequestException) as exc:
-        logger.warning("Influx export query failed (date=%s start=%s end=%s): %s", date, start, end, exc)
+        logger.warning("Influx %s query failed (date=%s start=%s end=%s): %s", label, date, start, end, exc)
         if cached:
             cached["tzinfo"] = tzinfo
             cached["from_cache"] = True
             cached["cache_fallback"] = True
             return cached
         raise
-        
+
     series = data.get("results", [{}])[0].get("series", [])
     has_series = bool(series)
     values = series[0]["values"] if series else []
 
-    points = []
-    prev_total = None
-    start_utc_ts = int(start_utc.timestamp())
-    for ts, total in values:
-        if total is None:
-            kwh = None
-        elif prev_total is None:
-            kwh = total if ts == start_utc_ts else None
-        else:
-            diff = total - prev_total
-            if diff >= 0:
-                kwh = diff
-            else:
-                kwh = total
-        if total is not None:
-            prev_total = total
-
-        ts_dt_utc = datetime.fromtimestamp(ts, tz=timezone.utc)
-        ts_local = ts_dt_utc.astimezone(tzinfo)
-        points.append(
-            {
-                "time": ts_local.isoformat(),
-                "time_utc": to_rfc3339(ts_dt_utc),
-                "kwh_total": total,
-                "kwh": kwh,
-            }
-        )
+    points = _build_kwh_points(values, int(start_utc.timestamp()), tzinfo)
 
     result = {
         "range": {"start": to_rfc3339(start_utc), "end": to_rfc3339(end_utc)},
         "interval": interval,
-        "entity_id": export_entity_id,
+        "entity_id": entity_id,
         "points": points,
         "tzinfo": tzinfo,
         "has_series": has_series,
@@ -228,5 +123,213 @@ def get_export_points(
             "points": result["points"],
             "has_series": result["has_series"],
         }
-        export_cache.save(date, cache_key, cache_payload)
+        series_cache.save(date, cache_key, cache_payload)
     return result
+
+def consumption_points_steps(
+    cfg, 
+    consumption_cache: SeriesCache,
+    get_influx_cfg_fn,
+    get_total_tz_fn,
+    date=None, 
+    start=None, 
+    end=None,
+    cache_ttl=600
+):
+    influx = get_influx_cfg_fn(cfg)
+    tzinfo = get_total_tz_fn(influx.get("timezone"))
+    return (yield from _series_points_steps(
+        influx, consumption_cache, tzinfo, influx.get("entity_id"), "consumption", date, start, end, cache_ttl
+    ))
+
+def get_consumption_points(
+    cfg, 
+    influx_service, 
+    consumption_cache: SeriesCache,
+    get_influx_cfg_fn,
+    get_total_tz_fn,
+    date=None, 
+    start=None, 
+    end=None,
+    cache_ttl=600
+):
+    influx = get_influx_cfg_fn(cfg)
+    steps = consumption_points_steps(
+        cfg, consumption_cache, get_influx_cfg_fn, get_total_tz_fn, date, start, end, cache_ttl
+    )
+    return run_query_steps(steps, lambda query: influx_service.influx_query(influx, query))
+
+async def get_consumption_points_async(
+    cfg,
+    async_influx_service,
+    consumption_cache: SeriesCache,
+    get_influx_cfg_fn,
+    get_total_tz_fn,
+    date=None,
+    start=None,
+    end=None,
+    cache_ttl=600
+):
+    influx = get_influx_cfg_fn(cfg)
+    steps = consumption_points_steps(
+        cfg, consumption_cache, get_influx_cfg_fn, get_total_tz_fn, date, start, end, cache_ttl
+    )
+    # Cache reads/writes and point building happen between queries; keep them off the event loop.
+    return await run_query_steps_async(
+        steps, lambda query: async_influx_service.influx_query(influx, query), offload=True
+    )
+
+def export_points_steps(
+    cfg,
+    export_cache: SeriesCache,
+    get_influx_cfg_fn,
+    get_total_tz_fn,
+    get_export_entity_id_fn,
+    date=None,
+    start=None,
+    end=None,
+    cache_ttl=600
+):
+    influx = get_influx_cfg_fn(cfg)
+    tzinfo = get_total_tz_fn(influx.get("timezone"))
+    export_entity_id = get_export_entity_id_fn(cfg)
+    if not export_entity_id:
+        raise HTTPException(status_code=500, detail="Missing influxdb export_entity_id.")
+    return (yield from _series_points_steps(
+        influx, export_cache, tzinfo, export_entity_id, "export", date, start, end, cache_ttl
+    ))
+
+def get_export_points(
+    cfg, 
+    influx_service, 
+    export_cache: SeriesCache,
+    get_influx_cfg_fn,
+    get_total_tz_fn,
+    get_export_entity_id_fn,
+    date=None, 
+    start=None, 
+    end=None,
+    cache_ttl=600
+):
+    influx = get_influx_cfg_fn(cfg)
+    steps = export_points_steps(
+        cfg, export_cache, get_influx_cfg_fn, get_total_tz_fn, get_export_entity_id_fn, date, start, end, cache_ttl
+    )
+    return run_query_steps(steps, lambda query: influx_service.influx_query(influx, query))
+
+async def get_export_points_async(
+    cfg,
+    async_influx_service,
+    export_cache: SeriesCache,
+    get_influx_cfg_fn,
+    get_total_tz_fn,
+    get_export_entity_id_fn,
+    date=None,
+    start=None,
+    end=None,
+    cache_ttl=600
+):
+    influx = get_influx_cfg_fn(cfg)
+    steps = export_points_steps(
+        cfg, export_cache, get_influx_cfg_fn, get_total_tz_fn, get_export_entity_id_fn, date, start, end, cache_ttl
+    )
+    return await run_query_steps_async(
+        steps, lambda query: async_influx_service.influx_query(influx, query), offload=True
+    )
+
+def prefetch_series_range(
+    cfg,
+    influx_service,
+    series_cache: SeriesCache,
+    get_influx_cfg_fn,
+    get_total_tz_fn,
+    entity_id,
+    start_date,
+    end_date,
+    *,
+    label="series",
+    cache_ttl=600,
+    skip_date_fn=None,
+):
+    """Fill per-day series cache entries for a date range with a single Influx query.
+
+    The cache is scanned once via ``load_range``; days already served by a
+    usable entry (or skipped via ``skip_date_fn``, e.g. PND-covered days) are
+    not re-fetched. Each remaining day is split out of the combined result and
+    stored exactly as the per-day path would store it.
+
+    Returns ``{date_str: result}`` for every day that has series data, shaped
+    like ``get_*_points(date=...)`` results, so callers can use the payloads the
+    scan already read instead of loading each day again. Skipped days are left
+    out and go through the per-day path.
+    """
+    if not entity_id:
+        return {}
+    influx = get_influx_cfg_fn(cfg)
+    tzinfo = get_total_tz_fn(influx.get("timezone"))
+    end_date = min(end_date, datetime.now(tzinfo).date())
+    if start_date > end_date:
+        return {}
+
+    cache_key = build_series_cache_key(influx, entity_id)
+    cached, missing = series_cache.load_range(
+        start_date,
+        end_date,
+        cache_key,
+        is_usable=lambda date_str, cache_path, cache_meta: should_use_daily_cache(
+            date_str, cache_path, cache_meta, tzinfo, cache_ttl
+        ),
+    )
+    results = {}
+    for date_str, (data, _path, _meta) in cached.items():
+        if skip_date_fn and skip_date_fn(date_str):
+            continue
+        data["tzinfo"] = tzinfo
+        data["from_cache"] = True
+        data["cache_fallback"] = False
+        results[date_str] = data
+    if skip_date_fn:
+        missing = [date_str for date_str in missing if not skip_date_fn(date_str)]
+    # A single missing day is no cheaper to fetch in bulk than via the per-day path.
+    if len(missing) < 2:
+        return results
+
+    day_ranges = {date_str: parse_time_range(date_str, None, None, tzinfo) for date_str in missing}
+    range_start = day_ranges[missing[0]][0]
+    range_end = day_ranges[missing[-1]][1]
+    interval = validate_influx_interval(influx.get("interval", "15m"))
+    q = _build_counter_query(influx, entity_id, range_start, range_end, interval)
+
+    try:
+        data = influx_service.influx_query(influx, q)
+    except (HTTPException, RequestException) as exc:
+        logger.warning(
+            "Influx %s range prefetch failed (%s..%s): %s", label, missing[0], missing[-1], exc
+        )
+        return results
+
+    series = data.get("results", [{}])[0].get("series", [])
+    values = series[0]["values"] if series else []
+    values_by_day = {}
+    for ts, total in values:
+        day_key = datetime.fromtimestamp(ts, tz=timezone.utc).astimezone(tzinfo).strftime("%Y-%m-%d")
+        values_by_day.setdefault(day_key, []).append((ts, total))
+
+    payloads = {}
+    for date_str in missing:
+        day_values = values_by_day.get(date_str) or []
+        # Mirror the per-day path: only days with data are cached.
+        if not any(total is not None for _, total in day_values):
+            continue
+        start_utc, end_utc = day_ranges[date_str]
+        payloads[date_str] = {
+            "range": {"start": to_rfc3339(start_utc), "end": to_rfc3339(end_utc)},
+            "interval": interval,
+            "entity_id": entity_id,
+            "points": _build_kwh_points(day_values, int(start_utc.timestamp()), tzinfo),
+            "has_series": True,
+        }
+    series_cache.save_range(payloads, cache_key)
+    for date_str, payload in payloads.items():
+        results[date_str] = {**payload, "tzinfo": tzinfo, "from_cache": False, "cache_fallback": False}
+    return results
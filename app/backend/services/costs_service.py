@@ -5,23 +5,19 @@ from typing import Any, Callable
 
 from fastapi import HTTPException
 
+from services.price_vector import DayPriceVector, as_price_lookup
+
 
 class CostsService:
     def __init__(
         self,
         *,
         get_consumption_points: Callable[..., dict[str, Any]],
-        build_price_map_for_date: Callable[..., tuple[dict[str, dict[str, float]], dict[str, dict[str, float]]]],
+        build_price_map_for_date: Callable[..., DayPriceVector | tuple[dict[str, dict[str, float]], dict[str, dict[str, float]]]],
     ):
         self._get_consumption_points = get_consumption_points
         self._build_price_map_for_date = build_price_map_for_date
 
-    @staticmethod
-    def _slot_key_from_iso(value: str | None) -> str | None:
-        if not isinstance(value, str) or len(value) < 16 or value[10] != "T":
-            return None
-        return f"{value[:10]} {value[11:16]}"
-
     def get_costs(
         self,
         *,
@@ -30,8 +26,10 @@ class CostsService:
         end: str | None = None,
         cfg: dict[str, Any],
         tzinfo,
+        consumption: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
-        consumption = self._get_consumption_points(cfg, date=date, start=start, end=end)
+        if consumption is None:
+            consumption = self._get_consumption_points(cfg, date=date, start=start, end=end)
         tzinfo = consumption.get("tzinfo") or tzinfo
 
         if not consumption.get("has_series", False):
@@ -62,18 +60,14 @@ class CostsService:
             else:
                 start_dt = datetime.fromisoformat(consumption["range"]["start"].replace("Z", "+00:00"))
                 target_date = start_dt.astimezone(tzinfo).strftime("%Y-%m-%d")
-        price_map, price_map_utc = self._build_price_map_for_date(cfg, target_date, tzinfo)
+        prices = as_price_lookup(self._build_price_map_for_date(cfg, target_date, tzinfo))
 
         points = []
         total_kwh = 0.0
         total_cost = 0.0
         for entry in consumption["points"]:
             kwh = entry["kwh"]
-            local_key = self._slot_key_from_iso(entry.get("time"))
-            price = price_map.get(local_key) if local_key else None
-            if price is None:
-                utc_key = self._slot_key_from_iso(entry.get("time_utc"))
-                price = price_map_utc.get(utc_key) if utc_key else None
+            price = prices.price_for_point(entry)
             final_price = price["final"] if price else None
             cost = None
             if kwh is not None and final_price is not None:
@@ -1,8 +1,53 @@
 import io
 import csv
-from typing import Any, Dict, List
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List
+
+logger = logging.getLogger("uvicorn.error")
+
+# Streamed CSV bodies are flushed in chunks of roughly this many characters.
+CSV_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def month_range(start_month: str, end_month: str | None = None) -> List[str]:
+    """Months "YYYY-MM" from start_month through end_month inclusive (just start_month without an end)."""
+    start = datetime.strptime(start_month, "%Y-%m")
+    end = datetime.strptime(end_month, "%Y-%m") if end_month else start
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def csv_chunks(rows: Iterable[List[Any]], chunk_size: int = CSV_STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """Write rows through csv.writer and yield the text in chunks; the header row goes out on its own."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    first = True
+    for row in rows:
+        writer.writerow(row)
+        if first or buffer.tell() >= chunk_size:
+            first = False
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
 
 class DataExportService:
+    """CSV exports streamed month by month.
+
+    The first month is loaded before the stream is returned, so its errors
+    become a normal error response. A month that fails after the body has
+    started is logged and re-raised: the server then drops the connection
+    before the final chunk, so the client sees an incomplete transfer instead
+    of a CSV that looks complete (e.g. a totals row missing later months).
+    """
+
     def __init__(self, billing_service):
         self.billing_service = billing_service
 
@@ -12,58 +57,70 @@ class DataExportService:
         Sloupec Náklady obsahuje pouze variabilní náklady na import; fakturační
         položky a fixní poplatky jsou v samostatných invoice detail exportech.
         """
-        data = self.billing_service.get_daily_summary(month=month_str, cfg=cfg, tzinfo=tzinfo)
-        
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=';')
-        
+        return "".join(self.iter_monthly_csv(cfg, [month_str], tzinfo))
+
+    def iter_monthly_csv(self, cfg: Dict[str, Any], months: List[str], tzinfo) -> Iterator[str]:
+        """Provozní CSV pro jeden nebo více měsíců jako proud textových bloků; součtový řádek je na konci."""
+        # The first month is summarized eagerly so its errors surface before streaming starts.
+        first_summary = self.billing_service.get_daily_summary(month=months[0], cfg=cfg, tzinfo=tzinfo)
+        return csv_chunks(self._monthly_rows(cfg, months, tzinfo, first_summary))
+
+    def _monthly_rows(self, cfg: Dict[str, Any], months: List[str], tzinfo, first_summary) -> Iterator[List[Any]]:
         # Hlavička CSV
-        writer.writerow([
-            "Datum", 
-            "Nakup (kWh)", 
+        yield [
+            "Datum",
+            "Nakup (kWh)",
             "Vyrobeno FV (kWh)",
-            "Naklady (Kc)", 
-            "Prodej (kWh)", 
-            "Trzby (Kc)", 
-            "Netto (kWh)", 
+            "Naklady (Kc)",
+            "Prodej (kWh)",
+            "Trzby (Kc)",
+            "Netto (kWh)",
             "Netto (Kc)"
-        ])
-        
-        days = data.get("days", [])
+        ]
+
         total_kwh = 0.0
         total_cost = 0.0
         total_export = 0.0
         total_sell = 0.0
-        
-        for day in days:
-            kwh = day.get("kwh_total") or 0.0
-            pv_kwh = day.get("pv_kwh")
-            cost = day.get("cost_total") or 0.0
-            export = day.get("export_kwh_total") or 0.0
-            sell = day.get("sell_total") or 0.0
-            
-            net_kwh = kwh - export
-            net_cost = cost - sell
-            
-            writer.writerow([
-                day.get("date"),
-                f"{kwh:.3f}".replace('.', ','),
-                "" if pv_kwh is None else f"{float(pv_kwh):.3f}".replace('.', ','),
-                f"{cost:.2f}".replace('.', ','),
-                f"{export:.3f}".replace('.', ','),
-                f"{sell:.2f}".replace('.', ','),
-                f"{net_kwh:.3f}".replace('.', ','),
-                f"{net_cost:.2f}".replace('.', ',')
-            ])
-            total_kwh += kwh
-            total_cost += cost
-            total_export += export
-            total_sell += sell
-        
+
+        for index, month_str in enumerate(months):
+            if index == 0:
+                data = first_summary
+            else:
+                try:
+                    data = self.billing_service.get_daily_summary(month=month_str, cfg=cfg, tzinfo=tzinfo)
+                except Exception:
+                    logger.exception("Monthly CSV export failed at %s after streaming started; aborting", month_str)
+                    raise
+            for day in data.get("days", []):
+                kwh = day.get("kwh_total") or 0.0
+                pv_kwh = day.get("pv_kwh")
+                cost = day.get("cost_total") or 0.0
+                export = day.get("export_kwh_total") or 0.0
+                sell = day.get("sell_total") or 0.0
+
+                net_kwh = kwh - export
+                net_cost = cost - sell
+
+                yield [
+                    day.get("date"),
+                    f"{kwh:.3f}".replace('.', ','),
+                    "" if pv_kwh is None else f"{float(pv_kwh):.3f}".replace('.', ','),
+                    f"{cost:.2f}".replace('.', ','),
+                    f"{export:.3f}".replace('.', ','),
+                    f"{sell:.2f}".replace('.', ','),
+                    f"{net_kwh:.3f}".replace('.', ','),
+                    f"{net_cost:.2f}".replace('.', ',')
+                ]
+                total_kwh += kwh
+                total_cost += cost
+                total_export += export
+                total_sell += sell
+
         # Součtový řádek
         total_net_kwh = total_kwh - total_export
         total_net_cost = total_cost - total_sell
-        writer.writerow([
+        yield [
             "CELKEM",
             f"{total_kwh:.3f}".replace('.', ','),
             "",
@@ -72,35 +129,47 @@ class DataExportService:
             f"{total_sell:.2f}".replace('.', ','),
             f"{total_net_kwh:.3f}".replace('.', ','),
             f"{total_net_cost:.2f}".replace('.', ','),
-        ])
-            
-        return output.getvalue()
+        ]
 
     def generate_invoice_detail_csv(self, cfg: Dict[str, Any], month_str: str, tzinfo, *, kind: str) -> str:
-        rows = self.billing_service.get_invoice_detail_rows(cfg, month_str, tzinfo, kind=kind)
-        output = io.StringIO()
-        writer = csv.writer(output, delimiter=";")
+        return "".join(self.iter_invoice_detail_csv(cfg, [month_str], tzinfo, kind=kind))
+
+    def iter_invoice_detail_csv(self, cfg: Dict[str, Any], months: List[str], tzinfo, *, kind: str) -> Iterator[str]:
+        # The first month's rows are requested eagerly (arguments and the first day's inputs) so those
+        # failures become an error response before streaming starts.
+        first_rows = self.billing_service.iter_invoice_detail_rows(cfg, months[0], tzinfo, kind=kind)
+        return csv_chunks(self._invoice_detail_rows(cfg, months, tzinfo, kind, first_rows))
 
+    def _invoice_detail_rows(self, cfg, months: List[str], tzinfo, kind: str, first_rows) -> Iterator[List[Any]]:
         if kind == "supply":
-            writer.writerow(["Datum", "Interval", "EUR/MWh", "CZK/MWh", "Spotřeba kWh", "Kurz", "EUR", "CZK"])
-            for row in rows:
-                writer.writerow([
+            yield ["Datum", "Interval", "EUR/MWh", "CZK/MWh", "Spotřeba kWh", "Kurz", "EUR", "CZK"]
+        else:
+            yield ["Datum", "Interval", "Cena DT OTE EUR/MWh", "Cena DT OTE Kč/MWh", "Cena výkupu EUR/MWh", "Cena výkupu Kč/MWh", "Výkup kWh", "Kurz", "Výsledná cena EUR", "Výsledná cena Kč"]
+        for index, month_str in enumerate(months):
+            try:
+                rows = first_rows if index == 0 else self.billing_service.iter_invoice_detail_rows(cfg, month_str, tzinfo, kind=kind)
+                yield from self._invoice_detail_csv_rows(rows, kind)
+            except Exception:
+                logger.exception("Invoice detail CSV export failed at %s after streaming started; aborting", month_str)
+                raise
+
+    def _invoice_detail_csv_rows(self, rows, kind: str) -> Iterator[List[Any]]:
+        for row in rows:
+            if kind == "supply":
+                yield [
                     row["date"], row["interval"], self._csv_number(row["spot_eur_mwh"], 4),
                     self._csv_number(row["spot_czk_mwh"], 4), self._csv_number(row["kwh"], 5),
                     self._csv_number(row["exchange_rate"], 4), self._csv_number(row["result_eur"], 6),
                     self._csv_number(row["result_czk"], 6),
-                ])
-        else:
-            writer.writerow(["Datum", "Interval", "Cena DT OTE EUR/MWh", "Cena DT OTE Kč/MWh", "Cena výkupu EUR/MWh", "Cena výkupu Kč/MWh", "Výkup kWh", "Kurz", "Výsledná cena EUR", "Výsledná cena Kč"])
-            for row in rows:
-                writer.writerow([
+                ]
+            else:
+                yield [
                     row["date"], row["interval"], self._csv_number(row["spot_eur_mwh"], 4),
                     self._csv_number(row["spot_czk_mwh"], 4), self._csv_number(row["effective_eur_mwh"], 4),
                     self._csv_number(row["effective_czk_mwh"], 4), self._csv_number(row["kwh"], 5),
                     self._csv_number(row["exchange_rate"], 4), self._csv_number(row["result_eur"], 6),
                     self._csv_number(row["result_czk"], 6),
-                ])
-        return output.getvalue()
+                ]
 
     @staticmethod
     def _csv_number(value, decimals: int) -> str:
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger("uvicorn.error")
+
+# Days at least this old are final: prices, fees and the meter reading (PND arrives nightly) no longer move.
+DAY_LEDGER_FINAL_AFTER_DAYS = 2
+DAY_LEDGER_VERSION = 1
+
+
+def is_finalized_day(date_str: str, today: date) -> bool:
+    try:
+        day = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return False
+    return day <= today - timedelta(days=DAY_LEDGER_FINAL_AFTER_DAYS)
+
+
+class DayLedger:
+    """Persistent per-day billing aggregates for finalized days.
+
+    One JSON file per month (``YYYY-MM.json``) maps a date to
+    ``{"signature", "record"}``. The signature is built by the caller from
+    everything the day's totals depend on (series cache keys, price provider,
+    fee snapshot, PND presence); a record is only returned while it matches.
+
+    ``put`` only updates the in-memory month; ``flush`` writes every month
+    touched since the last flush, so a month pass costs one write per month
+    instead of one per day.
+    """
+
+    def __init__(self, directory: Path | str):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        self._months: dict[str, dict[str, Any]] = {}
+        self._dirty: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _month_path(self, month: str) -> Path:
+        return self.directory / f"{month}.json"
+
+    def _load_month(self, month: str) -> dict[str, Any]:
+        # Caller holds the lock.
+        days = self._months.get(month)
+        if days is not None:
+            return days
+        days = {}
+        path = self._month_path(month)
+        if path.exists():
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+                if payload.get("version") == DAY_LEDGER_VERSION and isinstance(payload.get("days"), dict):
+                    days = payload["days"]
+            except (OSError, ValueError) as exc:
+                logger.warning("Day ledger %s is unreadable, ignoring: %s", path, exc)
+        self._months[month] = days
+        return days
+
+    def _write_month(self, month: str, days: dict[str, Any]) -> None:
+        path = self._month_path(month)
+        if not days:
+            path.unlink(missing_ok=True)
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": DAY_LEDGER_VERSION, "days": days}, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    def get(self, date_str: str, signature: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._load_month(date_str[:7]).get(date_str)
+            if entry and entry.get("signature") == signature:
+                self.hits += 1
+                return entry.get("record")
+            self.misses += 1
+            return None
+
+    def put(self, date_str: str, signature: str, record: dict[str, Any]) -> None:
+        """Record a day in memory; it reaches disk on the next ``flush``."""
+        month = date_str[:7]
+        with self._lock:
+            self._load_month(month)[date_str] = {"signature": signature, "record": record}
+            self._dirty.add(month)
+
+    def flush(self) -> int:
+        """Write every month with unsaved puts. Returns the number of month files written."""
+        with self._lock:
+            written = 0
+            for month in sorted(self._dirty):
+                try:
+                    self._write_month(month, self._months.get(month) or {})
+                    written += 1
+                except OSError as exc:
+                    logger.warning("Day ledger write failed for %s: %s", month, exc)
+            self._dirty.clear()
+            return written
+
+    def invalidate(self, date_str: str | None = None) -> int:
+        """Drop one day's record, or every record when ``date_str`` is None. Returns the count removed."""
+        with self._lock:
+            if date_str:
+                month = date_str[:7]
+                days = self._load_month(month)
+                if days.pop(date_str, None) is None:
+                    return 0
+                self._write_month(month, days)
+                self._dirty.discard(month)
+                return 1
+            removed = 0
+            if self.directory.exists():
+                for path in self.directory.glob("*.json"):
+                    removed += len(self._load_month(path.stem))
+                    path.unlink(missing_ok=True)
+            self._months.clear()
+            self._dirty.clear()
+            return removed
+
+    def get_status(self) -> dict[str, Any]:
+        with self._lock:
+            files = sorted(self.directory.glob("*.json")) if self.directory.exists() else []
+            return {
+                "dir": str(self.directory),
+                "months": len(files),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
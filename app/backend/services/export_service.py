@@ -5,13 +5,15 @@ from typing import Any, Callable
 
 from fastapi import HTTPException
 
+from services.price_vector import DayPriceVector, as_price_lookup
+
 
 class ExportService:
     def __init__(
         self,
         *,
         get_export_points: Callable[..., dict[str, Any]],
-        build_price_map_for_date: Callable[..., tuple[dict[str, dict[str, float]], dict[str, dict[str, float]]]],
+        build_price_map_for_date: Callable[..., DayPriceVector | tuple[dict[str, dict[str, float]], dict[str, dict[str, float]]]],
         get_fee_snapshot_for_date: Callable[..., dict[str, Any]],
         calculate_sell_coefficient: Callable[..., float] | None = None,
         get_sell_coefficient_kwh: Callable[..., float] | None = None,
@@ -23,12 +25,6 @@ class ExportService:
         if self._calculate_sell_coefficient is None:
              raise TypeError("ExportService missing calculate_sell_coefficient or get_sell_coefficient_kwh")
 
-    @staticmethod
-    def _slot_key_from_iso(value: str | None) -> str | None:
-        if not isinstance(value, str) or len(value) < 16 or value[10] != "T":
-            return None
-        return f"{value[:10]} {value[11:16]}"
-
     def get_export(
         self,
         *,
@@ -37,8 +33,10 @@ class ExportService:
         end: str | None = None,
         cfg: dict[str, Any],
         tzinfo,
+        export: dict[str, Any] | None = None,
     ) -> dict[str, Any]:
-        export = self._get_export_points(cfg, date=date, start=start, end=end)
+        if export is None:
+            export = self._get_export_points(cfg, date=date, start=start, end=end)
         tzinfo = export.get("tzinfo") or tzinfo
 
         if not export.get("has_series", False):
@@ -69,7 +67,7 @@ class ExportService:
             else:
                 start_dt = datetime.fromisoformat(export["range"]["start"].replace("Z", "+00:00"))
                 target_date = start_dt.astimezone(tzinfo).strftime("%Y-%m-%d")
-        price_map, price_map_utc = self._build_price_map_for_date(cfg, target_date, tzinfo)
+        prices = as_price_lookup(self._build_price_map_for_date(cfg, target_date, tzinfo))
 
         coef_by_date: dict[str, float] = {}
         points = []
@@ -77,11 +75,7 @@ class ExportService:
         total_sell = 0.0
         for entry in export["points"]:
             kwh = entry["kwh"]
-            local_key = self._slot_key_from_iso(entry.get("time"))
-            price = price_map.get(local_key) if local_key else None
-            if price is None:
-                utc_key = self._slot_key_from_iso(entry.get("time_utc"))
-                price = price_map_utc.get(utc_key) if utc_key else None
+            price = prices.price_for_point(entry)
             spot_price = price["spot"] if price else None
             date_key = (entry.get("time") or "")[:10] if isinstance(entry.get("time"), str) else None
             if not date_key:
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from bisect import bisect_right, insort
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger("uvicorn.error")
+
+FX_RATE_STORE_VERSION = 1
+
+
+def _next_day(date_str: str) -> str:
+    return (datetime.strptime(date_str, "%Y-%m-%d").date() + timedelta(days=1)).isoformat()
+
+
+class FxRateStore:
+    """Published EUR/CZK fixings with the date ranges known to contain no other fixing.
+
+    A fixing applies to every following day until the next one, but that is only
+    safe to answer from the store when the whole gap is covered by a range that
+    was checked against CNB. Both lookups are bisections over sorted lists, so a
+    known date resolves in O(log n) without network. With a path the store is
+    persisted as one JSON file; without one it lives in memory only.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._rates: dict[str, float] = {}
+        self._dates: list[str] = []
+        self._covered: list[list[str]] = []
+        self._covered_starts: list[str] = []
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            logger.warning("FX rate store %s is unreadable, ignoring: %s", self.path, exc)
+            return
+        if payload.get("version") != FX_RATE_STORE_VERSION:
+            return
+        self._rates = {str(day): float(rate) for day, rate in (payload.get("rates") or {}).items()}
+        self._dates = sorted(self._rates)
+        for start, end in payload.get("covered") or []:
+            self._cover(str(start), str(end))
+
+    def _save(self) -> None:
+        # Caller holds the lock.
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": FX_RATE_STORE_VERSION, "rates": self._rates, "covered": self._covered}, f)
+            tmp_path.replace(self.path)
+        except OSError as exc:
+            logger.warning("FX rate store write failed (%s): %s", self.path, exc)
+
+    def _cover(self, start: str, end: str) -> None:
+        # Caller holds the lock. Keeps ranges sorted and merges overlapping or adjacent ones.
+        if end < start:
+            return
+        merged = []
+        for existing_start, existing_end in self._covered:
+            if existing_end < start and _next_day(existing_end) != start:
+                merged.append([existing_start, existing_end])
+            elif existing_start > end and _next_day(end) != existing_start:
+                merged.append([existing_start, existing_end])
+            else:
+                start = min(start, existing_start)
+                end = max(end, existing_end)
+        merged.append([start, end])
+        merged.sort()
+        self._covered = merged
+        self._covered_starts = [item[0] for item in merged]
+
+    def rate_on(self, date_str: str) -> float | None:
+        """Latest fixing published on or before date_str, or None when the store cannot vouch for it."""
+        with self._lock:
+            pos = bisect_right(self._dates, date_str)
+            if pos:
+                fixing = self._dates[pos - 1]
+                if fixing == date_str:
+                    self.hits += 1
+                    return self._rates[fixing]
+                index = bisect_right(self._covered_starts, fixing) - 1
+                if index >= 0 and self._covered[index][1] >= date_str:
+                    self.hits += 1
+                    return self._rates[fixing]
+            self.misses += 1
+            return None
+
+    def add(self, rates: dict[str, float], covered: tuple[str, str] | None = None) -> None:
+        """Record fixings and, optionally, a date range in which they are the only ones."""
+        with self._lock:
+            for day, rate in rates.items():
+                if day not in self._rates:
+                    insort(self._dates, day)
+                self._rates[day] = float(rate)
+            if covered:
+                self._cover(*covered)
+            self._save()
+
+    def get_status(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "path": str(self.path) if self.path else None,
+                "rates": len(self._rates),
+                "covered": [list(item) for item in self._covered],
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,6 +1,10 @@
+import asyncio
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 
 from fastapi import HTTPException
+import httpx
 import requests
 
 from api import to_rfc3339
@@ -13,6 +17,101 @@ from influx import (
 )
 from battery import get_slot_index_for_dt
 
+# How long a resolved (measurement, entity_id) pair is reused before probing all candidates again.
+SERIES_RESOLUTION_TTL_SECONDS = 600
+# Upper bound of Influx requests one event loop keeps in flight at once.
+ASYNC_INFLUX_MAX_CONCURRENCY = 10
+
+
+
+def run_query_steps(steps, query_fn):
+    """Drive a query-step generator with a blocking ``query_fn``.
+
+    Step generators yield InfluxQL strings and are sent the decoded response
+    (or have the query's exception thrown in); their return value is the result.
+    Keeping the I/O out of them lets the sync and async clients share one
+    implementation.
+    """
+    try:
+        query = next(steps)
+        while True:
+            try:
+                data = query_fn(query)
+            except Exception as exc:
+                query = steps.throw(exc)
+            else:
+                query = steps.send(data)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def run_query_steps_async(steps, query_fn, *, offload=False):
+    """Async counterpart of run_query_steps; ``query_fn`` returns an awaitable.
+
+    With ``offload`` every step between queries runs in a worker thread, for
+    generators that read or write caches or build large point lists there.
+    """
+    def step(method, *args):
+        # StopIteration cannot cross a thread future, so the outcome is returned as a pair.
+        try:
+            return False, method(*args)
+        except StopIteration as stop:
+            return True, stop.value
+
+    async def advance(method, *args):
+        if offload:
+            return await asyncio.to_thread(step, method, *args)
+        return step(method, *args)
+
+    done, value = await advance(next, steps)
+    while not done:
+        try:
+            data = await query_fn(value)
+        except Exception as exc:
+            done, value = await advance(steps.throw, exc)
+        else:
+            done, value = await advance(steps.send, data)
+    return value
+
+def build_influx_request(influx, query):
+    """URL, query-string params, form body and auth for one /query request.
+
+    Multi-statement queries (candidate probes, batched latest values) go in a
+    POST form body so a long statement list never hits URL length limits;
+    single statements stay plain GETs.
+    """
+    host = influx["host"]
+    port = influx.get("port", 8086)
+    url = f"http://{host}:{port}/query"
+    params = {"db": influx["database"], "epoch": "s"}
+    form = None
+    if ";" in query:
+        form = {"q": query}
+    else:
+        params["q"] = query
+    username = influx.get("username")
+    password = influx.get("password")
+    auth = None
+    if username and password and password != "CHANGE_ME":
+        auth = (username, password)
+    return url, params, form, auth
+
+
+def check_influx_response(data):
+    """Raise for a request-level error or when every statement failed.
+
+    With several statements a single failing one is left in its result for the
+    caller to skip (see ``_statement_values``); only a response with no usable
+    statement at all is an error.
+    """
+    if data.get("error"):
+        raise HTTPException(status_code=500, detail=data["error"])
+    results = data.get("results") or []
+    errors = [result.get("error") for result in results if isinstance(result, dict)]
+    if results and all(errors) and len(errors) == len(results):
+        raise HTTPException(status_code=500, detail=errors[0])
+    return data
+
 
 class InfluxService:
     def __init__(self, logger):
@@ -26,25 +125,17 @@ class InfluxService:
         )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
+        self._resolution_lock = threading.Lock()
+        self._resolutions = {}
 
     def influx_query(self, influx, query):
-        host = influx["host"]
-        port = influx.get("port", 8086)
-        db = influx["database"]
-        url = f"http://{host}:{port}/query"
-        params = {"db": db, "q": query, "epoch": "s"}
-        username = influx.get("username")
-        password = influx.get("password")
-        auth = None
-        if username and password and password != "CHANGE_ME":
-            auth = (username, password)
-        
-        r = self.session.get(url, params=params, auth=auth, timeout=15)
+        url, params, form, auth = build_influx_request(influx, query)
+        if form is None:
+            r = self.session.get(url, params=params, auth=auth, timeout=15)
+        else:
+            r = self.session.post(url, params=params, data=form, auth=auth, timeout=15)
         r.raise_for_status()
-        data = r.json()
-        if data.get("results") and data["results"][0].get("error"):
-            raise HTTPException(status_code=500, detail=data["results"][0]["error"])
-        return data
+        return check_influx_response(r.json())
 
     def get_measurement_candidates(self, influx, preferred=None):
         configured = influx.get("measurement") if isinstance(influx, dict) else None
@@ -85,7 +176,97 @@ class InfluxService:
             _add(f"sensor.{raw}")
         return candidates
 
-    def query_entity_series(
+    def _resolution_key(self, influx, entity_id, measurements):
+        return (
+            influx.get("host"),
+            influx.get("port", 8086),
+            influx.get("database"),
+            influx.get("retention_policy"),
+            influx.get("field"),
+            entity_id,
+            tuple(measurements),
+        )
+
+    def _get_resolution(self, key):
+        with self._resolution_lock:
+            cached = self._resolutions.get(key)
+            if not cached:
+                return None
+            resolved_at, pair = cached
+            if time.monotonic() - resolved_at > SERIES_RESOLUTION_TTL_SECONDS:
+                self._resolutions.pop(key, None)
+                return None
+            return pair
+
+    def _remember_resolution(self, key, pair):
+        with self._resolution_lock:
+            self._resolutions[key] = (time.monotonic(), pair)
+
+    @staticmethod
+    def _results_by_statement(data):
+        results_by_statement = {}
+        for position, result in enumerate(data.get("results", [])):
+            statement_id = result.get("statement_id", position) if isinstance(result, dict) else position
+            results_by_statement[statement_id] = result if isinstance(result, dict) else {}
+        return results_by_statement
+
+    @staticmethod
+    def _statement_values(results_by_statement, index):
+        result = results_by_statement.get(index, {})
+        if result.get("error"):
+            return None
+        series = result.get("series", [])
+        if series and series[0].get("values"):
+            return series[0]["values"]
+        return None
+
+    def _run_steps(self, influx, steps):
+        return run_query_steps(steps, lambda query: self.influx_query(influx, query))
+
+    def _probe_entity_candidates(self, influx, entity_id, measurement_candidates, build_statement):
+        """Find the first (measurement, entity_id) candidate with data.
+
+        A memoised winner is queried directly; otherwise every candidate is sent
+        as one multi-statement InfluxQL request and the results are checked in
+        candidate order. This is a step generator: it yields query strings, is
+        sent the decoded responses and returns ``(values, used_entity_id,
+        used_measurement)``, so the sync and async clients share it.
+        """
+        measurements = self.get_measurement_candidates(influx, measurement_candidates)
+        pairs = [
+            (measurement, candidate_entity_id)
+            for measurement in measurements
+            for candidate_entity_id in self.get_entity_id_candidates(entity_id)
+        ]
+        if not pairs:
+            return [], None, None
+        key = self._resolution_key(influx, entity_id, measurements)
+        remembered = self._get_resolution(key)
+        if remembered in pairs:
+            try:
+                data = yield build_statement(*remembered)
+            except HTTPException as exc:
+                # The memoised pair itself failed (e.g. a dropped measurement); re-probe every candidate.
+                self.logger.debug("Memoised series pair failed for %s: %s", entity_id, exc.detail)
+                data = {}
+            values = self._statement_values(self._results_by_statement(data), 0)
+            if values:
+                return values, remembered[1], remembered[0]
+
+        data = yield ";".join(build_statement(*pair) for pair in pairs)
+        results_by_statement = self._results_by_statement(data)
+        for index, (measurement, candidate_entity_id) in enumerate(pairs):
+            error = results_by_statement.get(index, {}).get("error")
+            if error:
+                self.logger.debug("Series candidate %s/%s failed: %s", measurement, candidate_entity_id, error)
+                continue
+            values = self._statement_values(results_by_statement, index)
+            if values:
+                self._remember_resolution(key, (measurement, candidate_entity_id))
+                return values, candidate_entity_id, measurement
+        return [], None, None
+
+    def _entity_series_steps(
         self,
         influx,
         entity_id,
@@ -100,30 +281,22 @@ class InfluxService:
         if not entity_id:
             return []
         field = quote_influx_identifier(influx["field"])
-        values = []
-        used_entity_id = None
-        used_measurement = None
         aggregate = validate_influx_aggregate(aggregate_fn)
         interval = validate_influx_interval(interval)
-        for measurement in self.get_measurement_candidates(influx, measurement_candidates):
+
+        def build_statement(measurement, candidate_entity_id):
             from_clause = build_influx_from_clause_for_measurement(influx, measurement)
-            for candidate_entity_id in self.get_entity_id_candidates(entity_id):
-                q = (
-                    f'SELECT {aggregate}({field}) AS "value" '
-                    f"FROM {from_clause} "
-                    f"WHERE time >= '{to_rfc3339(start_utc)}' AND time < '{to_rfc3339(end_utc)}' "
-                    f'AND "entity_id"=\'{escape_influx_tag_value(candidate_entity_id)}\' '
-                    f"GROUP BY time({interval}) fill(null)"
-                )
-                data = self.influx_query(influx, q)
-                series = data.get("results", [{}])[0].get("series", [])
-                if series:
-                    values = series[0]["values"]
-                    used_entity_id = candidate_entity_id
-                    used_measurement = measurement
-                    break
-            if used_entity_id:
-                break
+            return (
+                f'SELECT {aggregate}({field}) AS "value" '
+                f"FROM {from_clause} "
+                f"WHERE time >= '{to_rfc3339(start_utc)}' AND time < '{to_rfc3339(end_utc)}' "
+                f'AND "entity_id"=\'{escape_influx_tag_value(candidate_entity_id)}\' '
+                f"GROUP BY time({interval}) fill(null)"
+            )
+
+        values, used_entity_id, used_measurement = yield from self._probe_entity_candidates(
+            influx, entity_id, measurement_candidates, build_statement
+        )
         if used_entity_id and used_entity_id != entity_id:
             self.logger.debug("Entity fallback matched for series: %s -> %s", entity_id, used_entity_id)
         if used_measurement and used_measurement != influx.get("measurement"):
@@ -149,7 +322,27 @@ class InfluxService:
             )
         return points
 
-    def query_entity_last_value(
+    def query_entity_series(self, influx, *args, **kwargs):
+        return self._run_steps(influx, self._entity_series_steps(influx, *args, **kwargs))
+
+    @staticmethod
+    def _last_value_statement_builder(influx, lookback_hours):
+        end_utc = datetime.now(timezone.utc)
+        start_utc = end_utc - timedelta(hours=max(1, int(lookback_hours)))
+        field = quote_influx_identifier(influx["field"])
+
+        def build_statement(measurement, candidate_entity_id):
+            from_clause = build_influx_from_clause_for_measurement(influx, measurement)
+            return (
+                f'SELECT last({field}) AS "value" '
+                f"FROM {from_clause} "
+                f"WHERE time >= '{to_rfc3339(start_utc)}' AND time <= '{to_rfc3339(end_utc)}' "
+                f'AND "entity_id"=\'{escape_influx_tag_value(candidate_entity_id)}\''
+            )
+
+        return build_statement
+
+    def _entity_last_value_steps(
         self,
         influx,
         entity_id,
@@ -160,36 +353,22 @@ class InfluxService:
     ):
         if not entity_id:
             return None
-        end_utc = datetime.now(timezone.utc)
-        start_utc = end_utc - timedelta(hours=max(1, int(lookback_hours)))
-        field = quote_influx_identifier(influx["field"])
-        values = []
-        used_entity_id = None
-        used_measurement = None
-        for measurement in self.get_measurement_candidates(influx, measurement_candidates):
-            from_clause = build_influx_from_clause_for_measurement(influx, measurement)
-            for candidate_entity_id in self.get_entity_id_candidates(entity_id):
-                q = (
-                    f'SELECT last({field}) AS "value" '
-                    f"FROM {from_clause} "
-                    f"WHERE time >= '{to_rfc3339(start_utc)}' AND time <= '{to_rfc3339(end_utc)}' "
-                    f'AND "entity_id"=\'{escape_influx_tag_value(candidate_entity_id)}\''
-                )
-                data = self.influx_query(influx, q)
-                series = data.get("results", [{}])[0].get("series", [])
-                if series and series[0].get("values"):
-                    values = series[0]["values"]
-                    used_entity_id = candidate_entity_id
-                    used_measurement = measurement
-                    break
-            if used_entity_id:
-                break
+        build_statement = self._last_value_statement_builder(influx, lookback_hours)
+        values, used_entity_id, used_measurement = yield from self._probe_entity_candidates(
+            influx, entity_id, measurement_candidates, build_statement
+        )
         if not values:
             return None
         if used_entity_id and used_entity_id != entity_id:
             self.logger.debug("Entity fallback matched for last value: %s -> %s", entity_id, used_entity_id)
         if used_measurement and used_measurement != influx.get("measurement"):
             self.logger.debug("Measurement fallback matched for last value: %s -> %s", entity_id, used_measurement)
+        return self._build_last_value_record(values, used_measurement, numeric, tzinfo)
+
+    def query_entity_last_value(self, influx, *args, **kwargs):
+        return self._run_steps(influx, self._entity_last_value_steps(influx, *args, **kwargs))
+
+    def _build_last_value_record(self, values, used_measurement, numeric, tzinfo):
         ts, raw_value = values[0]
         value = raw_value
         if numeric and raw_value is not None:
@@ -207,6 +386,97 @@ class InfluxService:
             "unit": used_measurement,
         }
 
+    def _last_values_steps(self, influx, entities, tzinfo=None, lookback_hours=72):
+        build_statement = self._last_value_statement_builder(influx, lookback_hours)
+        results = {key: None for key in entities}
+        plans = {}
+        for key, spec in entities.items():
+            entity_id = (spec or {}).get("entity_id")
+            if not entity_id:
+                continue
+            measurements = self.get_measurement_candidates(influx, spec.get("measurement_candidates"))
+            pairs = [
+                (measurement, candidate_entity_id)
+                for measurement in measurements
+                for candidate_entity_id in self.get_entity_id_candidates(entity_id)
+            ]
+            if pairs:
+                plans[key] = (spec, self._resolution_key(influx, entity_id, measurements), pairs)
+
+        pending = {}
+        for key, (spec, resolution_key, pairs) in plans.items():
+            remembered = self._get_resolution(resolution_key)
+            pending[key] = [remembered] if remembered in pairs else pairs
+        for _attempt in range(2):
+            if not pending:
+                break
+            statements = []
+            owners = []
+            for key, pairs in pending.items():
+                for pair in pairs:
+                    statements.append(build_statement(*pair))
+                    owners.append((key, pair))
+            data = yield ";".join(statements)
+            results_by_statement = self._results_by_statement(data)
+            resolved = set()
+            for index, (key, (measurement, candidate_entity_id)) in enumerate(owners):
+                if key in resolved:
+                    continue
+                values = self._statement_values(results_by_statement, index)
+                if not values:
+                    continue
+                spec, resolution_key, _pairs = plans[key]
+                self._remember_resolution(resolution_key, (measurement, candidate_entity_id))
+                results[key] = self._build_last_value_record(values, measurement, spec.get("numeric", True), tzinfo)
+                resolved.add(key)
+            # Only memoised single-pair probes that came back empty deserve a full retry.
+            pending = {
+                key: plans[key][2]
+                for key, pairs in pending.items()
+                if key not in resolved and len(pairs) == 1 and len(plans[key][2]) > 1
+            }
+        return results
+
+    def query_last_values(self, influx, entities, tzinfo=None, lookback_hours=72):
+        """Latest value for several entities with one multi-statement request.
+
+        ``entities`` maps a caller-chosen key to ``{"entity_id", "measurement_candidates",
+        "numeric"}``; the result maps the same keys to the record
+        ``query_entity_last_value`` would return (or None). Entities with a memoised
+        (measurement, entity_id) pair are asked only for that pair; if it has no data
+        they are re-probed with all candidates in a second request.
+        """
+        return self._run_steps(influx, self._last_values_steps(influx, entities, tzinfo, lookback_hours))
+
+    def safe_query_last_values(self, influx, entities, tzinfo=None, lookback_hours=72):
+        """query_last_values that never raises.
+
+        A failing statement only loses its own entity; if the batched request as a
+        whole fails, every entity is queried on its own so one bad entity (or an
+        oversized batch) does not blank the rest.
+        """
+        try:
+            return self.query_last_values(influx, entities, tzinfo=tzinfo, lookback_hours=lookback_hours)
+        except (HTTPException, requests.RequestException, ValueError, TypeError) as exc:
+            self.logger.warning(
+                "Batched latest-value query failed (%s), querying entities one by one: %s", ", ".join(entities), exc
+            )
+        return {
+            key: self.safe_query_entity_last_value(
+                influx, tzinfo=tzinfo, lookback_hours=lookback_hours, label=key, **self._last_value_spec_kwargs(spec)
+            )
+            for key, spec in entities.items()
+        }
+
+    @staticmethod
+    def _last_value_spec_kwargs(spec):
+        spec = spec or {}
+        return {
+            "entity_id": spec.get("entity_id"),
+            "numeric": spec.get("numeric", True),
+            "measurement_candidates": spec.get("measurement_candidates"),
+        }
+
     def safe_query_entity_last_value(
         self,
         influx,
@@ -230,7 +500,7 @@ class InfluxService:
             self.logger.warning("Optional entity query failed (%s / %s): %s", label or "entity", entity_id, exc)
             return None
 
-    def query_recent_slot_profile_by_day_type(
+    def _recent_slot_profile_steps(
         self,
         influx,
         entity_id,
@@ -243,13 +513,10 @@ class InfluxService:
         if not entity_id:
             return {}
         
-        # Agregujeme průměry po slotech (index 0-95) pro pracovní dny / víkend
-        is_weekend = target_date.weekday() >= 5
-        
         end_utc = datetime.now(timezone.utc)
         start_utc = end_utc - timedelta(days=days)
         
-        points = self.query_entity_series(
+        points = yield from self._entity_series_steps(
             influx,
             entity_id,
             start_utc,
@@ -259,20 +526,166 @@ class InfluxService:
             numeric=True,
             measurement_candidates=measurement_candidates
         )
+        return build_slot_profile_by_day_type(points, target_date)
+
+    def query_recent_slot_profile_by_day_type(self, influx, *args, **kwargs):
+        return self._run_steps(influx, self._recent_slot_profile_steps(influx, *args, **kwargs))
+
+
+
+class AsyncInfluxService:
+    """Asyncio variant of InfluxService on a shared httpx.AsyncClient.
+
+    Query building, candidate probing and the resolution memo come from the wrapped
+    InfluxService (its step generators are driven with awaited requests), so both
+    clients resolve entities identically. One keep-alive client and one semaphore
+    are kept per event loop.
+    """
+
+    def __init__(self, influx_service, max_concurrency=ASYNC_INFLUX_MAX_CONCURRENCY):
+        self.sync = influx_service
+        self.logger = influx_service.logger
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def _client_for_loop(self):
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            # Loops that have since been closed (asyncio.run per call, test loops) cannot use or close
+            # their clients any more; drop them so they do not pile up.
+            for stale_loop in [item for item in self._clients if item.is_closed()]:
+                self._clients.pop(stale_loop, None)
+            entry = self._clients.get(loop)
+            if entry is None or entry[0].is_closed:
+                client = httpx.AsyncClient(
+                    timeout=15,
+                    limits=httpx.Limits(
+                        max_connections=self.max_concurrency * 2,
+                        max_keepalive_connections=self.max_concurrency,
+                    ),
+                    transport=httpx.AsyncHTTPTransport(retries=3),
+                )
+                entry = (client, asyncio.Semaphore(self.max_concurrency))
+                self._clients[loop] = entry
+            return entry
+
+    async def influx_query(self, influx, query):
+        url, params, form, auth = build_influx_request(influx, query)
+        client, semaphore = self._client_for_loop()
+        try:
+            async with semaphore:
+                if form is None:
+                    r = await client.get(url, params=params, auth=auth)
+                else:
+                    r = await client.post(url, params=params, data=form, auth=auth)
+            r.raise_for_status()
+        except httpx.HTTPError as exc:
+            # Callers (and the safe_* wrappers) already handle requests' exception family.
+            raise requests.RequestException(str(exc)) from exc
+        return check_influx_response(r.json())
+
+    async def _run_steps(self, influx, steps):
+        return await run_query_steps_async(steps, lambda query: self.influx_query(influx, query))
+
+    async def query_entity_series(self, influx, *args, **kwargs):
+        return await self._run_steps(influx, self.sync._entity_series_steps(influx, *args, **kwargs))
+
+    async def query_entity_last_value(self, influx, *args, **kwargs):
+        return await self._run_steps(influx, self.sync._entity_last_value_steps(influx, *args, **kwargs))
+
+    async def query_last_values(self, influx, entities, tzinfo=None, lookback_hours=72):
+        return await self._run_steps(
+            influx, self.sync._last_values_steps(influx, entities, tzinfo, lookback_hours)
+        )
+
+    async def safe_query_last_values(self, influx, entities, tzinfo=None, lookback_hours=72):
+        try:
+            return await self.query_last_values(influx, entities, tzinfo=tzinfo, lookback_hours=lookback_hours)
+        except (HTTPException, requests.RequestException, ValueError, TypeError) as exc:
+            self.logger.warning(
+                "Batched latest-value query failed (%s), querying entities one by one: %s", ", ".join(entities), exc
+            )
+        keys = list(entities)
+        values = await asyncio.gather(
+            *(
+                self.safe_query_entity_last_value(
+                    influx,
+                    tzinfo=tzinfo,
+                    lookback_hours=lookback_hours,
+                    label=key,
+                    **self.sync._last_value_spec_kwargs(entities[key]),
+                )
+                for key in keys
+            )
+        )
+        return dict(zip(keys, values))
+
+    async def safe_query_entity_last_value(
+        self,
+        influx,
+        entity_id,
+        tzinfo=None,
+        lookback_hours=72,
+        numeric=True,
+        label=None,
+        measurement_candidates=None,
+    ):
+        try:
+            return await self.query_entity_last_value(
+                influx,
+                entity_id,
+                tzinfo=tzinfo,
+                lookback_hours=lookback_hours,
+                numeric=numeric,
+                measurement_candidates=measurement_candidates,
+            )
+        except (HTTPException, requests.RequestException, ValueError, TypeError) as exc:
+            self.logger.warning("Optional entity query failed (%s / %s): %s", label or "entity", entity_id, exc)
+            return None
+
+    async def query_recent_slot_profile_by_day_type(self, influx, *args, **kwargs):
+        return await self._run_steps(influx, self.sync._recent_slot_profile_steps(influx, *args, **kwargs))
+
+    async def aclose(self, timeout=5.0):
+        """Close every pooled client; clients of other running loops are closed on their loop and awaited."""
+        with self._clients_lock:
+            entries = list(self._clients.items())
+            self._clients.clear()
+        current = asyncio.get_running_loop()
+        pending = []
+        for loop, (client, _semaphore) in entries:
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                pending.append(asyncio.wrap_future(asyncio.run_coroutine_threadsafe(client.aclose(), loop)))
+        if pending:
+            done, not_done = await asyncio.wait(pending, timeout=timeout)
+            for future in not_done:
+                future.cancel()
+            for future in done:
+                if not future.cancelled() and future.exception() is not None:
+                    self.logger.warning("Closing async Influx client failed: %s", future.exception())
+            if not_done:
+                self.logger.warning("Timed out closing %d async Influx client(s) on other loops", len(not_done))
+
+
+def build_slot_profile_by_day_type(points, target_date):
+    # Agregujeme průměry po slotech (index 0-95) pro pracovní dny / víkend
+    if not points:
+        return {}
+    is_weekend = target_date.weekday() >= 5
         
-        if not points:
-            return {}
-            
-        slots = {} # slot_index -> [values]
-        for p in points:
-            if p["value"] is None:
-                continue
-            dt = datetime.fromisoformat(p["time"])
-            p_is_weekend = dt.weekday() >= 5
-            if p_is_weekend != is_weekend:
-                continue
-            
-            slot = get_slot_index_for_dt(dt)
-            slots.setdefault(slot, []).append(p["value"])
-            
-        return {slot: sum(vals)/len(vals) for slot, vals in slots.items() if vals}
+    slots = {} # slot_index -> [values]
+    for p in points:
+        if p["value"] is None:
+            continue
+        dt = datetime.fromisoformat(p["time"])
+        p_is_weekend = dt.weekday() >= 5
+        if p_is_weekend != is_weekend:
+            continue
+        
+        slot = get_slot_index_for_dt(dt)
+        slots.setdefault(slot, []).append(p["value"])
+        
+    return {slot: sum(vals)/len(vals) for slot, vals in slots.items() if vals}
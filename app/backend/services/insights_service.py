@@ -25,6 +25,7 @@ class InsightsService:
         get_export_points: Callable[..., dict[str, Any]],
         aggregate_hourly_from_kwh_points: Callable[..., list[float | None]],
         logger,
+        prefetch_series_range: Callable[..., dict[str, dict[str, Any]] | None] | None = None,
     ):
         self._get_influx_cfg = get_influx_cfg
         self._get_energy_entities_cfg = get_energy_entities_cfg
@@ -39,6 +40,7 @@ class InsightsService:
         self._get_export_points = get_export_points
         self._aggregate_hourly_from_kwh_points = aggregate_hourly_from_kwh_points
         self._logger = logger
+        self._prefetch_series_range = prefetch_series_range
 
     def get_energy_balance(self, *, period: str, anchor: str | None, cfg: dict[str, Any], tzinfo) -> dict[str, Any]:
         influx = self._get_influx_cfg(cfg)
@@ -153,6 +155,17 @@ class InsightsService:
         month_rows = []
         min_value = None
         max_value = None
+        preloaded = {}
+        if self._prefetch_series_range is not None:
+            # One cache scan plus at most one Influx (or OTE/CNB) round for the uncached days of the month;
+            # the days that scan loaded are used directly below.
+            kind = {"price": "prices", "buy": "consumption", "export": "export"}[metric_norm]
+            month_end = min(datetime(year, month_num, days_in_month).date(), today_local)
+            try:
+                loaded = self._prefetch_series_range(cfg, datetime(year, month_num, 1).date(), month_end, kinds=(kind,))
+                preloaded = (loaded or {}).get(kind) or {}
+            except Exception as exc:
+                self._logger.warning("Heatmap series prefetch failed (%s %s): %s", metric_norm, month, exc)
 
         for day in range(1, days_in_month + 1):
             date_obj = datetime(year, month_num, day).date()
@@ -165,10 +178,10 @@ class InsightsService:
                         entries = self._get_prices_for_date(cfg, date_str, tzinfo)
                         values = self._aggregate_hourly_from_price_entries(entries)
                     elif metric_norm == "buy":
-                        consumption = self._get_consumption_points(cfg, date=date_str)
+                        consumption = preloaded.pop(date_str, None) or self._get_consumption_points(cfg, date=date_str)
                         values = self._aggregate_hourly_from_kwh_points(consumption.get("points", []))
                     else:
-                        export = self._get_export_points(cfg, date=date_str)
+                        export = preloaded.pop(date_str, None) or self._get_export_points(cfg, date=date_str)
                         values = self._aggregate_hourly_from_kwh_points(export.get("points", []))
                 except (HTTPException, RequestException, ValueError, TypeError) as exc:
                     self._logger.warning("Heatmap load failed (%s %s): %s", metric_norm, date_str, exc)
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import csv
+import hashlib
 import json
 import logging
 import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from time import monotonic
 from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta
 from pathlib import Path
@@ -12,12 +18,20 @@ from zoneinfo import ZoneInfo
 
 import httpx
 
+from services.pnd_store import PNDDayStore
+
 
 PND_DASHBOARD_URL = "https://pnd.cezdistribuce.cz/cezpnd2/external/dashboard/view"
 PND_DATA_ENDPOINT = "https://pnd.cezdistribuce.cz/cezpnd2/external/data"
 DEFAULT_TZ = "Europe/Prague"
 PND_LOGIN_PLACEHOLDERS = ("Zadejte svůj e-mail", "Zadejte své heslo", 'name="username"', 'name="password"', 'id="loginForm"')
 PND_DASHBOARD_MARKERS = ("NamÄ›Ĺ™enĂˇ data", "Naměřená data", "Namerena data")
+# Backfill chunks fetched at the same time over one portal session; kept low to stay polite to the portal.
+PND_BACKFILL_MAX_WORKERS = 2
+PND_BACKFILL_JOB_HISTORY = 10
+PND_BACKFILL_FLOOR = date(2010, 1, 1)
+# A portal session unused for this long is dropped and the next job logs in again.
+PND_SESSION_IDLE_SECONDS = 15 * 60
 
 
 class PNDServiceError(Exception):
@@ -55,14 +69,37 @@ class PNDExportBundle:
     raw_metadata: Optional[dict[str, Any]] = None
 
 
+class _PNDPortalSession:
+    def __init__(self, portal_client: "HttpSessionPNDPortalClient", client, pnd_cfg: dict[str, Any], portal_version: str | None):
+        self.portal_client = portal_client
+        self.client = client
+        self.pnd_cfg = pnd_cfg
+        self.portal_version = portal_version
+
+    def fetch_range(self, start_date: date, end_date: date) -> PNDExportBundle:
+        return self.portal_client._fetch_range_bundle(
+            self.client, self.pnd_cfg, start_date, end_date, stage="fetch", portal_version=self.portal_version
+        )
+
+
 class HttpSessionPNDPortalClient:
-    def __init__(self, logger: Optional[logging.Logger] = None):
+    """PND portal over httpx; logged-in sessions are kept per username and reused until they idle out.
+
+    Every use starts with the dashboard GET the callers need anyway, which also
+    tells whether the cached cookies are still accepted; only a rejected or
+    expired session goes through the login form again.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None, *, session_idle_seconds: float = PND_SESSION_IDLE_SECONDS):
         self.logger = logger or logging.getLogger("uvicorn.error")
+        self.session_idle_seconds = session_idle_seconds
+        # username -> {"client", "secret", "expires_at"}
+        self._sessions: dict[str, dict[str, Any]] = {}
+        self._sessions_lock = threading.Lock()
+        self.logins = 0
 
     def verify(self, pnd_cfg: dict[str, Any], probe_date: date) -> dict[str, Any]:
-        with self._session(pnd_cfg) as client:
-            dashboard_html = self._request(client, "GET", PND_DASHBOARD_URL, stage="verify").text
-            _ensure_dashboard_contract(dashboard_html, stage="verify")
+        with self._dashboard(pnd_cfg, stage="verify") as (client, dashboard_html):
             portal_version = self._extract_portal_version(dashboard_html)
             bundle = self._fetch_range_bundle(client, pnd_cfg, probe_date, probe_date, stage="verify", portal_version=portal_version)
             contract = _inspect_json_payload(bundle.json_data or {}, stage="verify")
@@ -83,11 +120,15 @@ class HttpSessionPNDPortalClient:
             }
 
     def fetch_range(self, pnd_cfg: dict[str, Any], start_date: date, end_date: date) -> PNDExportBundle:
-        with self._session(pnd_cfg) as client:
-            dashboard_html = self._request(client, "GET", PND_DASHBOARD_URL, stage="fetch").text
-            _ensure_dashboard_contract(dashboard_html, stage="fetch")
+        with self.open_session(pnd_cfg) as session:
+            return session.fetch_range(start_date, end_date)
+
+    @contextmanager
+    def open_session(self, pnd_cfg: dict[str, Any]):
+        """One logged-in portal session for several fetch_range calls (safe to share between threads)."""
+        with self._dashboard(pnd_cfg, stage="fetch") as (client, dashboard_html):
             portal_version = self._extract_portal_version(dashboard_html)
-            return self._fetch_range_bundle(client, pnd_cfg, start_date, end_date, stage="fetch", portal_version=portal_version)
+            yield _PNDPortalSession(self, client, pnd_cfg, portal_version)
 
     def _fetch_range_bundle(
         self,
@@ -167,7 +208,7 @@ class HttpSessionPNDPortalClient:
                 status_code=503,
             ) from exc
 
-    def _session(self, pnd_cfg: dict[str, Any]):
+    def _login(self, pnd_cfg: dict[str, Any]):
         username = pnd_cfg.get("username", "")
         password = pnd_cfg.get("password", "")
         client = httpx.Client(
@@ -178,55 +219,125 @@ class HttpSessionPNDPortalClient:
                 "Accept": "text/html,application/json,*/*",
             },
         )
+        try:
+            response = self._request(client, "GET", PND_DASHBOARD_URL, stage="login")
+            if response.status_code >= 400:
+                raise PNDServiceError(
+                    "PND_LOGIN_PAGE_UNAVAILABLE",
+                    f"PND login page vratila HTTP {response.status_code}.",
+                    stage="login",
+                    status_code=503,
+                )
+
+            execution = _extract_execution_token(response.text)
+            login_url = str(response.url)
+            login_payload = {
+                "username": username,
+                "password": password,
+                "execution": execution,
+                "_eventId": "submit",
+                "geolocation": "",
+            }
+            login_response = self._request(client, "POST", login_url, stage="login", data=login_payload)
+            if login_response.status_code >= 400:
+                raise PNDServiceError(
+                    "PND_LOGIN_FAILED",
+                    f"PND login endpoint vratil HTTP {login_response.status_code}.",
+                    stage="login",
+                    details={"status_code": login_response.status_code},
+                    status_code=401,
+                )
+            if _is_login_form_present(login_response.text):
+                portal_message = _extract_login_error(login_response.text)
+                raise PNDServiceError(
+                    "PND_LOGIN_FAILED",
+                    "Nepodarilo se prihlasit do PND.",
+                    stage="login",
+                    details={
+                        "portal_message": portal_message,
+                        "final_url": str(login_response.url),
+                        "response_excerpt": login_response.text[:500],
+                    },
+                    status_code=401,
+                )
+        except BaseException:
+            client.close()
+            raise
+        self.logins += 1
+        return client
+
+    @staticmethod
+    def _session_secret(pnd_cfg: dict[str, Any]) -> str:
+        return hashlib.sha256(str(pnd_cfg.get("password", "")).encode("utf-8")).hexdigest()
+
+    def _cached_session(self, username: str, secret: str):
+        with self._sessions_lock:
+            entry = self._sessions.get(username)
+            if entry is None:
+                return None
+            if entry["secret"] == secret and entry["expires_at"] > monotonic():
+                return entry["client"]
+            self._sessions.pop(username)
+        entry["client"].close()
+        return None
 
-        class _SessionContext:
-            def __enter__(self_inner):
-                response = self._request(client, "GET", PND_DASHBOARD_URL, stage="login")
-                if response.status_code >= 400:
-                    raise PNDServiceError(
-                        "PND_LOGIN_PAGE_UNAVAILABLE",
-                        f"PND login page vratila HTTP {response.status_code}.",
-                        stage="login",
-                        status_code=503,
-                    )
-
-                execution = _extract_execution_token(response.text)
-                login_url = str(response.url)
-                login_payload = {
-                    "username": username,
-                    "password": password,
-                    "execution": execution,
-                    "_eventId": "submit",
-                    "geolocation": "",
-                }
-                login_response = self._request(client, "POST", login_url, stage="login", data=login_payload)
-                if login_response.status_code >= 400:
-                    raise PNDServiceError(
-                        "PND_LOGIN_FAILED",
-                        f"PND login endpoint vratil HTTP {login_response.status_code}.",
-                        stage="login",
-                        details={"status_code": login_response.status_code},
-                        status_code=401,
-                    )
-                if _is_login_form_present(login_response.text):
-                    portal_message = _extract_login_error(login_response.text)
-                    raise PNDServiceError(
-                        "PND_LOGIN_FAILED",
-                        "Nepodarilo se prihlasit do PND.",
-                        stage="login",
-                        details={
-                            "portal_message": portal_message,
-                            "final_url": str(login_response.url),
-                            "response_excerpt": login_response.text[:500],
-                        },
-                        status_code=401,
-                    )
-                return client
-
-            def __exit__(self_inner, exc_type, exc, tb):
-                client.close()
-
-        return _SessionContext()
+    def _drop_session(self, username: str, client):
+        with self._sessions_lock:
+            entry = self._sessions.get(username)
+            if entry is not None and entry["client"] is client:
+                self._sessions.pop(username)
+        client.close()
+
+    def close_sessions(self):
+        with self._sessions_lock:
+            entries = list(self._sessions.values())
+            self._sessions.clear()
+        for entry in entries:
+            entry["client"].close()
+
+    @contextmanager
+    def _dashboard(self, pnd_cfg: dict[str, Any], *, stage: str):
+        """Logged-in client and dashboard HTML, reusing the cached session while the portal accepts it."""
+        username = str(pnd_cfg.get("username", ""))
+        secret = self._session_secret(pnd_cfg)
+        client = self._cached_session(username, secret)
+        dashboard_html = None
+        if client is not None:
+            try:
+                response = self._request(client, "GET", PND_DASHBOARD_URL, stage=stage)
+            except PNDServiceError:
+                self._drop_session(username, client)
+                raise
+            if response.status_code < 400 and not _is_login_form_present(response.text):
+                dashboard_html = response.text
+            else:
+                self.logger.info("PND session for %s was rejected by the portal, logging in again", username)
+                self._drop_session(username, client)
+                client = None
+        if client is None:
+            client = self._login(pnd_cfg)
+            with self._sessions_lock:
+                previous = self._sessions.get(username)
+                self._sessions[username] = {"client": client, "secret": secret, "expires_at": monotonic() + self.session_idle_seconds}
+            if previous is not None and previous["client"] is not client:
+                previous["client"].close()
+        try:
+            if dashboard_html is None:
+                dashboard_html = self._request(client, "GET", PND_DASHBOARD_URL, stage=stage).text
+            _ensure_dashboard_contract(dashboard_html, stage=stage)
+            yield client, dashboard_html
+        except PNDServiceError as exc:
+            # Missing data is an answer; anything else may mean the session went stale.
+            if exc.code != "PND_DATA_NOT_AVAILABLE":
+                self._drop_session(username, client)
+            raise
+        except BaseException:
+            self._drop_session(username, client)
+            raise
+        with self._sessions_lock:
+            entry = self._sessions.get(username)
+            if entry is not None and entry["client"] is client:
+                entry["expires_at"] = monotonic() + self.session_idle_seconds
 
     def _extract_portal_version(self, html: str) -> str | None:
         match = re.search(r"Verze aplikace:\s*([^<\n]+)", html)
@@ -672,15 +783,29 @@ class PNDService:
         logger: Optional[logging.Logger] = None,
         client_factory: Optional[Callable[[], Any]] = None,
         now_fn: Optional[Callable[[], str]] = None,
+        backfill_workers: int = PND_BACKFILL_MAX_WORKERS,
     ):
         self.root_dir = Path(root_dir)
         self.raw_dir = self.root_dir / "raw"
         self.normalized_dir = self.root_dir / "normalized"
         self.status_path = self.root_dir / "status.json"
+        self.day_index_path = self.root_dir / "days-index.json"
         self.logger = logger or logging.getLogger("uvicorn.error")
-        self.client_factory = client_factory or (lambda: HttpSessionPNDPortalClient(logger=self.logger))
+        # One portal client per service, so its logged-in session carries over between jobs.
+        self._portal_client = None
+        self.client_factory = client_factory or self._default_portal_client
         self.now_fn = now_fn or _utc_now
+        self.backfill_workers = max(1, int(backfill_workers))
+        self._status_lock = threading.Lock()
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._jobs_lock = threading.Lock()
         self._ensure_dirs()
+        self.store = PNDDayStore(self.normalized_dir, self.day_index_path, logger=self.logger)
+
+    def _default_portal_client(self) -> HttpSessionPNDPortalClient:
+        if self._portal_client is None:
+            self._portal_client = HttpSessionPNDPortalClient(logger=self.logger)
+        return self._portal_client
 
     def _ensure_dirs(self):
         self.root_dir.mkdir(parents=True, exist_ok=True)
@@ -698,16 +823,12 @@ class PNDService:
     def _save_status(self, payload: dict[str, Any]):
         self.status_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
 
+    def _update_status(self, changes: dict[str, Any]):
+        with self._status_lock:
+            self._save_status({**self._load_status(), **changes})
+
     def get_cache_status(self) -> dict[str, Any]:
-        files = sorted(self.normalized_dir.glob("*.json"))
-        days = [path.stem for path in files if re.match(r"^\d{4}-\d{2}-\d{2}$", path.stem)]
-        return {
-            "dir": str(self.root_dir),
-            "days_count": len(days),
-            "cached_from": days[0] if days else None,
-            "cached_to": days[-1] if days else None,
-            "size_bytes": sum(path.stat().st_size for path in files) if files else 0,
-        }
+        return {"dir": str(self.root_dir), **self.store.get_status()}
 
     def get_status(self, cfg: Optional[dict[str, Any]] = None, *, pnd_cfg: Optional[dict[str, Any]] = None) -> dict[str, Any]:
         status = self._load_status()
@@ -729,50 +850,31 @@ class PNDService:
         }
 
     def has_day(self, date_str: str) -> bool:
-        path = self.normalized_dir / f"{date_str}.json"
-        if not path.exists():
-            return False
-        try:
-            # Check if file has intervals and is not empty/corrupt
-            content = path.read_text(encoding="utf-8").strip()
-            if not content: return False
-            payload = json.loads(content)
-            return bool(payload.get("intervals"))
-        except (OSError, json.JSONDecodeError):
-            return False
+        return self.store.has_day(date_str)
+
+    def get_day_stamp(self, date_str: str) -> Optional[dict[str, Any]]:
+        """Manifest entry of a cached day (interval count and checksum), or None."""
+        return self.store.get_day_stamp(date_str)
+
+    def remove_day(self, date_str: str) -> bool:
+        return self.store.remove_day(date_str)
 
     def find_first_missing_date(self, max_lookback_days: int = 31, tzinfo=None) -> Optional[date]:
+        """Oldest day in the window (yesterday back to max_lookback_days) without PND intervals."""
         tz = tzinfo or ZoneInfo(DEFAULT_TZ)
         today = datetime.now(tz).date()
-        
-        # We check from today-1 back to today-max_lookback
-        for i in range(1, max_lookback_days + 1):
-            check_date = today - timedelta(days=i)
-            if not self.has_day(check_date.isoformat()):
-                # Continue looking further back to find the absolute oldest gap in the window
-                # so we can fetch everything from that gap up to yesterday in one go.
-                oldest_gap = check_date
-                for j in range(i + 1, max_lookback_days + 1):
-                    deeper_date = today - timedelta(days=j)
-                    if not self.has_day(deeper_date.isoformat()):
-                        oldest_gap = deeper_date
-                    else:
-                        # Once we find a day that EXISTS, we stop looking back
-                        # because we want the FIRST (oldest) gap in the CONSECUTIVE line of missing days
-                        # OR if we want to fill ALL gaps, we should find the oldest gap overall.
-                        # Usually PND API works best for ranges.
-                        pass
-                return oldest_gap
-        return None
+        window = [(today - timedelta(days=i)).isoformat() for i in range(max_lookback_days, 0, -1)]
+        # The whole gap from the oldest missing day up to yesterday is fetched in one go.
+        missing = self.store.missing_days(window)
+        return datetime.strptime(missing[0], "%Y-%m-%d").date() if missing else None
 
     def verify(self, pnd_cfg: dict[str, Any]) -> dict[str, Any]:
         self._validate_config(pnd_cfg)
         probe_date = datetime.now(ZoneInfo(DEFAULT_TZ)).date() - timedelta(days=1)
         result = self.client_factory().verify(pnd_cfg, probe_date)
         fetched_at = self.now_fn()
-        self._save_status(
+        self._update_status(
             {
-                **self._load_status(),
                 **self.get_cache_status(),
                 "healthy": True,
                 "last_verify_at": fetched_at,
@@ -831,6 +933,33 @@ class PNDService:
             )
         bundle = self.client_factory().fetch_range(pnd_cfg, start_date, end_date)
         fetched_at = self.now_fn()
+        saved_days = len(self._store_bundle(start_date, end_date, bundle, fetched_at))
+        self._update_status(
+            {
+                **self.get_cache_status(),
+                "healthy": True,
+                "last_sync_at": fetched_at,
+                "portal_version": bundle.portal_version,
+                "last_error": None,
+                "last_job": {
+                    "type": "sync",
+                    "reason": reason,
+                    "range": {"from": start_date.isoformat(), "to": end_date.isoformat()},
+                    "ok": True,
+                    "finished_at": fetched_at,
+                    "saved_days": saved_days,
+                },
+            }
+        )
+        return {
+            "ok": True,
+            "saved_days": saved_days,
+            "range": {"from": start_date.isoformat(), "to": end_date.isoformat()},
+            "portal_version": bundle.portal_version,
+        }
+
+    def _store_bundle(self, start_date: date, end_date: date, bundle: PNDExportBundle, fetched_at: str) -> list[str]:
+        """Write raw exports and normalized days of one fetched range; returns the saved dates."""
         raw_refs = self._write_raw_files(start_date, end_date, bundle, fetched_at)
         if bundle.json_data is not None:
             normalized = _normalize_json_series(bundle.json_data, fetched_at=fetched_at, raw_refs=raw_refs)
@@ -859,94 +988,236 @@ class PNDService:
                 details={"from": start_date.isoformat(), "to": end_date.isoformat()},
                 status_code=409,
             )
-        self._save_status(
+        return sorted(normalized)
+
+    def _backfill_ranges(self, range_name: str, yesterday: date) -> list[tuple[date, date]]:
+        if range_name == "yesterday":
+            return [(yesterday, yesterday)]
+        if range_name == "week":
+            return [(yesterday - timedelta(days=6), yesterday)]
+        if range_name == "month":
+            return [(yesterday - timedelta(days=30), yesterday)]
+        if range_name == "year":
+            return [(yesterday - timedelta(days=364), yesterday)]
+        if range_name == "max":
+            ranges = []
+            chunk_end = yesterday
+            for _ in range(10):
+                chunk_start = max(PND_BACKFILL_FLOOR, chunk_end - timedelta(days=364))
+                ranges.append((chunk_start, chunk_end))
+                if chunk_start <= PND_BACKFILL_FLOOR:
+                    break
+                chunk_end = chunk_start - timedelta(days=1)
+            return ranges
+        raise PNDServiceError(
+            "PND_INVALID_RANGE",
+            f"Neznamy backfill range '{range_name}'.",
+            stage="backfill",
+            details={"range": range_name},
+            status_code=400,
+        )
+
+    @contextmanager
+    def _portal_fetcher(self, pnd_cfg: dict[str, Any]):
+        # Clients with open_session log in once for all chunks; others fetch each range on their own.
+        client = self.client_factory()
+        open_session = getattr(client, "open_session", None)
+        if callable(open_session):
+            with open_session(pnd_cfg) as session:
+                yield session.fetch_range
+        else:
+            yield lambda start_date, end_date: client.fetch_range(pnd_cfg, start_date, end_date)
+
+    def _new_backfill_job(self, range_name: str, ranges: list[tuple[date, date]]) -> dict[str, Any]:
+        return {
+            "job_id": uuid.uuid4().hex[:12],
+            "range": range_name,
+            "state": "running",
+            "started_at": self.now_fn(),
+            "finished_at": None,
+            "chunks_total": len(ranges),
+            "chunks_done": 0,
+            "saved_days": 0,
+            "eta_seconds": None,
+            "error": None,
+            "_started": monotonic(),
+        }
+
+    def _job_snapshot(self, job: dict[str, Any]) -> dict[str, Any]:
+        # Caller holds the jobs lock.
+        snapshot = {key: value for key, value in job.items() if not key.startswith("_")}
+        snapshot["estimated_days"] = job["saved_days"]
+        return snapshot
+
+    def _run_backfill(
+        self,
+        job: dict[str, Any],
+        pnd_cfg: dict[str, Any],
+        ranges: list[tuple[date, date]],
+        on_days_saved: Optional[Callable[[list[str]], None]] = None,
+    ):
+        range_name = job["range"]
+        reason = f"backfill:{range_name}"
+        # "max" walks back a year at a time until the portal has nothing older.
+        stop = threading.Event()
+        portal_version = None
+
+        with self._portal_fetcher(pnd_cfg) as fetch_bundle:
+            def run_chunk(start_date: date, end_date: date):
+                if stop.is_set():
+                    return None
+                try:
+                    bundle = fetch_bundle(start_date, end_date)
+                    return bundle.portal_version, self._store_bundle(start_date, end_date, bundle, self.now_fn())
+                except PNDServiceError:
+                    # Chunks not started yet are skipped; for "max" this is the end of the portal's history.
+                    stop.set()
+                    raise
+
+            workers = min(self.backfill_workers, len(ranges))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pnd-backfill") as pool:
+                futures = [pool.submit(run_chunk, start_date, end_date) for start_date, end_date in ranges]
+                try:
+                    for future in futures:
+                        try:
+                            outcome = future.result()
+                        except PNDServiceError as exc:
+                            if range_name == "max" and exc.code == "PND_DATA_NOT_AVAILABLE":
+                                stop.set()
+                                outcome = None
+                            else:
+                                raise
+                        saved = []
+                        if outcome is not None:
+                            portal_version, saved = outcome[0] or portal_version, outcome[1]
+                            if range_name == "max" and not saved:
+                                stop.set()
+                        if saved and on_days_saved:
+                            on_days_saved(saved)
+                        with self._jobs_lock:
+                            job["chunks_done"] += 1
+                            job["saved_days"] += len(saved)
+                            elapsed = monotonic() - job["_started"]
+                            remaining = 0 if stop.is_set() else job["chunks_total"] - job["chunks_done"]
+                            job["eta_seconds"] = round(elapsed / job["chunks_done"] * remaining, 1)
+                except BaseException:
+                    stop.set()
+                    raise
+
+        finished_at = self.now_fn()
+        cache_status = self.get_cache_status()
+        with self._jobs_lock:
+            job.update(
+                state="done",
+                finished_at=finished_at,
+                eta_seconds=0,
+                cached_from=cache_status.get("cached_from"),
+                cached_to=cache_status.get("cached_to"),
+            )
+            saved_days, chunks_done = job["saved_days"], job["chunks_done"]
+        self._update_status(
             {
-                **self._load_status(),
-                **self.get_cache_status(),
+                **cache_status,
                 "healthy": True,
-                "last_sync_at": fetched_at,
-                "portal_version": bundle.portal_version,
+                "last_sync_at": finished_at,
+                "portal_version": portal_version,
                 "last_error": None,
                 "last_job": {
-                    "type": "sync",
+                    "type": "backfill",
                     "reason": reason,
-                    "range": {"from": start_date.isoformat(), "to": end_date.isoformat()},
+                    "job_id": job["job_id"],
+                    "range": {"from": ranges[-1][0].isoformat(), "to": ranges[0][1].isoformat()},
                     "ok": True,
-                    "finished_at": fetched_at,
+                    "started_at": job["started_at"],
+                    "finished_at": finished_at,
+                    "chunks": chunks_done,
                     "saved_days": saved_days,
                 },
             }
         )
-        return {
-            "ok": True,
-            "saved_days": saved_days,
-            "range": {"from": start_date.isoformat(), "to": end_date.isoformat()},
-            "portal_version": bundle.portal_version,
-        }
 
-    def backfill(self, pnd_cfg: dict[str, Any], range_name: str, *, tzinfo=None) -> dict[str, Any]:
-        self._validate_config(pnd_cfg)
-        tz = tzinfo or ZoneInfo(DEFAULT_TZ)
-        today = datetime.now(tz).date()
-        yesterday = today - timedelta(days=1)
-        started_at = self.now_fn()
-        fetched_days = 0
-        chunks = 0
-
-        if range_name == "yesterday":
-            ranges = [(yesterday, yesterday)]
-        elif range_name == "week":
-            ranges = [(yesterday - timedelta(days=6), yesterday)]
-        elif range_name == "month":
-            ranges = [(yesterday - timedelta(days=30), yesterday)]
-        elif range_name == "year":
-            ranges = [(yesterday - timedelta(days=364), yesterday)]
-        elif range_name == "max":
-            ranges = []
-            chunk_end = yesterday
-            for _ in range(10):
-                chunk_start = max(date(2010, 1, 1), chunk_end - timedelta(days=364))
-                ranges.append((chunk_start, chunk_end))
-                if chunk_start <= date(2010, 1, 1):
-                    break
-                chunk_end = chunk_start - timedelta(days=1)
+    def _run_backfill_job(self, job: dict[str, Any], pnd_cfg: dict[str, Any], ranges, on_days_saved=None):
+        try:
+            self._run_backfill(job, pnd_cfg, ranges, on_days_saved)
+        except PNDServiceError as exc:
+            self.record_error(exc, job_type="backfill", extra={"range": job["range"], "job_id": job["job_id"]})
+            error = exc.to_detail()
+        except Exception as exc:  # noqa: BLE001 - a background job must always end in a final state
+            self.logger.exception("PND backfill job %s failed", job["job_id"])
+            error = {"code": "PND_BACKFILL_FAILED", "message": str(exc), "stage": "backfill", "details": {}}
         else:
-            raise PNDServiceError(
-                "PND_INVALID_RANGE",
-                f"Neznamy backfill range '{range_name}'.",
-                stage="backfill",
-                details={"range": range_name},
-                status_code=400,
-            )
+            return
+        with self._jobs_lock:
+            job.update(state="failed", finished_at=self.now_fn(), eta_seconds=None, error=error)
 
-        for start_date, end_date in ranges:
-            chunks += 1
-            try:
-                result = self.fetch_range(pnd_cfg, start_date, end_date, reason=f"backfill:{range_name}")
-            except PNDServiceError as exc:
-                if range_name == "max" and exc.code == "PND_DATA_NOT_AVAILABLE":
-                    break
-                raise
-            fetched_days += result["saved_days"]
-            if range_name == "max" and result["saved_days"] == 0:
-                break
+    def start_backfill(
+        self,
+        pnd_cfg: dict[str, Any],
+        range_name: str,
+        *,
+        tzinfo=None,
+        on_days_saved: Optional[Callable[[list[str]], None]] = None,
+    ) -> dict[str, Any]:
+        """Run a backfill as a background job; progress is polled through get_backfill_job.
+
+        Only one backfill runs at a time: while one is in progress, its snapshot is
+        returned with accepted=False.
+        """
+        self._validate_config(pnd_cfg)
+        tz = tzinfo or ZoneInfo(DEFAULT_TZ)
+        ranges = self._backfill_ranges(range_name, datetime.now(tz).date() - timedelta(days=1))
+        with self._jobs_lock:
+            running = next((job for job in self._jobs.values() if job["state"] == "running"), None)
+            if running is not None:
+                return {**self._job_snapshot(running), "accepted": False}
+            job = self._new_backfill_job(range_name, ranges)
+            self._jobs[job["job_id"]] = job
+            while len(self._jobs) > PND_BACKFILL_JOB_HISTORY:
+                oldest = next(job_id for job_id, item in self._jobs.items() if item["state"] != "running")
+                self._jobs.pop(oldest)
+            snapshot = self._job_snapshot(job)
+        threading.Thread(
+            target=self._run_backfill_job,
+            args=(job, pnd_cfg, ranges, on_days_saved),
+            name=f"pnd-backfill-{job['job_id']}",
+            daemon=True,
+        ).start()
+        return {**snapshot, "accepted": True}
+
+    def get_backfill_job(self, job_id: str) -> dict[str, Any]:
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise PNDServiceError(
+                    "PND_JOB_NOT_FOUND",
+                    "Backfill job nebyl nalezen.",
+                    stage="backfill",
+                    details={"job_id": job_id},
+                    status_code=404,
+                )
+            return self._job_snapshot(job)
 
-        status = self.get_status(pnd_cfg=pnd_cfg)
+    def backfill(self, pnd_cfg: dict[str, Any], range_name: str, *, tzinfo=None) -> dict[str, Any]:
+        """Synchronous backfill, the same work as one start_backfill job."""
+        self._validate_config(pnd_cfg)
+        tz = tzinfo or ZoneInfo(DEFAULT_TZ)
+        ranges = self._backfill_ranges(range_name, datetime.now(tz).date() - timedelta(days=1))
+        job = self._new_backfill_job(range_name, ranges)
+        self._run_backfill(job, pnd_cfg, ranges)
         return {
             "accepted": True,
             "range": range_name,
-            "started_at": started_at,
-            "estimated_days": fetched_days,
-            "chunks": chunks,
-            "cached_from": status.get("cached_from"),
-            "cached_to": status.get("cached_to"),
+            "started_at": job["started_at"],
+            "estimated_days": job["saved_days"],
+            "chunks": job["chunks_done"],
+            "cached_from": job.get("cached_from"),
+            "cached_to": job.get("cached_to"),
         }
 
     def record_error(self, exc: PNDServiceError, *, job_type: str, extra: Optional[dict[str, Any]] = None):
         now_iso = self.now_fn()
-        self._save_status(
+        self._update_status(
             {
-                **self._load_status(),
                 **self.get_cache_status(),
                 "healthy": False,
                 "last_error": {
@@ -967,14 +1238,7 @@ class PNDService:
         )
 
     def purge_cache(self) -> dict[str, Any]:
-        count = 0
-        # Delete normalized files
-        for item in self.normalized_dir.glob("*.json"):
-            try:
-                item.unlink()
-                count += 1
-            except OSError as exc:
-                self.logger.error(f"Failed to delete cached file {item}: {exc}")
+        count = self.store.purge()
 
         # Delete raw files
         for item in self.raw_dir.glob("*"):
@@ -1005,13 +1269,7 @@ class PNDService:
                 details={"from": start_date, "to": end_date},
                 status_code=400,
             )
-        days = []
-        cursor = start
-        while cursor <= end:
-            path = self.normalized_dir / f"{cursor.isoformat()}.json"
-            if path.exists():
-                days.append(json.loads(path.read_text(encoding="utf-8")))
-            cursor += timedelta(days=1)
+        days = self.store.get_range(start, end)
         return {"from": start_date, "to": end_date, "days": days, "days_count": len(days)}
 
     def _write_raw_files(self, start_date: date, end_date: date, bundle: PNDExportBundle, fetched_at: str) -> dict[str, str]:
@@ -1047,12 +1305,7 @@ class PNDService:
         return refs
 
     def _write_normalized_days(self, normalized_days: dict[str, dict[str, Any]]) -> int:
-        saved_days = 0
-        for day_key, payload in normalized_days.items():
-            path = self.normalized_dir / f"{day_key}.json"
-            path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-            saved_days += 1
-        return saved_days
+        return self.store.write_days(normalized_days)
 
     def _validate_config(self, pnd_cfg: dict[str, Any]):
         if not pnd_cfg.get("enabled"):
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import calendar
+import copy
+import hashlib
+import json
+import logging
+import re
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from services.cache_manager import BoundedLRUCache
+
+PND_MONTH_FILE_VERSION = 1
+PND_STORE_INDEX_VERSION = 2
+PND_DAY_FILE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+PND_MONTH_FILE_RE = re.compile(r"^\d{4}-\d{2}$")
+# Parsed month files kept in memory; a billing walk or a year of single-day reads stays on a few months.
+PND_MONTH_CACHE_MAX_ENTRIES = 6
+
+
+def encode_pnd_day(payload: dict[str, Any]) -> dict[str, Any]:
+    """Day payload with its interval dicts packed into fixed-width rows under shared column names."""
+    intervals = payload.get("intervals") or []
+    columns: list[str] = []
+    for interval in intervals:
+        for key in interval:
+            if key not in columns:
+                columns.append(key)
+    encoded = {key: value for key, value in payload.items() if key != "intervals"}
+    encoded["interval_columns"] = columns
+    encoded["interval_rows"] = [[interval.get(key) for key in columns] for interval in intervals]
+    return encoded
+
+
+def decode_pnd_day(encoded: dict[str, Any]) -> dict[str, Any]:
+    # Fresh objects throughout: the encoded day may be shared through the month cache.
+    columns = encoded.get("interval_columns") or []
+    payload = {
+        key: copy.deepcopy(value) for key, value in encoded.items() if key not in ("interval_columns", "interval_rows")
+    }
+    payload["intervals"] = [dict(zip(columns, row)) for row in encoded.get("interval_rows") or []]
+    return payload
+
+
+def _dump_compact(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class PNDDayStore:
+    """Normalized PND days kept in one compact JSON file per month (``YYYY-MM.json``).
+
+    A manifest next to the data maps each day to its interval count and a
+    checksum of its encoded payload and keeps the size of every month file, so
+    presence checks, gap detection and cache status never touch the month
+    files. Range reads open only the months the range overlaps. Per-day files
+    from older versions are folded into month files the first time the
+    manifest is built. Parsed month files are cached under the manifest's
+    checksums of their days, so repeated reads of one month parse it once and
+    any write naturally retires the old entry.
+    """
+
+    def __init__(self, directory: Path | str, index_path: Path | str, *, logger: Optional[logging.Logger] = None):
+        self.directory = Path(directory)
+        self.index_path = Path(index_path)
+        self.logger = logger or logging.getLogger("uvicorn.error")
+        self._lock = threading.RLock()
+        self._days: Optional[dict[str, dict[str, Any]]] = None
+        self._month_sizes: dict[str, int] = {}
+        self._month_cache = BoundedLRUCache(PND_MONTH_CACHE_MAX_ENTRIES)
+
+    def _month_path(self, month: str) -> Path:
+        return self.directory / f"{month}.json"
+
+    def _load_index(self) -> dict[str, dict[str, Any]]:
+        # Caller holds the lock.
+        if self._days is not None:
+            return self._days
+        if self.index_path.exists():
+            try:
+                payload = json.loads(self.index_path.read_text(encoding="utf-8"))
+                if payload.get("version") == PND_STORE_INDEX_VERSION and isinstance(payload.get("days"), dict):
+                    self._days = payload["days"]
+                    self._month_sizes = dict(payload.get("months") or {})
+                    return self._days
+            except (OSError, json.JSONDecodeError) as exc:
+                self.logger.warning(f"PND store index {self.index_path} is unreadable, rebuilding: {exc}")
+        self._rebuild_index()
+        return self._days
+
+    def _rebuild_index(self):
+        # One-off scan: folds legacy per-day files into month files, then indexes every month.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        legacy: dict[str, dict[str, Any]] = {}
+        legacy_paths = []
+        for path in sorted(self.directory.glob("*.json")):
+            if not PND_DAY_FILE_RE.match(path.stem):
+                continue
+            try:
+                content = path.read_text(encoding="utf-8").strip()
+                if content:
+                    legacy[path.stem] = json.loads(content)
+                legacy_paths.append(path)
+            except (OSError, json.JSONDecodeError) as exc:
+                self.logger.warning(f"Skipping unreadable PND day file {path}: {exc}")
+        self._days = {}
+        self._month_sizes = {}
+        for path in sorted(self.directory.glob("*.json")):
+            if not PND_MONTH_FILE_RE.match(path.stem):
+                continue
+            encoded_days = self._read_month(path.stem)
+            for day_key, encoded in encoded_days.items():
+                self._days[day_key] = self._index_entry(encoded)
+            self._month_sizes[path.stem] = path.stat().st_size
+        if legacy:
+            self._write_days_locked(legacy)
+        else:
+            self._save_index()
+        for path in legacy_paths:
+            path.unlink(missing_ok=True)
+
+    def _save_index(self):
+        # Caller holds the lock.
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        tmp_path.write_bytes(
+            _dump_compact({"version": PND_STORE_INDEX_VERSION, "days": self._days, "months": self._month_sizes})
+        )
+        tmp_path.replace(self.index_path)
+
+    def _read_month(self, month: str) -> dict[str, dict[str, Any]]:
+        path = self._month_path(month)
+        if not path.exists():
+            return {}
+        try:
+            payload = json.loads(path.read_bytes())
+        except (OSError, json.JSONDecodeError) as exc:
+            self.logger.warning(f"PND month file {path} is unreadable, ignoring: {exc}")
+            return {}
+        if payload.get("version") != PND_MONTH_FILE_VERSION or not isinstance(payload.get("days"), dict):
+            return {}
+        return payload["days"]
+
+    def _month_fingerprint(self, month: str) -> tuple:
+        # Caller holds the lock.
+        year, month_num = map(int, month.split("-"))
+        checksums = []
+        for day in range(1, calendar.monthrange(year, month_num)[1] + 1):
+            day_key = f"{month}-{day:02d}"
+            entry = self._days.get(day_key)
+            if entry:
+                checksums.append((day_key, entry.get("sha1")))
+        return month, self._month_sizes.get(month), tuple(checksums)
+
+    def _month_days(self, month: str) -> dict[str, dict[str, Any]]:
+        """Encoded days of a month, parsed at most once per manifest state. Shared: do not mutate."""
+        with self._lock:
+            key = self._month_fingerprint(month)
+        encoded_days = self._month_cache.get(key)
+        if encoded_days is None:
+            encoded_days = self._read_month(month)
+            self._month_cache[key] = encoded_days
+        return encoded_days
+
+    def _write_month(self, month: str, encoded_days: dict[str, dict[str, Any]]):
+        # Caller holds the lock.
+        path = self._month_path(month)
+        if not encoded_days:
+            path.unlink(missing_ok=True)
+            self._month_sizes.pop(month, None)
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        content = _dump_compact({"version": PND_MONTH_FILE_VERSION, "days": dict(sorted(encoded_days.items()))})
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_bytes(content)
+        tmp_path.replace(path)
+        self._month_sizes[month] = len(content)
+
+    @staticmethod
+    def _index_entry(encoded: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "intervals": len(encoded.get("interval_rows") or []),
+            "sha1": hashlib.sha1(_dump_compact(encoded)).hexdigest(),
+        }
+
+    def _write_days_locked(self, payloads: dict[str, dict[str, Any]]) -> int:
+        by_month: dict[str, dict[str, dict[str, Any]]] = {}
+        for day_key, payload in payloads.items():
+            by_month.setdefault(day_key[:7], {})[day_key] = encode_pnd_day(payload)
+        for month, encoded in sorted(by_month.items()):
+            encoded_days = dict(self._month_days(month))
+            encoded_days.update(encoded)
+            self._write_month(month, encoded_days)
+            for day_key, day_payload in encoded.items():
+                self._days[day_key] = self._index_entry(day_payload)
+            self._month_cache[self._month_fingerprint(month)] = encoded_days
+        self._save_index()
+        return len(payloads)
+
+    def write_days(self, payloads: dict[str, dict[str, Any]]) -> int:
+        """Store normalized day payloads; every touched month file is rewritten once."""
+        with self._lock:
+            self._load_index()
+            return self._write_days_locked(payloads)
+
+    def has_day(self, date_str: str) -> bool:
+        with self._lock:
+            entry = self._load_index().get(date_str)
+        return bool(entry and entry.get("intervals"))
+
+    def missing_days(self, dates: Iterable[str]) -> list[str]:
+        with self._lock:
+            days = self._load_index()
+            return [date_str for date_str in dates if not (days.get(date_str) or {}).get("intervals")]
+
+    def get_day_stamp(self, date_str: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            entry = self._load_index().get(date_str)
+        return dict(entry) if entry else None
+
+    def get_range(self, start: date, end: date) -> list[dict[str, Any]]:
+        """Decoded day payloads from start through end, reading only the months the range overlaps."""
+        start_str, end_str = start.isoformat(), end.isoformat()
+        with self._lock:
+            days = self._load_index()
+            months = sorted({day_key[:7] for day_key in days if start_str <= day_key <= end_str})
+        result = []
+        for month in months:
+            encoded_days = self._month_days(month)
+            for day_key in sorted(encoded_days):
+                if start_str <= day_key <= end_str:
+                    result.append(decode_pnd_day(encoded_days[day_key]))
+        return result
+
+    def remove_day(self, date_str: str) -> bool:
+        with self._lock:
+            days = self._load_index()
+            if date_str not in days:
+                return False
+            month = date_str[:7]
+            encoded_days = dict(self._month_days(month))
+            encoded_days.pop(date_str, None)
+            days.pop(date_str, None)
+            self._write_month(month, encoded_days)
+            self._month_cache[self._month_fingerprint(month)] = encoded_days
+            self._save_index()
+            return True
+
+    def purge(self) -> int:
+        """Delete every month file and reset the manifest. Returns the number of files removed."""
+        count = 0
+        with self._lock:
+            for path in self.directory.glob("*.json"):
+                try:
+                    path.unlink()
+                    count += 1
+                except OSError as exc:
+                    self.logger.error(f"Failed to delete cached file {path}: {exc}")
+            self._days = {}
+            self._month_sizes = {}
+            self._month_cache.clear()
+            self._save_index()
+        return count
+
+    def get_status(self) -> dict[str, Any]:
+        with self._lock:
+            days = self._load_index()
+            present = [day_key for day_key, entry in days.items() if entry.get("intervals")]
+            return {
+                "days_count": len(present),
+                "cached_from": min(present) if present else None,
+                "cached_to": max(present) if present else None,
+                "size_bytes": sum(self._month_sizes.values()),
+            }
+
@@ -1,3 +1,5 @@
+import io
+import json
 import logging
 import requests
 import re
@@ -14,12 +16,16 @@ from pricing import (
     PRICE_PROVIDER_SPOT,
     _safe_float,
     calculate_final_price,
+    fee_snapshot_hash,
     get_price_provider,
     normalize_price_provider,
     parse_price_html,
     is_price_cache_provider_match,
 )
 from services.runtime_state import RuntimeState
+from services.cache_manager import BoundedLRUCache
+from services.price_vector import DayPriceVector
+from services.fx_rate_store import FxRateStore
 from cache import should_use_daily_cache, is_today_date
 
 logger = logging.getLogger("uvicorn.error")
@@ -28,6 +34,8 @@ OTE_PUBLIC_URL = "https://www.ote-cr.cz/services/PublicDataService"
 OTE_PUBLIC_URL_HTTP = "http://www.ote-cr.cz/services/PublicDataService"
 OTE_SOAP_ACTION_GET_DAM_PRICE_PERIOD_E = "http://www.ote-cr.cz/schema/service/public/GetDamPricePeriodE"
 CNB_RATES_URL = "https://api.cnb.cz/cnbapi/exrates/daily"
+CNB_RATES_MONTH_URL = "https://api.cnb.cz/cnbapi/exrates/daily-currencymonth"
+CNB_RATES_YEAR_URL = "https://www.cnb.cz/cs/financni-trhy/devizovy-trh/kurzy-devizoveho-trhu/kurzy-devizoveho-trhu/rok.txt"
 OTE_PUBLIC_NS = "{http://www.ote-cr.cz/schema/service/public}"
 SOAP_FAULT_NS = "{http://schemas.xmlsoap.org/soap/envelope/}"
 PRAGUE_TZ = ZoneInfo("Europe/Prague")
@@ -35,8 +43,17 @@ OTE_FAILURE_RETRY_SECONDS = 600
 
 RUNTIME_STATE = RuntimeState()
 
-PRICES_CACHE = {}
-PRICES_CACHE_PROVIDER = {}
+PRICES_CACHE_MAX_DAYS = 400
+# Longest historical range prefetch_price_range accepts in one call.
+PRICE_RANGE_MAX_DAYS = 366
+FINAL_PRICES_CACHE_MAX_ENTRIES = 256
+
+PRICES_CACHE = BoundedLRUCache(PRICES_CACHE_MAX_DAYS)
+PRICES_CACHE_PROVIDER = BoundedLRUCache(PRICES_CACHE_MAX_DAYS)
+# (date, provider, fee snapshot, VT periods) -> (raw entries, fee-applied entries)
+FINAL_PRICES_CACHE = BoundedLRUCache(FINAL_PRICES_CACHE_MAX_ENTRIES)
+# In memory until app_service points it at fx-rates.json via configure_fx_rate_store.
+FX_RATE_STORE = FxRateStore()
 
 def mark_ote_unavailable(reason):
     RUNTIME_STATE.mark_ote_unavailable(OTE_FAILURE_RETRY_SECONDS)
@@ -168,45 +185,91 @@ def fetch_ote_prices_xml(start_date: datetime_date, end_date: datetime_date) ->
         raise last_exc
     raise HTTPException(status_code=502, detail="OTE request failed.")
 
-def parse_ote_prices_xml(xml_text: str) -> Dict[str, List[Dict[str, Any]]]:
-    try:
-        root = ET.fromstring(xml_text)
-    except ET.ParseError as exc:
-        raise HTTPException(status_code=502, detail="OTE response could not be parsed.") from exc
+class _OteDayClock:
+    """UTC start of each OTE delivery day in Prague, computed once per distinct date."""
 
-    fault = root.find(f".//{SOAP_FAULT_NS}Fault")
-    if fault is not None:
-        fault_string = fault.findtext("faultstring") or "Unknown OTE SOAP fault."
-        raise HTTPException(status_code=502, detail=f"OTE request failed: {fault_string}")
+    __slots__ = ("_days",)
 
-    rows_by_date = {}
-    for item in root.findall(f".//{OTE_PUBLIC_NS}Item"):
-        date_text = item.findtext(f"{OTE_PUBLIC_NS}Date")
-        period_index_text = item.findtext(f"{OTE_PUBLIC_NS}PeriodIndex")
-        price_text = item.findtext(f"{OTE_PUBLIC_NS}Price")
-        if not date_text or not period_index_text or not price_text:
-            continue
-        try:
+    def __init__(self):
+        self._days: Dict[str, Tuple[datetime, bool]] = {}
+
+    def _day(self, date_text: str) -> Tuple[datetime, bool]:
+        day = self._days.get(date_text)
+        if day is None:
             current_date = datetime.strptime(date_text, "%Y-%m-%d").date()
-            period_index = int(period_index_text)
-            if period_index < 1 or period_index > 100:
+            start_local = datetime.combine(current_date, datetime_time(0), tzinfo=PRAGUE_TZ)
+            end_local = datetime.combine(current_date + timedelta(days=1), datetime_time(0), tzinfo=PRAGUE_TZ)
+            # Without a DST switch the period index maps straight onto the local wall clock.
+            day = (start_local.astimezone(timezone.utc), start_local.utcoffset() == end_local.utcoffset())
+            self._days[date_text] = day
+        return day
+
+    def slot(self, date_text: str, period_index: int) -> Tuple[str, int, int]:
+        start_utc, fixed_offset = self._day(date_text)
+        minutes = (period_index - 1) * 15
+        if fixed_offset and minutes < 24 * 60:
+            return date_text, minutes // 60, minutes % 60
+        slot_local = (start_utc + timedelta(minutes=minutes)).astimezone(PRAGUE_TZ)
+        return slot_local.strftime("%Y-%m-%d"), slot_local.hour, slot_local.minute
+
+def parse_ote_prices_xml(xml_source) -> Dict[str, List[Dict[str, Any]]]:
+    """Rows of GetDamPricePeriodE keyed by local delivery date.
+
+    The envelope is read with iterparse and every Item is dropped once its three
+    fields are taken, so month-long responses never build a full element tree.
+    Accepts the response text, bytes or a binary file object.
+    """
+    if isinstance(xml_source, str):
+        xml_source = io.StringIO(xml_source)
+    elif isinstance(xml_source, (bytes, bytearray)):
+        xml_source = io.BytesIO(xml_source)
+
+    item_tag = f"{OTE_PUBLIC_NS}Item"
+    field_tags = {f"{OTE_PUBLIC_NS}Date": "date", f"{OTE_PUBLIC_NS}PeriodIndex": "period", f"{OTE_PUBLIC_NS}Price": "price"}
+    fault_tag = f"{SOAP_FAULT_NS}Fault"
+    clock = _OteDayClock()
+    rows_by_date = {}
+    fields: Dict[str, str] = {}
+    parents = []
+    try:
+        for event, elem in ET.iterparse(xml_source, events=("start", "end")):
+            if event == "start":
+                parents.append(elem)
                 continue
-            price_eur_mwh = float(price_text)
-        except ValueError:
-            continue
-
-        start_of_day_local = datetime.combine(current_date, datetime_time(0), tzinfo=PRAGUE_TZ)
-        slot_utc = start_of_day_local.astimezone(timezone.utc) + timedelta(minutes=(period_index - 1) * 15)
-        slot_local = slot_utc.astimezone(PRAGUE_TZ)
-        slot_date = slot_local.strftime("%Y-%m-%d")
-
-        rows_by_date.setdefault(slot_date, []).append(
-            {
-                "hour": slot_local.hour,
-                "minute": slot_local.minute,
-                "price_eur_mwh": price_eur_mwh,
-            }
-        )
+            parents.pop()
+            tag = elem.tag
+            field = field_tags.get(tag)
+            if field:
+                fields[field] = elem.text or ""
+                continue
+            if tag == fault_tag:
+                fault_string = elem.findtext("faultstring") or "Unknown OTE SOAP fault."
+                raise HTTPException(status_code=502, detail=f"OTE request failed: {fault_string}")
+            if tag != item_tag:
+                continue
+            if parents:
+                parents[-1].remove(elem)
+            date_text, period_index_text, price_text = fields.get("date"), fields.get("period"), fields.get("price")
+            fields = {}
+            if not date_text or not period_index_text or not price_text:
+                continue
+            try:
+                period_index = int(period_index_text)
+                if period_index < 1 or period_index > 100:
+                    continue
+                price_eur_mwh = float(price_text)
+                slot_date, hour, minute = clock.slot(date_text, period_index)
+            except ValueError:
+                continue
+            rows_by_date.setdefault(slot_date, []).append(
+                {
+                    "hour": hour,
+                    "minute": minute,
+                    "price_eur_mwh": price_eur_mwh,
+                }
+            )
+    except ET.ParseError as exc:
+        raise HTTPException(status_code=502, detail="OTE response could not be parsed.") from exc
 
     for date_str in rows_by_date:
         rows_by_date[date_str].sort(key=lambda item: (item["hour"], item["minute"]))
@@ -230,7 +293,28 @@ def extract_eur_czk_from_cnb_payload(payload: Any) -> float | None:
             return value / amount
     return None
 
+def _cnb_valid_for(payload: Any) -> str | None:
+    for rate in payload.get("rates", []) if isinstance(payload, dict) else []:
+        if isinstance(rate, dict) and str(rate.get("currencyCode", "")).upper() == "EUR" and rate.get("validFor"):
+            return str(rate["validFor"])[:10]
+    return None
+
+def _fx_checked_until() -> datetime_date:
+    # Every fixing up to yesterday is published; today's appears in the afternoon.
+    return datetime.now(PRAGUE_TZ).date() - timedelta(days=1)
+
+def configure_fx_rate_store(path) -> FxRateStore:
+    global FX_RATE_STORE
+    FX_RATE_STORE = FxRateStore(path)
+    return FX_RATE_STORE
+
+def get_fx_rate_store() -> FxRateStore:
+    return FX_RATE_STORE
+
 def get_eur_czk_rate_for_date(day: datetime_date) -> float:
+    cached = FX_RATE_STORE.rate_on(day.isoformat())
+    if cached is not None:
+        return cached
     for offset in range(7):
         query_day = day - timedelta(days=offset)
         try:
@@ -245,9 +329,221 @@ def get_eur_czk_rate_for_date(day: datetime_date) -> float:
             continue
         eur_czk = extract_eur_czk_from_cnb_payload(payload)
         if eur_czk is not None:
+            valid_for = _cnb_valid_for(payload) or query_day.isoformat()
+            covered_end = min(query_day, _fx_checked_until()).isoformat()
+            FX_RATE_STORE.add({valid_for: eur_czk}, covered=(valid_for, covered_end))
             return eur_czk
     raise HTTPException(status_code=502, detail="CNB FX rate EUR/CZK is not available.")
 
+def get_eur_czk_rates_for_month(year_month: str) -> Dict[str, float]:
+    """EUR/CZK rates of one month from a single CNB request, keyed by their validFor date."""
+    response = requests.get(CNB_RATES_MONTH_URL, params={"currency": "EUR", "yearMonth": year_month}, timeout=10)
+    response.raise_for_status()
+    payload = response.json()
+    rates_by_date = {}
+    for rate in payload.get("rates", []) if isinstance(payload, dict) else []:
+        if not isinstance(rate, dict) or not rate.get("validFor"):
+            continue
+        eur_czk = extract_eur_czk_from_cnb_payload({"rates": [rate]})
+        if eur_czk is not None:
+            rates_by_date[str(rate["validFor"])[:10]] = eur_czk
+    return rates_by_date
+
+def parse_cnb_year_rates(text: str) -> Dict[str, float]:
+    """EUR/CZK rates from CNB's yearly fixing file ("Datum|1 AUD|...|1 EUR|..." then "02.01.2025|...")."""
+    rates_by_date = {}
+    eur_column = None
+    eur_amount = 1.0
+    for line in text.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) < 2:
+            continue
+        if not fields[0][:1].isdigit():
+            # Header row; it repeats whenever the list of currencies changes during the year.
+            eur_column = None
+            for index, name in enumerate(fields[1:], start=1):
+                parts = name.split()
+                if len(parts) == 2 and parts[1].upper() == "EUR":
+                    eur_column, eur_amount = index, _safe_float(parts[0]) or 1.0
+            continue
+        if eur_column is None or eur_column >= len(fields):
+            continue
+        try:
+            day = datetime.strptime(fields[0], "%d.%m.%Y").date()
+        except ValueError:
+            continue
+        value = _safe_float(fields[eur_column].replace(",", "."))
+        if value > 0:
+            rates_by_date[day.isoformat()] = value / eur_amount
+    return rates_by_date
+
+def fill_eur_czk_rates_for_year(year: int) -> int:
+    """Load a whole year of EUR/CZK fixings into the FX rate store with one CNB request."""
+    response = requests.get(CNB_RATES_YEAR_URL, params={"rok": year}, timeout=20)
+    response.raise_for_status()
+    rates_by_date = parse_cnb_year_rates(response.text)
+    if not rates_by_date:
+        raise ValueError(f"CNB yearly rates for {year} contain no EUR fixing")
+    covered_end = min(datetime_date(year, 12, 31), _fx_checked_until())
+    FX_RATE_STORE.add(rates_by_date, covered=(f"{year}-01-01", covered_end.isoformat()))
+    return len(rates_by_date)
+
+def fill_eur_czk_rates_for_month(year_month: str) -> int:
+    rates_by_date = get_eur_czk_rates_for_month(year_month)
+    year, month = map(int, year_month.split("-"))
+    month_end = datetime_date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    covered_end = min(month_end, _fx_checked_until())
+    FX_RATE_STORE.add(rates_by_date, covered=(f"{year_month}-01", covered_end.isoformat()))
+    return len(rates_by_date)
+
+def ensure_eur_czk_rates(dates: List[str]) -> int:
+    """Bulk-fill the FX rate store for dates it cannot resolve yet; returns the number of CNB requests.
+
+    Each missing year costs one request for CNB's yearly file. When that fails, the
+    monthly tables are used instead, plus the previous month when a month starts
+    before its first fixing. Whatever stays unresolved falls back to per-day lookups.
+    """
+    requests_made = 0
+    unresolved = [date_str for date_str in dates if FX_RATE_STORE.rate_on(date_str) is None]
+    years_to_load = sorted({int(date_str[:4]) for date_str in unresolved}, reverse=True)
+    loaded_years = set()
+    while years_to_load:
+        year = years_to_load.pop()
+        if year in loaded_years:
+            continue
+        loaded_years.add(year)
+        try:
+            requests_made += 1
+            fill_eur_czk_rates_for_year(year)
+        except (RequestException, ValueError) as exc:
+            logger.warning("CNB yearly EUR/CZK rates failed for %s: %s", year, exc)
+            continue
+        # Early January days fall before the year's first fixing and need the previous year's last one.
+        first = next((date_str for date_str in unresolved if date_str[:4] == str(year)), None)
+        if first and FX_RATE_STORE.rate_on(first) is None:
+            years_to_load.append(year - 1)
+    unresolved = [date_str for date_str in unresolved if FX_RATE_STORE.rate_on(date_str) is None]
+    for chunk in _month_chunks(unresolved):
+        months_to_load = [chunk[0][:7]]
+        while months_to_load:
+            year_month = months_to_load.pop()
+            try:
+                requests_made += 1
+                fill_eur_czk_rates_for_month(year_month)
+            except (RequestException, ValueError) as exc:
+                logger.warning("CNB monthly EUR/CZK table failed for %s: %s", year_month, exc)
+                continue
+            # A month starting on a weekend or holiday needs the previous month's last fixing.
+            if year_month == chunk[0][:7] and FX_RATE_STORE.rate_on(chunk[0]) is None:
+                months_to_load.append(_previous_month(year_month))
+    return requests_made
+
+def _month_chunks(dates: List[str]) -> List[List[str]]:
+    chunks: Dict[str, List[str]] = {}
+    for date_str in dates:
+        chunks.setdefault(date_str[:7], []).append(date_str)
+    return [chunks[month] for month in sorted(chunks)]
+
+def _previous_month(year_month: str) -> str:
+    year, month = map(int, year_month.split("-"))
+    return f"{year - 1}-12" if month == 1 else f"{year}-{month - 1:02d}"
+
+def prefetch_price_range(
+    cfg: dict[str, Any],
+    start_date: datetime_date,
+    end_date: datetime_date,
+    tzinfo,
+    force_refresh: bool = False,
+    load_prices_cache_fn = None,
+    save_prices_cache_fn = None,
+    get_cached_price_provider_fn = None,
+    get_fee_snapshot_for_date_fn = None,
+) -> Dict[str, Any]:
+    """Fill prices-*.json for historical days in bulk: one OTE request per month, EUR/CZK from the FX rate store.
+
+    Live days (today, tomorrow) are left to get_prices_for_date. Days that already
+    have a usable cache file are only loaded into memory. Only the OTE provider
+    can be fetched by range; for other providers nothing is fetched.
+    """
+    provider = get_price_provider(cfg)
+    today = datetime.now(tzinfo).date()
+    last_date = min(end_date, today - timedelta(days=1))
+    dates = []
+    current = start_date
+    while current <= last_date:
+        dates.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+
+    result = {
+        "provider": provider,
+        "start": start_date.isoformat(),
+        "end": last_date.isoformat() if dates else None,
+        "days": len(dates),
+        "cached": 0,
+        "fetched": 0,
+        "failed": [],
+        "requests": {"ote": 0, "cnb": 0},
+    }
+    missing = []
+    for date_str in dates:
+        if not force_refresh:
+            cached = PRICES_CACHE.get(date_str)
+            if not cached:
+                cached = load_prices_cache_fn(date_str)
+                if cached and _cache_has_invoice_metadata(cached, provider):
+                    PRICES_CACHE[date_str] = cached
+                    PRICES_CACHE_PROVIDER[date_str] = get_cached_price_provider_fn(date_str)
+            if cached and _cache_has_invoice_metadata(cached, provider):
+                result["cached"] += 1
+                continue
+        missing.append(date_str)
+
+    if provider != PRICE_PROVIDER_OTE:
+        result["failed"] = missing
+        return result
+    if missing:
+        result["requests"]["cnb"] += ensure_eur_czk_rates(missing)
+
+    for chunk in _month_chunks(missing):
+        if not force_refresh and is_ote_unavailable():
+            logger.info("Skipping OTE range fetch for %s..%s due to cooldown", chunk[0], chunk[-1])
+            result["failed"].extend(chunk)
+            continue
+        try:
+            rows_by_date = parse_ote_prices_xml(
+                fetch_ote_prices_xml(
+                    datetime.strptime(chunk[0], "%Y-%m-%d").date(),
+                    datetime.strptime(chunk[-1], "%Y-%m-%d").date(),
+                )
+            )
+            result["requests"]["ote"] += 1
+        except Exception as exc:
+            mark_ote_unavailable(exc)
+            logger.warning("OTE range prices fetch failed for %s..%s: %s", chunk[0], chunk[-1], exc)
+            result["failed"].extend(chunk)
+            continue
+
+        for date_str in chunk:
+            items = rows_by_date.get(date_str)
+            if not items:
+                result["failed"].append(date_str)
+                continue
+            eur_czk = FX_RATE_STORE.rate_on(date_str)
+            try:
+                if eur_czk is None:
+                    eur_czk = get_eur_czk_rate_for_date(datetime.strptime(date_str, "%Y-%m-%d").date())
+                    result["requests"]["cnb"] += 1
+            except HTTPException as exc:
+                logger.warning("CNB EUR/CZK rate unavailable for %s: %s", date_str, exc.detail)
+                result["failed"].append(date_str)
+                continue
+            fee_snapshot = get_fee_snapshot_for_date_fn(cfg, date_str, tzinfo)
+            entries = build_entries_from_ote(cfg, date_str, items, fee_snapshot, eur_czk)
+            PRICES_CACHE[date_str], PRICES_CACHE_PROVIDER[date_str] = entries, PRICE_PROVIDER_OTE
+            save_prices_cache_fn(date_str, entries, provider=PRICE_PROVIDER_OTE)
+            result["fetched"] += 1
+    return result
+
 def get_ote_entries_for_dates(
     cfg: dict[str, Any],
     dates: List[str],
@@ -298,6 +594,39 @@ def apply_fee_snapshot(
         adjusted.append({**entry, "final": final})
     return adjusted
 
+def apply_fee_snapshot_cached(
+    date_str: str,
+    provider: str,
+    entries: List[Dict[str, Any]],
+    cfg: dict[str, Any],
+    fee_snapshot: Dict[str, Any],
+    snapshot_key: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """apply_fee_snapshot memoized per raw entry list; the returned entry dicts are shared and read-only.
+
+    snapshot_key is the fee snapshot's precomputed hash (see config_loader.get_fee_snapshot_key).
+    """
+    if not entries:
+        return []
+    vt_periods = cfg.get("tarif", {}).get("vt_periods", [])
+    try:
+        vt_key = tuple(tuple(period) for period in vt_periods or ())
+    except TypeError:
+        vt_key = json.dumps(vt_periods, default=str)
+    key = (
+        date_str,
+        provider,
+        snapshot_key if snapshot_key is not None else fee_snapshot_hash(fee_snapshot),
+        vt_key,
+    )
+    cached = FINAL_PRICES_CACHE.get(key)
+    # Raw entries are replaced (never mutated) on refetch, so identity marks a stale memo.
+    if cached is not None and cached[0] is entries:
+        return list(cached[1])
+    adjusted = apply_fee_snapshot(entries, cfg, fee_snapshot)
+    FINAL_PRICES_CACHE[key] = (entries, adjusted)
+    return list(adjusted)
+
 
 def _cache_has_invoice_metadata(entries: List[Dict[str, Any]], provider: str) -> bool:
     if provider != PRICE_PROVIDER_OTE:
@@ -318,10 +647,12 @@ def get_prices_for_date(
     save_prices_cache_fn = None,
     get_cached_price_provider_fn = None,
     get_fee_snapshot_for_date_fn = None,
+    get_fee_snapshot_key_fn = None,
 ) -> List[Dict[str, Any]]:
     provider = get_price_provider(cfg)
     effective_provider = provider
     fee_snapshot = get_fee_snapshot_for_date_fn(cfg, date_str, tzinfo)
+    snapshot_key = get_fee_snapshot_key_fn(fee_snapshot) if get_fee_snapshot_key_fn else None
     date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
     today = datetime.now(tzinfo).date()
     tomorrow = today + timedelta(days=1)
@@ -331,7 +662,7 @@ def get_prices_for_date(
         cached = PRICES_CACHE.get(date_str)
         if cached:
             if _cache_has_invoice_metadata(cached, provider) and (not is_live_date or is_price_cache_provider_match(date_str, provider, get_cached_price_provider_fn)):
-                return apply_fee_snapshot(cached, cfg, fee_snapshot)
+                return apply_fee_snapshot_cached(date_str, provider, cached, cfg, fee_snapshot, snapshot_key)
             cached_provider = get_cached_price_provider_fn(date_str)
             logger.info("Skipping in-memory cache for %s due to provider switch (%s -> %s)", date_str, cached_provider, provider)
 
@@ -346,7 +677,7 @@ def get_prices_for_date(
                 PRICES_CACHE[date_str] = cached
                 PRICES_CACHE_PROVIDER[date_str] = cached_provider
                 logger.info("Prices cache hit for %s", date_str)
-                return apply_fee_snapshot(cached, cfg, fee_snapshot)
+                return apply_fee_snapshot_cached(date_str, provider, cached, cfg, fee_snapshot, snapshot_key)
 
     entries = []
     if is_live_date:
@@ -441,14 +772,21 @@ def get_prices_for_date(
         save_prices_cache_fn(date_str, entries, provider=effective_provider)
     return apply_fee_snapshot(entries, cfg, fee_snapshot)
 
-def build_price_map_for_date(cfg, date_str, tzinfo, get_prices_for_date_fn):
+def _load_entries_for_price_map(cfg, date_str, tzinfo, get_prices_for_date_fn):
     try:
-        entries = get_prices_for_date_fn(cfg=cfg, date=date_str, tzinfo=tzinfo)
+        return get_prices_for_date_fn(cfg=cfg, date=date_str, tzinfo=tzinfo)
     except TypeError as exc:
         message = str(exc)
         if "unexpected keyword argument" not in message and "positional argument" not in message:
             raise
-        entries = get_prices_for_date_fn(cfg, date_str, tzinfo)
+        return get_prices_for_date_fn(cfg, date_str, tzinfo)
+
+def build_price_vector_for_date(cfg, date_str, tzinfo, get_prices_for_date_fn):
+    entries = _load_entries_for_price_map(cfg, date_str, tzinfo, get_prices_for_date_fn)
+    return DayPriceVector.from_entries(date_str, entries, tzinfo)
+
+def build_price_map_for_date(cfg, date_str, tzinfo, get_prices_for_date_fn):
+    entries = _load_entries_for_price_map(cfg, date_str, tzinfo, get_prices_for_date_fn)
     price_map = {}
     price_map_utc = {}
     for entry in entries:
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+SLOT_SECONDS = 900
+
+
+@lru_cache(maxsize=4096)
+def _utc_day_epoch(date_prefix: str) -> int:
+    return int(datetime.strptime(date_prefix, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+def iso_to_epoch(value: Any) -> int | None:
+    """Epoch seconds of an ISO-8601 timestamp ("...Z" or "...+HH:MM") using string slicing only."""
+    if not isinstance(value, str) or len(value) < 16 or value[10] != "T":
+        return None
+    try:
+        epoch = _utc_day_epoch(value[:10]) + int(value[11:13]) * 3600 + int(value[14:16]) * 60
+        if len(value) >= 19 and value[16] == ":":
+            epoch += int(value[17:19])
+            tail = value[19:]
+        else:
+            tail = value[16:]
+        if tail.startswith("."):
+            tail = tail.lstrip(".0123456789")
+        if not tail or tail == "Z":
+            return epoch
+        sign = 1 if tail[0] == "+" else -1 if tail[0] == "-" else 0
+        if sign == 0 or len(tail) < 6 or tail[3] != ":":
+            return None
+        return epoch - sign * (int(tail[1:3]) * 3600 + int(tail[4:6]) * 60)
+    except ValueError:
+        return None
+
+
+class DayPriceVector:
+    """Prices of one local day as a slot array indexed by UTC offset from local midnight.
+
+    DST days have 92 or 100 quarter-hour slots. Points are joined to prices by
+    integer arithmetic on their UTC epoch; wall-clock times repeated on the
+    fall-back day map to consecutive slots in the order the entries list them.
+    ``wall_slots`` holds the local quarter-hour (hour * 4 + minute // 15) of each slot.
+    """
+
+    __slots__ = ("date", "start_epoch", "slot_count", "prices", "wall_slots")
+
+    def __init__(
+        self,
+        date_str: str,
+        start_epoch: int,
+        slot_count: int,
+        prices: list[dict[str, Any] | None],
+        wall_slots: list[int] | None = None,
+    ):
+        self.date = date_str
+        self.start_epoch = start_epoch
+        self.slot_count = slot_count
+        self.prices = prices
+        self.wall_slots = wall_slots if wall_slots is not None else [index % 96 for index in range(slot_count)]
+
+    @classmethod
+    def from_entries(cls, date_str: str, entries: list[dict[str, Any]], tzinfo) -> "DayPriceVector":
+        day = datetime.strptime(date_str, "%Y-%m-%d")
+        start_epoch = int(day.replace(tzinfo=tzinfo).timestamp())
+        next_epoch = int((day + timedelta(days=1)).replace(tzinfo=tzinfo).timestamp())
+        slot_count = (next_epoch - start_epoch) // SLOT_SECONDS
+        prices: list[dict[str, Any] | None] = [None] * slot_count
+        seen_wall_times = set()
+        for entry in entries:
+            time_str = entry["time"]
+            wall = datetime.strptime(time_str, "%Y-%m-%d %H:%M")
+            # The second occurrence of a wall time is the repeated hour after the DST fall-back.
+            fold = 1 if time_str in seen_wall_times else 0
+            seen_wall_times.add(time_str)
+            offset = int(wall.replace(tzinfo=tzinfo, fold=fold).timestamp()) - start_epoch
+            if offset % SLOT_SECONDS:
+                continue
+            index = offset // SLOT_SECONDS
+            if not 0 <= index < slot_count:
+                continue
+            prices[index] = {
+                "spot": entry["spot"],
+                "final": entry["final"],
+                "price_czk_mwh": entry.get("price_czk_mwh", entry["spot"] * 1000.0),
+                "price_eur_mwh": entry.get("price_eur_mwh"),
+                "eur_czk_rate": entry.get("eur_czk_rate"),
+            }
+        wall_slots = []
+        for index in range(slot_count):
+            local = datetime.fromtimestamp(start_epoch + index * SLOT_SECONDS, tzinfo)
+            wall_slots.append(local.hour * 4 + local.minute // 15)
+        return cls(date_str, start_epoch, slot_count, prices, wall_slots)
+
+    def index_at_epoch(self, epoch: int | None) -> int | None:
+        if epoch is None:
+            return None
+        offset_minutes = (epoch - self.start_epoch) // 60
+        # Prices are keyed by slot start at minute resolution, like the "HH:MM" string maps were.
+        if offset_minutes < 0 or offset_minutes % (SLOT_SECONDS // 60):
+            return None
+        index = offset_minutes // (SLOT_SECONDS // 60)
+        return index if index < self.slot_count else None
+
+    def index_for_point(self, entry: dict[str, Any]) -> int | None:
+        epoch = iso_to_epoch(entry.get("time_utc"))
+        if epoch is None:
+            epoch = iso_to_epoch(entry.get("time"))
+        return self.index_at_epoch(epoch)
+
+    def price_at_epoch(self, epoch: int | None) -> dict[str, Any] | None:
+        index = self.index_at_epoch(epoch)
+        return None if index is None else self.prices[index]
+
+    def price_for_point(self, entry: dict[str, Any]) -> dict[str, Any] | None:
+        index = self.index_for_point(entry)
+        return None if index is None else self.prices[index]
+
+
+class LegacyPriceMapLookup:
+    """Adapter for (price_map, price_map_utc) pairs keyed by "YYYY-MM-DD HH:MM"."""
+
+    __slots__ = ("price_map", "price_map_utc")
+
+    def __init__(self, price_map: dict[str, dict[str, Any]], price_map_utc: dict[str, dict[str, Any]]):
+        self.price_map = price_map
+        self.price_map_utc = price_map_utc
+
+    @staticmethod
+    def _slot_key_from_iso(value: Any) -> str | None:
+        if not isinstance(value, str) or len(value) < 16 or value[10] != "T":
+            return None
+        return f"{value[:10]} {value[11:16]}"
+
+    def price_for_point(self, entry: dict[str, Any]) -> dict[str, Any] | None:
+        local_key = self._slot_key_from_iso(entry.get("time"))
+        price = self.price_map.get(local_key) if local_key else None
+        if price is None:
+            utc_key = self._slot_key_from_iso(entry.get("time_utc"))
+            price = self.price_map_utc.get(utc_key) if utc_key else None
+        return price
+
+
+def as_price_lookup(prices) -> DayPriceVector | LegacyPriceMapLookup:
+    if isinstance(prices, (DayPriceVector, LegacyPriceMapLookup)):
+        return prices
+    price_map, price_map_utc = prices
+    return LegacyPriceMapLookup(price_map, price_map_utc)
+
+
+def local_hour_minute(value: Any) -> tuple[int, int] | None:
+    # Wall-clock hour/minute straight from an ISO string ("YYYY-MM-DDTHH:MM...");
+    # other ISO shapes go through fromisoformat. None only if unparseable.
+    if isinstance(value, str) and len(value) >= 16 and value[10] == "T":
+        try:
+            return int(value[11:13]), int(value[14:16])
+        except ValueError:
+            pass
+    try:
+        parsed = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed.hour, parsed.minute
@@ -13,10 +13,14 @@ class PricesService:
         get_prices_for_date: Callable[..., list[dict[str, Any]]],
         get_price_provider: Callable[[dict[str, Any]], str],
         clear_prices_cache_for_date: Callable[..., None],
+        prefetch_price_range: Callable[..., dict[str, Any]] | None = None,
+        max_range_days: int = 366,
     ):
         self._get_prices_for_date = get_prices_for_date
         self._get_price_provider = get_price_provider
         self._clear_prices_cache_for_date = clear_prices_cache_for_date
+        self._prefetch_price_range = prefetch_price_range
+        self._max_range_days = max_range_days
 
     def get_prices(
         self, 
@@ -71,3 +75,20 @@ class PricesService:
             "provider": provider,
             "refreshed": refreshed,
         }
+
+    def prefetch_price_range(
+        self, *, start: str, end: str, cfg: dict[str, Any], tzinfo, force_refresh: bool = False
+    ) -> dict[str, Any]:
+        if self._prefetch_price_range is None:
+            raise HTTPException(status_code=501, detail="Price range prefetch is not available.")
+        try:
+            start_date = datetime.strptime(str(start), "%Y-%m-%d").date()
+            end_date = datetime.strptime(str(end), "%Y-%m-%d").date()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.") from exc
+        if end_date < start_date:
+            raise HTTPException(status_code=400, detail="End date must not precede start date.")
+        if (end_date - start_date).days >= self._max_range_days:
+            raise HTTPException(status_code=400, detail=f"Date range is limited to {self._max_range_days} days.")
+        result = self._prefetch_price_range(cfg, start_date, end_date, tzinfo, force_refresh=force_refresh)
+        return {"status": "ok", **result}
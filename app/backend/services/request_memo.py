@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class RequestMemo:
+    """Single-flight memo scoped to one request.
+
+    The first caller of a key runs the function; concurrent callers of the same
+    key block on the same future and receive the same result (or exception).
+    Results are shared between callers and must be treated as read-only.
+
+    A worker thread never blocks on a key a coroutine is still computing: that
+    coroutine may itself be waiting for a pool thread, so the thread computes
+    the value on its own instead (it is not shared). Coroutines may await any
+    pending key, since awaiting does not hold a thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures: dict[Hashable, Future] = {}
+        self._async_owned: set[Hashable] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def call(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+                self.misses += 1
+            elif key in self._async_owned and not future.done():
+                future = None
+                self.misses += 1
+            else:
+                self.hits += 1
+        if future is None:
+            return fn()
+        if not owner:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        future.set_result(result)
+        return result
+
+    async def call_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        # Shares futures with call(); worker threads reuse a coroutine's result only once it is resolved.
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._futures[key] = future
+                self._async_owned.add(key)
+                self.misses += 1
+            else:
+                self.hits += 1
+        if not owner:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await fn()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        future.set_result(result)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "keys": len(self._futures)}
+
+
+ACTIVE_REQUEST_MEMO: ContextVar[Optional[RequestMemo]] = ContextVar("active_request_memo", default=None)
+
+
+def memoize_in_request(key: Hashable, fn: Callable[[], Any]) -> Any:
+    memo = ACTIVE_REQUEST_MEMO.get()
+    if memo is None:
+        return fn()
+    return memo.call(key, fn)
+
+
+async def memoize_in_request_async(key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    memo = ACTIVE_REQUEST_MEMO.get()
+    if memo is None:
+        return await fn()
+    return await memo.call_async(key, fn)
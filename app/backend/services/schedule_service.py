@@ -1,75 +1,104 @@
 from __future__ import annotations
 
+import hashlib
 from datetime import datetime, timedelta
 from typing import Any, Callable
 
+from services.cache_manager import BoundedLRUCache
+
+# Schedules per (dates, duration, count, earliest start, price digest); prices change rarely within a day.
+SCHEDULE_CACHE_SIZE = 128
+
+
+def _wall_minutes(time_str: str) -> int:
+    # "YYYY-MM-DD HH:MM" -> minutes on the local wall clock (aware datetimes sharing a tzinfo compare this way).
+    day = datetime.strptime(time_str[:10], "%Y-%m-%d").toordinal()
+    return day * 1440 + int(time_str[11:13]) * 60 + int(time_str[14:16])
+
+
+class _PricedDay:
+    """Price entries of one day sorted by time, with prefix sums for O(1) window averages."""
+
+    __slots__ = ("times", "finals", "minutes", "prefix")
+
+    def __init__(self, entries: list[dict[str, Any]]):
+        entries_sorted = sorted(entries, key=lambda x: x["time"])
+        self.times = [entry["time"] for entry in entries_sorted]
+        self.finals = [entry["final"] for entry in entries_sorted]
+        self.minutes = None
+        prefix = [0.0]
+        total = 0.0
+        for entry in entries_sorted:
+            total += entry["final"]
+            prefix.append(total)
+        self.prefix = prefix
+
+    def wall_minutes(self) -> list[int]:
+        if self.minutes is None:
+            self.minutes = [_wall_minutes(value) for value in self.times]
+        return self.minutes
+
 
 class ScheduleService:
     def __init__(self, *, get_prices_for_date: Callable[..., list[dict[str, Any]]]):
         self._get_prices_for_date = get_prices_for_date
+        self._cache = BoundedLRUCache(SCHEDULE_CACHE_SIZE)
 
-    def get_schedule(self, *, duration: int, count: int, cfg: dict[str, Any], tzinfo) -> dict[str, Any]:
-        now = datetime.now(tzinfo)
-        today = now.date()
-        tomorrow = today + timedelta(days=1)
-
-        duration = max(1, min(360, duration))
+    @staticmethod
+    def _next_slot(dt):
+        minute = (dt.minute // 15 + (1 if dt.minute % 15 else 0)) * 15
+        if minute == 60:
+            return dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        return dt.replace(minute=minute, second=0, microsecond=0)
 
-        def next_slot(dt):
-            minute = (dt.minute // 15 + (1 if dt.minute % 15 else 0)) * 15
-            if minute == 60:
-                return dt.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-            return dt.replace(minute=minute, second=0, microsecond=0)
+    @staticmethod
+    def _prices_digest(days: list[tuple[Any, list[dict[str, Any]]]]) -> str:
+        # Final prices already carry the fee snapshot, so this also changes when fees do.
+        digest = hashlib.blake2b(digest_size=16)
+        for date_obj, entries in days:
+            digest.update(str(date_obj).encode())
+            for entry in entries or ():
+                digest.update(f"{entry.get('time')}={entry.get('final')};".encode())
+        return digest.hexdigest()
 
-        min_start = next_slot(now)
+    def _plan(self, priced_days, duration: int, count: int, min_start_minutes: int, today) -> dict[str, Any]:
         slots = int((duration + 14) // 15)
+        energy_kwh = duration / 60.0
         candidates = []
-
-        for date_obj in (today, tomorrow):
-            date_str = date_obj.strftime("%Y-%m-%d")
-            entries = self._get_prices_for_date(cfg, date_str, tzinfo)
-            if not entries:
-                continue
-            entries_sorted = sorted(entries, key=lambda x: x["time"])
-            if len(entries_sorted) < slots:
+        for date_obj, day in priced_days:
+            n = len(day.times)
+            if n < slots:
                 continue
-            for i in range(0, len(entries_sorted) - slots + 1):
-                window = entries_sorted[i : i + slots]
-                window_start = datetime.strptime(window[0]["time"], "%Y-%m-%d %H:%M").replace(tzinfo=tzinfo)
-                if date_obj == today and window_start < min_start:
+            prefix = day.prefix
+            minutes = day.wall_minutes()
+            for i in range(0, n - slots + 1):
+                if date_obj == today and minutes[i] < min_start_minutes:
                     continue
-                avg_price = sum(p["final"] for p in window) / slots
-                energy_kwh = duration / 60.0
-                total_cost = avg_price * energy_kwh
-                end_dt = window_start + timedelta(minutes=duration)
-                candidates.append(
-                    {
-                        "start": window[0]["time"],
-                        "end": end_dt.strftime("%Y-%m-%d %H:%M"),
-                        "avg_price": round(avg_price, 5),
-                        "energy_kwh": round(energy_kwh, 3),
-                        "total_cost": round(total_cost, 5),
-                    }
-                )
+                avg_price = (prefix[i + slots] - prefix[i]) / slots
+                candidates.append((round(avg_price, 5), day.times[i], minutes[i], day, i))
 
         if not candidates:
             return {"duration": duration, "recommendations": [], "note": "Data nejsou k dispozici."}
 
-        candidates.sort(key=lambda x: (x["avg_price"], x["start"]))
+        candidates.sort(key=lambda x: (x[0], x[1]))
+        min_gap = duration
+        chosen_minutes: list[int] = []
         results = []
-        for item in candidates:
-            start_dt = datetime.strptime(item["start"], "%Y-%m-%d %H:%M").replace(tzinfo=tzinfo)
-            if all(
-                abs(
-                    (
-                        start_dt
-                        - datetime.strptime(r["start"], "%Y-%m-%d %H:%M").replace(tzinfo=tzinfo)
-                    ).total_seconds()
+        for _avg_rounded, start, start_minutes, day, index in candidates:
+            if all(abs(start_minutes - other) >= min_gap for other in chosen_minutes):
+                chosen_minutes.append(start_minutes)
+                # Re-sum the few chosen windows so reported prices carry no prefix-sum rounding drift.
+                avg_price = sum(day.finals[index : index + slots]) / slots
+                end_dt = datetime.strptime(start, "%Y-%m-%d %H:%M") + timedelta(minutes=duration)
+                results.append(
+                    {
+                        "start": start,
+                        "end": end_dt.strftime("%Y-%m-%d %H:%M"),
+                        "avg_price": round(avg_price, 5),
+                        "energy_kwh": round(energy_kwh, 3),
+                        "total_cost": round(avg_price * energy_kwh, 5),
+                    }
                 )
-                >= duration * 60
-                for r in results
-            ):
-                results.append(item)
             if len(results) >= count:
                 break
 
@@ -78,3 +107,38 @@ class ScheduleService:
             "recommendations": results,
             "note": None,
         }
+
+    def get_schedules(self, *, durations: list[int], count: int, cfg: dict[str, Any], tzinfo) -> dict[str, Any]:
+        """Cheapest start windows for several appliance durations over one price load.
+
+        Window averages come from prefix sums, so each duration costs O(slots)
+        regardless of its length; plans are cached until the prices or the
+        earliest allowed start change.
+        """
+        now = datetime.now(tzinfo)
+        today = now.date()
+        tomorrow = today + timedelta(days=1)
+        min_start = self._next_slot(now)
+        min_start_minutes = _wall_minutes(min_start.strftime("%Y-%m-%d %H:%M"))
+
+        raw_days = [
+            (date_obj, self._get_prices_for_date(cfg, date_obj.strftime("%Y-%m-%d"), tzinfo))
+            for date_obj in (today, tomorrow)
+        ]
+        digest = self._prices_digest(raw_days)
+        priced_days = None
+        schedules = []
+        for requested in durations:
+            duration = max(1, min(360, int(requested)))
+            key = (today, tomorrow, duration, count, min_start_minutes, digest)
+            plan = self._cache.get(key)
+            if plan is None:
+                if priced_days is None:
+                    priced_days = [(date_obj, _PricedDay(entries)) for date_obj, entries in raw_days if entries]
+                plan = self._plan(priced_days, duration, count, min_start_minutes, today)
+                self._cache[key] = plan
+            schedules.append({**plan, "recommendations": [dict(item) for item in plan["recommendations"]]})
+        return {"schedules": schedules}
+
+    def get_schedule(self, *, duration: int, count: int, cfg: dict[str, Any], tzinfo) -> dict[str, Any]:
+        return self.get_schedules(durations=[duration], count=count, cfg=cfg, tzinfo=tzinfo)["schedules"][0]
@@ -39,6 +39,11 @@ def isolated_storage(monkeypatch, tmp_path, backend_main):
     from services.cache_manager import SeriesCache
     backend_main.CONSUMPTION_CACHE = SeriesCache("consumption", consumption_cache_dir, 3600)
     backend_main.EXPORT_CACHE = SeriesCache("export", export_cache_dir, 3600)
+    from services.day_ledger import DayLedger
+    monkeypatch.setattr(backend_main, "DAY_LEDGER", DayLedger(storage_dir / "day-ledger"))
+    from services import price_fetcher
+    from services.fx_rate_store import FxRateStore
+    monkeypatch.setattr(price_fetcher, "FX_RATE_STORE", FxRateStore(cache_dir / "fx-rates.json"))
     monkeypatch.setattr(backend_main, "OPTIONS_BACKUP_FILE", storage_dir / "options.json")
     monkeypatch.setattr(backend_main, "FEES_HISTORY_FILE", storage_dir / "fees-history.json")
     monkeypatch.setattr(config_loader, "CONFIG_FILE", str(config_file))
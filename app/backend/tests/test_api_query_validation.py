@@ -108,3 +108,29 @@ def test_energy_balance_rejects_invalid_month_anchor():
     assert resp.status_code == 422
     payload = resp.json()["error"]
     assert payload["code"] == "VALIDATION_ERROR"
+
+
+def test_invoice_detail_csv_rejects_reversed_month_range():
+    client = TestClient(build_test_app())
+    resp = client.get("/api/invoice-detail-csv", params={"month": "2026-03", "to_month": "2026-01", "kind": "supply"})
+
+    assert resp.status_code == 422
+    payload = resp.json()["error"]
+    assert payload["code"] == "VALIDATION_ERROR"
+
+
+def test_invoice_detail_csv_streams_month_range(monkeypatch):
+    calls = []
+
+    def fake_export(**kwargs):
+        calls.append(kwargs)
+        return iter(["Datum;Interval\r\n", "2026-01-01;00:00 - 00:14\r\n"])
+
+    monkeypatch.setattr("app_service.export_invoice_detail_csv", fake_export)
+    client = TestClient(build_test_app())
+    resp = client.get("/api/invoice-detail-csv", params={"month": "2026-01", "to_month": "2026-03", "kind": "supply"})
+
+    assert resp.status_code == 200
+    assert resp.text == "\ufeffDatum;Interval\r\n2026-01-01;00:00 - 00:14\r\n"
+    assert "elektroapp-detail-dodavka-2026-01_2026-03.csv" in resp.headers["content-disposition"]
+    assert calls[0]["to_month"] == "2026-03"
@@ -45,3 +45,20 @@ def test_schedule_router_accepts_legacy_duration_minutes(monkeypatch):
     assert captured["count"] == 3
     assert captured["cfg"] == ctx.config
     assert captured["tzinfo"] == ctx.tzinfo
+
+
+def test_schedule_router_batches_durations(monkeypatch):
+    captured = {}
+    ctx = RequestContext(config={"influxdb": {"timezone": "Europe/Prague"}}, tzinfo=ZoneInfo("Europe/Prague"))
+
+    def fake_get_schedules(*, durations, count, cfg=None, tzinfo=None):
+        captured["durations"] = durations
+        captured["count"] = count
+        return {"schedules": []}
+
+    monkeypatch.setattr(api_router.svc, "get_schedules", fake_get_schedules)
+
+    result = api_router.get_schedule(duration=120, count=2, durations=[30, 60, 240], ctx=ctx)
+
+    assert result == {"schedules": []}
+    assert captured == {"durations": [30, 60, 240], "count": 2}
@@ -83,3 +83,81 @@ def test_is_cache_fresh_works_for_recent_and_stale_files(backend_main, isolated_
     stale_mtime = time.time() - 3600
     os.utime(cache_file, (stale_mtime, stale_mtime))
     assert backend_main.is_cache_fresh(cache_file, 60) is False
+
+
+def test_bounded_lru_cache_evicts_least_recently_used():
+    from services.cache_manager import BoundedLRUCache
+
+    cache = BoundedLRUCache(2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache.get("a") == 1
+    cache["c"] = 3
+
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache["c"] == 3
+    assert len(cache) == 2
+    assert cache.pop("a") == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_apply_fee_snapshot_cached_reuses_until_entries_replaced(monkeypatch):
+    from services import price_fetcher
+
+    calls = []
+    original = price_fetcher.apply_fee_snapshot
+
+    def counting_apply(entries, cfg, fee_snapshot):
+        calls.append(1)
+        return original(entries, cfg, fee_snapshot)
+
+    monkeypatch.setattr(price_fetcher, "apply_fee_snapshot", counting_apply)
+    monkeypatch.setattr(price_fetcher, "FINAL_PRICES_CACHE", price_fetcher.BoundedLRUCache(8))
+    cfg = {"tarif": {"vt_periods": [[6, 22]]}}
+    fee_snapshot = {"dph_percent": 21, "kwh_fees": {"dan": 0.5, "distribuce": {"VT": 1.0, "NT": 0.5}}}
+    entries = [{"time": "2026-02-10 07:00", "hour": 7, "minute": 0, "spot": 2.0}]
+
+    first = price_fetcher.apply_fee_snapshot_cached("2026-02-10", "ote", entries, cfg, fee_snapshot)
+    second = price_fetcher.apply_fee_snapshot_cached("2026-02-10", "ote", entries, cfg, fee_snapshot)
+    assert first == second
+    assert first[0]["final"] == round((2.0 + 0.5 + 1.0) * 1.21, 5)
+    assert len(calls) == 1
+
+    price_fetcher.apply_fee_snapshot_cached("2026-02-10", "ote", [dict(entries[0])], cfg, fee_snapshot)
+    price_fetcher.apply_fee_snapshot_cached("2026-02-10", "ote", entries, cfg, {**fee_snapshot, "dph_percent": 12})
+    assert len(calls) == 3
+
+
+def test_series_cache_load_range_reports_cached_and_missing_days(tmp_path):
+    from datetime import date
+    from services.cache_manager import SeriesCache
+
+    key = {"entity_id": "sensor.load", "cache_version": 2}
+    cache = SeriesCache("consumption", tmp_path, 600)
+    saved = cache.save_range(
+        {
+            "2026-03-29": {"interval": "15m", "points": [{"time": "2026-03-29T00:00:00Z", "kwh": 0.25}], "has_series": True},
+            "2026-03-31": {"points": [{"time": "2026-03-31T00:00:00Z", "kwh": 1.0}]},
+        },
+        key,
+    )
+    assert saved == ["2026-03-29", "2026-03-31"]
+    cache.save("2026-04-01", {"entity_id": "other"}, {"points": []})
+
+    cached, missing = cache.load_range(date(2026, 3, 29), date(2026, 4, 1), key)
+    assert sorted(cached) == ["2026-03-29", "2026-03-31"]
+    assert missing == ["2026-03-30", "2026-04-01"]
+    assert cached["2026-03-31"][0]["points"][0]["kwh"] == 1.0
+
+    cached, missing = cache.load_range(
+        date(2026, 3, 29), date(2026, 3, 31), key, is_usable=lambda date_str, path, meta: date_str != "2026-03-29"
+    )
+    assert list(cached) == ["2026-03-31"]
+    assert missing == ["2026-03-29", "2026-03-30"]
+
+    assert SeriesCache("export", tmp_path / "absent", 600).load_range(date(2026, 3, 29), date(2026, 3, 30), key) == (
+        {},
+        ["2026-03-29", "2026-03-30"],
+    )
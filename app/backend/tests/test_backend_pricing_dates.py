@@ -81,3 +81,129 @@ def test_parse_time_range_with_naive_start_end_uses_given_timezone(backend_main)
 
     assert start_utc == datetime(2026, 1, 31, 23, 0, tzinfo=timezone.utc)
     assert end_utc == datetime(2026, 2, 1, 1, 0, tzinfo=timezone.utc)
+
+
+def test_prefetch_prices_range_fetches_one_ote_request_per_month_and_cnb_year_file(monkeypatch, backend_main, isolated_storage):
+    from services import price_fetcher
+
+    ote_calls = []
+    cnb_calls = []
+
+    def fake_ote(start_date, end_date):
+        ote_calls.append((start_date.isoformat(), end_date.isoformat()))
+        items = []
+        day = start_date
+        while day <= end_date:
+            for period in range(1, 97):
+                items.append(
+                    f"<pub:Item><pub:Date>{day.isoformat()}</pub:Date><pub:PeriodIndex>{period}</pub:PeriodIndex>"
+                    f"<pub:Price>{100 + period}</pub:Price></pub:Item>"
+                )
+            day = day.fromordinal(day.toordinal() + 1)
+        return (
+            '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+            'xmlns:pub="http://www.ote-cr.cz/schema/service/public"><soapenv:Body><pub:Result>'
+            + "".join(items)
+            + "</pub:Result></soapenv:Body></soapenv:Envelope>"
+        )
+
+    class FakeCnbResponse:
+        text = (
+            "Datum|1 AUD|1 EUR|100 JPY\n"
+            "29.05.2025|14,100|24,900|15,000\n"
+            "30.05.2025|14,200|25,000|15,100\n"
+            "02.06.2025|14,300|25,200|15,200\n"
+            "03.06.2025|14,400|25,300|15,300\n"
+        )
+
+        def raise_for_status(self):
+            return None
+
+    def fake_get(url, params=None, timeout=None):
+        assert url == price_fetcher.CNB_RATES_YEAR_URL
+        cnb_calls.append(params["rok"])
+        return FakeCnbResponse()
+
+    monkeypatch.setattr(price_fetcher, "fetch_ote_prices_xml", fake_ote)
+    monkeypatch.setattr(price_fetcher.requests, "get", fake_get)
+    monkeypatch.setattr(price_fetcher, "is_ote_unavailable", lambda: False)
+    monkeypatch.setattr(price_fetcher, "PRICES_CACHE", price_fetcher.BoundedLRUCache(16))
+    monkeypatch.setattr(price_fetcher, "PRICES_CACHE_PROVIDER", price_fetcher.BoundedLRUCache(16))
+    cached_entries = [{"time": "2025-05-31 00:00", "spot": 2.0, "price_eur_mwh": 80.0, "eur_czk_rate": 25.0}]
+    backend_main.save_prices_cache("2025-05-31", cached_entries, provider="ote")
+
+    cfg = {"price_provider": "ote", "influxdb": {"timezone": "Europe/Prague"}}
+    result = backend_main.prefetch_prices_range(
+        payload={"start": "2025-05-30", "end": "2025-06-03"}, cfg=cfg, tzinfo=ZoneInfo("Europe/Prague")
+    )
+
+    assert ote_calls == [("2025-05-30", "2025-05-30"), ("2025-06-01", "2025-06-03")]
+    assert cnb_calls == [2025]
+    assert result["cached"] == 1 and result["fetched"] == 4 and result["failed"] == []
+    assert result["requests"] == {"ote": 2, "cnb": 1}
+
+    sunday = backend_main.load_prices_cache("2025-06-01")
+    assert len(sunday) == 96
+    assert sunday[0]["eur_czk_rate"] == 25.0
+    assert sunday[0]["price_eur_mwh"] == 101.0
+    assert backend_main.load_prices_cache("2025-06-02")[0]["eur_czk_rate"] == 25.2
+
+    # Rates survive a restart: the reloaded store answers the Sunday from Friday's fixing without network.
+    reloaded = price_fetcher.FxRateStore(price_fetcher.FX_RATE_STORE.path)
+    assert reloaded.rate_on("2025-06-01") == 25.0
+
+
+def test_prefetch_prices_range_rejects_reversed_range(backend_main, isolated_storage):
+    with pytest.raises(HTTPException) as exc:
+        backend_main.prefetch_prices_range(
+            payload={"start": "2025-06-03", "end": "2025-06-01"}, cfg={}, tzinfo=ZoneInfo("Europe/Prague")
+        )
+    assert exc.value.status_code == 400
+
+
+def _ote_envelope(items):
+    return (
+        '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/" '
+        'xmlns:pub="http://www.ote-cr.cz/schema/service/public"><soapenv:Body><pub:Result>'
+        + "".join(
+            f"<pub:Item><pub:Date>{day}</pub:Date><pub:PeriodIndex>{period}</pub:PeriodIndex>"
+            f"<pub:Price>{price}</pub:Price></pub:Item>"
+            for day, period, price in items
+        )
+        + "</pub:Result></soapenv:Body></soapenv:Envelope>"
+    )
+
+
+def test_parse_ote_prices_xml_streams_items_across_dst_days():
+    from services import price_fetcher
+
+    items = [("2025-10-25", period, period) for period in range(1, 97)]
+    items += [("2025-10-26", period, 1000 + period) for period in range(1, 101)]
+    items += [("2025-03-30", period, 2000 + period) for period in range(1, 93)]
+    rows = price_fetcher.parse_ote_prices_xml(_ote_envelope(items).encode("utf-8"))
+
+    assert [len(rows[day]) for day in ("2025-10-25", "2025-10-26", "2025-03-30")] == [96, 100, 92]
+    assert rows["2025-10-25"][-1] == {"hour": 23, "minute": 45, "price_eur_mwh": 96.0}
+    # The repeated 02:00 hour on the fall-back day keeps both quarter-hour series.
+    fall_back = [(row["hour"], row["minute"]) for row in rows["2025-10-26"]]
+    assert fall_back.count((2, 0)) == 2 and fall_back[-1] == (23, 45)
+    # Spring-forward skips 02:00-02:59 local time.
+    spring = [(row["hour"], row["minute"]) for row in rows["2025-03-30"]]
+    assert (2, 0) not in spring and spring[8] == (3, 0)
+
+
+def test_parse_ote_prices_xml_reports_soap_fault():
+    from services import price_fetcher
+
+    xml_text = (
+        '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"><soapenv:Body>'
+        "<soapenv:Fault><faultcode>soapenv:Server</faultcode><faultstring>Invalid period</faultstring>"
+        "</soapenv:Fault></soapenv:Body></soapenv:Envelope>"
+    )
+    with pytest.raises(HTTPException) as exc:
+        price_fetcher.parse_ote_prices_xml(xml_text)
+    assert exc.value.status_code == 502 and "Invalid period" in exc.value.detail
+
+    with pytest.raises(HTTPException) as exc:
+        price_fetcher.parse_ote_prices_xml("<broken")
+    assert exc.value.status_code == 502
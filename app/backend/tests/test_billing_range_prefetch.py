@@ -0,0 +1,308 @@
+import re
+from datetime import date, datetime
+
+
+def _base_influx_cfg():
+    return {
+        "host": "localhost",
+        "port": 8086,
+        "database": "homeassistant",
+        "measurement": "kWh",
+        "field": "value",
+        "entity_id": "sensor.import",
+        "export_entity_id": "sensor.export",
+        "retention_policy": "autogen",
+        "timezone": "Europe/Prague",
+        "interval": "15m",
+    }
+
+
+def _fake_counter_influx(calls):
+    base_ts = int(datetime(2025, 1, 1).timestamp())
+
+    def _query(_influx, query):
+        calls.append(query)
+        match = re.search(r"time >= '([^']+)' AND time < '([^']+)'", query)
+        start_ts = int(datetime.fromisoformat(match.group(1).replace("Z", "+00:00")).timestamp())
+        end_ts = int(datetime.fromisoformat(match.group(2).replace("Z", "+00:00")).timestamp())
+        values = [[ts, round((ts - base_ts) / 900 * 0.25, 4)] for ts in range(start_ts, end_ts, 900)]
+        return {"results": [{"series": [{"values": values}]}]}
+
+    return _query
+
+
+def test_range_prefetch_fills_day_caches_with_single_query_per_entity(monkeypatch, backend_main, isolated_storage):
+    calls = []
+    monkeypatch.setattr(backend_main, "influx_query", _fake_counter_influx(calls))
+    monkeypatch.setattr(backend_main, "PND_SERVICE", None)
+    cfg = {"influxdb": _base_influx_cfg()}
+
+    backend_main.prefetch_series_range(cfg, date(2025, 3, 28), date(2025, 3, 31))
+    assert len(calls) == 2
+
+    prefetched = [backend_main.get_consumption_points(cfg, date=f"2025-03-{day}") for day in range(28, 32)]
+    prefetched_export = [backend_main.get_export_points(cfg, date=f"2025-03-{day}") for day in range(28, 32)]
+    assert len(calls) == 2
+    assert all(result["from_cache"] for result in prefetched + prefetched_export)
+
+    # Same points as the uncached per-day path, including the DST day (92 slots).
+    monkeypatch.setattr(backend_main, "CONSUMPTION_CACHE", None)
+    direct = [backend_main.get_consumption_points(cfg, date=f"2025-03-{day}") for day in range(28, 32)]
+    assert [len(result["points"]) for result in prefetched] == [96, 96, 92, 96]
+    for cached, fresh in zip(prefetched, direct):
+        assert cached["points"] == fresh["points"]
+        assert cached["range"] == fresh["range"]
+
+
+def test_range_prefetch_skips_cached_days_and_tolerates_query_errors(monkeypatch, backend_main, isolated_storage):
+    calls = []
+    monkeypatch.setattr(backend_main, "influx_query", _fake_counter_influx(calls))
+    monkeypatch.setattr(backend_main, "PND_SERVICE", None)
+    influx_cfg = _base_influx_cfg()
+    influx_cfg.pop("export_entity_id")
+    cfg = {"influxdb": influx_cfg}
+
+    fetched = backend_main.prefetch_series_range(cfg, date(2025, 4, 1), date(2025, 4, 2))
+    warm = backend_main.prefetch_series_range(cfg, date(2025, 4, 1), date(2025, 4, 2))
+    assert len(calls) == 1
+    assert sorted(warm) == ["consumption"]
+    assert sorted(warm["consumption"]) == ["2025-04-01", "2025-04-02"]
+    assert not any(day["from_cache"] for day in fetched["consumption"].values())
+    assert all(day["from_cache"] for day in warm["consumption"].values())
+    assert warm["consumption"]["2025-04-01"]["points"] == fetched["consumption"]["2025-04-01"]["points"]
+
+    def _boom(*_args, **_kwargs):
+        from fastapi import HTTPException
+
+        raise HTTPException(status_code=500, detail="boom")
+
+    monkeypatch.setattr(backend_main, "influx_query", _boom)
+    backend_main.prefetch_series_range(cfg, date(2025, 4, 3), date(2025, 4, 5))
+    assert not list(isolated_storage["consumption_cache_dir"].glob("consumption-2025-04-0[345]*.json"))
+
+
+def test_month_context_uses_prefetched_days_instead_of_reloading():
+    from zoneinfo import ZoneInfo
+
+    from services.billing_service import BillingService
+
+    tzinfo = ZoneInfo("Europe/Prague")
+    loads = []
+
+    def day_points(date_str, source):
+        return {
+            "tzinfo": tzinfo,
+            "has_series": True,
+            "source": source,
+            "points": [{"time": f"{date_str}T06:00:00+02:00", "time_utc": f"{date_str}T04:00:00Z", "kwh": 1.0}],
+        }
+
+    def consumption(cfg, date=None, start=None, end=None):
+        loads.append(date)
+        return day_points(date, "per-day")
+
+    service = BillingService(
+        get_consumption_points=consumption,
+        get_export_points=lambda cfg, date=None, start=None, end=None: {"tzinfo": tzinfo, "has_series": False, "points": []},
+        build_price_map_for_date=lambda cfg, date, tz: ({f"{date} 06:00": {"spot": 2.0, "final": 3.0}}, {}),
+        get_export_entity_id=lambda cfg: None,
+        get_fee_snapshot_for_date=lambda cfg, date, tz: {"dph_percent": 21, "kwh_fees": {}, "fixed": {}},
+        compute_fixed_breakdown_for_day=lambda snapshot, days: ({}, {}),
+        calculate_sell_coefficient=lambda cfg, snapshot: 0.0,
+        prefetch_series_range=lambda cfg, start_date, end_date: {
+            "consumption": {f"2025-06-{day:02d}": day_points(f"2025-06-{day:02d}", "prefetch") for day in range(1, 29)}
+        },
+    )
+
+    billing = service.compute_monthly_billing({}, "2025-06", tzinfo, require_data=False)
+
+    assert sorted(loads) == ["2025-06-29", "2025-06-30"]
+    assert billing["actual"]["kwh_total"] == 30.0
+
+
+def test_day_ledger_serves_finalized_days_until_signature_changes(tmp_path):
+    from zoneinfo import ZoneInfo
+
+    from services.billing_service import BillingService
+    from services.day_ledger import DayLedger
+
+    tzinfo = ZoneInfo("Europe/Prague")
+    calls = []
+    signature = {"value": "sig-a"}
+
+    def consumption(cfg, date=None, start=None, end=None):
+        calls.append(date)
+        return {
+            "tzinfo": tzinfo,
+            "has_series": True,
+            "points": [{"time": f"{date}T06:00:00+02:00", "time_utc": f"{date}T04:00:00Z", "kwh": 1.5}],
+        }
+
+    price_map = {f"2025-06-{day:02d} 06:00": {"spot": 2.0, "final": 3.0} for day in range(1, 31)}
+    ledger = DayLedger(tmp_path / "day-ledger")
+    service = BillingService(
+        get_consumption_points=consumption,
+        get_export_points=lambda cfg, date=None, start=None, end=None: {"tzinfo": tzinfo, "has_series": False, "points": []},
+        build_price_map_for_date=lambda cfg, date, tz: (price_map, price_map),
+        get_export_entity_id=lambda cfg: None,
+        get_fee_snapshot_for_date=lambda cfg, date, tz: {"dph_percent": 21, "kwh_fees": {}, "fixed": {}},
+        compute_fixed_breakdown_for_day=lambda snapshot, days: ({}, {}),
+        calculate_sell_coefficient=lambda cfg, snapshot: 0.0,
+        get_day_ledger=lambda: ledger,
+        get_day_ledger_signature=lambda cfg, date_str, tz: signature["value"],
+    )
+    cfg = {"tarif": {"vt_periods": [[6, 7]]}}
+
+    first = service.compute_monthly_billing(cfg, "2025-06", tzinfo, require_data=False)
+    assert sorted(set(calls)) == [f"2025-06-{day:02d}" for day in range(1, 31)]
+    loaded = len(calls)
+    assert (tmp_path / "day-ledger" / "2025-06.json").exists()
+
+    # Fresh ledger instance reads the month file back; no series are loaded at all.
+    ledger = DayLedger(tmp_path / "day-ledger")
+    second = service.compute_monthly_billing(cfg, "2025-06", tzinfo, require_data=False)
+    summary = service.get_daily_summary(month="2025-06", cfg=cfg, tzinfo=tzinfo)
+    assert len(calls) == loaded
+    assert second["actual"] == first["actual"]
+    assert second["invoice"] == first["invoice"]
+    assert summary["summary"]["kwh_total"] == first["actual"]["kwh_total"]
+    assert ledger.get_status()["hits"] == 60
+
+    signature["value"] = "sig-b"
+    service.compute_monthly_billing(cfg, "2025-06", tzinfo, require_data=False)
+    assert len(calls) == 2 * loaded
+    assert ledger.invalidate("2025-06-01") == 1
+    assert ledger.get("2025-06-01", "sig-b") is None
+
+
+def test_day_ledger_skips_unpriced_days_and_writes_each_month_once(tmp_path, monkeypatch):
+    from zoneinfo import ZoneInfo
+
+    from services.billing_service import BillingService
+    from services.day_ledger import DayLedger
+
+    tzinfo = ZoneInfo("Europe/Prague")
+
+    def consumption(cfg, date=None, start=None, end=None):
+        return {
+            "tzinfo": tzinfo,
+            "has_series": True,
+            "points": [{"time": f"{date}T06:00:00+02:00", "time_utc": f"{date}T04:00:00Z", "kwh": 1.5}],
+        }
+
+    # No prices for the 10th (e.g. OTE fetch failed or in cooldown): it must not be frozen as a zero-cost day.
+    price_map = {f"2025-06-{day:02d} 06:00": {"spot": 2.0, "final": 3.0} for day in range(1, 31) if day != 10}
+    ledger = DayLedger(tmp_path / "day-ledger")
+    writes = []
+    real_write = ledger._write_month
+    monkeypatch.setattr(ledger, "_write_month", lambda month, days: (writes.append(month), real_write(month, days)))
+    service = BillingService(
+        get_consumption_points=consumption,
+        get_export_points=lambda cfg, date=None, start=None, end=None: {"tzinfo": tzinfo, "has_series": False, "points": []},
+        build_price_map_for_date=lambda cfg, date, tz: (price_map, price_map),
+        get_export_entity_id=lambda cfg: None,
+        get_fee_snapshot_for_date=lambda cfg, date, tz: {"dph_percent": 21, "kwh_fees": {}, "fixed": {}},
+        compute_fixed_breakdown_for_day=lambda snapshot, days: ({}, {}),
+        calculate_sell_coefficient=lambda cfg, snapshot: 0.0,
+        get_day_ledger=lambda: ledger,
+        get_day_ledger_signature=lambda cfg, date_str, tz: "sig",
+    )
+
+    service.compute_monthly_billing({}, "2025-06", tzinfo, require_data=False)
+
+    assert writes == ["2025-06"]
+    stored = DayLedger(tmp_path / "day-ledger")
+    assert stored.get("2025-06-09", "sig") is not None
+    assert stored.get("2025-06-10", "sig") is None
+
+
+def test_daily_summary_with_advance_loads_each_day_once():
+    from zoneinfo import ZoneInfo
+
+    from services.billing_service import BillingService
+
+    tzinfo = ZoneInfo("Europe/Prague")
+    loads = {"consumption": [], "export": [], "prices": [], "fees": []}
+
+    def series(kind):
+        def _get(cfg, date=None, start=None, end=None):
+            loads[kind].append(date)
+            return {
+                "tzinfo": tzinfo,
+                "has_series": True,
+                "points": [{"time": f"{date}T06:00:00+02:00", "time_utc": f"{date}T04:00:00Z", "kwh": 1.5}],
+            }
+
+        return _get
+
+    def prices(cfg, date, tz):
+        loads["prices"].append(date)
+        price = {"spot": 2.0, "final": 3.0}
+        return ({f"{date} 06:00": price}, {f"{date} 04:00": price})
+
+    def fees(cfg, date, tz):
+        loads["fees"].append(date)
+        return {"dph_percent": 21, "kwh_fees": {}, "fixed": {"daily": {"staly_plat": 4.0}}}
+
+    service = BillingService(
+        get_consumption_points=series("consumption"),
+        get_export_points=series("export"),
+        build_price_map_for_date=prices,
+        get_export_entity_id=lambda cfg: "sensor.export",
+        get_fee_snapshot_for_date=fees,
+        compute_fixed_breakdown_for_day=lambda snapshot, days: ({"staly_plat": 4.0}, {}),
+        calculate_sell_coefficient=lambda cfg, snapshot: 0.5,
+    )
+    cfg = {"mesicni_zaloha": 2000, "tarif": {"vt_periods": [[6, 7]]}}
+
+    summary = service.get_daily_summary(month="2025-06", cfg=cfg, tzinfo=tzinfo)
+    billing = service.compute_monthly_billing(cfg, "2025-06", tzinfo, require_data=False)
+
+    days = [f"2025-06-{day:02d}" for day in range(1, 31)]
+    # The summary and its settlement estimate share one pass; the standalone call is the second.
+    for kind in ("consumption", "export", "prices", "fees"):
+        assert sorted(loads[kind]) == sorted(days * 2), kind
+    assert summary["summary"]["projected_net_total"] == billing["projected"]["net_total"]
+    assert summary["summary"]["kwh_total"] == billing["actual"]["kwh_total"] == 45.0
+
+
+def test_billing_year_fans_months_out_and_matches_sequential_result():
+    import threading
+    from zoneinfo import ZoneInfo
+
+    from services.billing_service import BillingService
+
+    tzinfo = ZoneInfo("Europe/Prague")
+    threads = set()
+
+    def consumption(cfg, date=None, start=None, end=None):
+        threads.add(threading.current_thread().name)
+        day = int(date[8:10])
+        return {
+            "tzinfo": tzinfo,
+            "has_series": True,
+            "points": [{"time": f"{date}T06:00:00+01:00", "time_utc": f"{date}T05:00:00Z", "kwh": day / 10}],
+        }
+
+    def build_service(workers):
+        return BillingService(
+            get_consumption_points=consumption,
+            get_export_points=lambda cfg, date=None, start=None, end=None: {"tzinfo": tzinfo, "has_series": False, "points": []},
+            build_price_map_for_date=lambda cfg, date, tz: (
+                {f"{date} 06:00": {"spot": 2.0, "final": 3.0 + int(date[5:7]) / 10}},
+                {},
+            ),
+            get_export_entity_id=lambda cfg: None,
+            get_fee_snapshot_for_date=lambda cfg, date, tz: {"dph_percent": 21, "kwh_fees": {}, "fixed": {}},
+            compute_fixed_breakdown_for_day=lambda snapshot, days: ({"staly_plat": 4.0}, {}),
+            calculate_sell_coefficient=lambda cfg, snapshot: 0.0,
+            year_workers=workers,
+        )
+
+    sequential = build_service(1).get_billing_year(year=2025, cfg={}, tzinfo=tzinfo)
+    threads.clear()
+    parallel = build_service(4).get_billing_year(year=2025, cfg={}, tzinfo=tzinfo)
+
+    assert parallel == sequential
+    assert [item["month"] for item in parallel["months"]] == [f"2025-{month:02d}" for month in range(1, 13)]
+    assert all(name.startswith("billing-year") for name in threads)
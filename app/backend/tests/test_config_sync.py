@@ -304,3 +304,90 @@ def test_api_config_save_excludes_none_before_supervisor_sync(isolated_storage,
     assert "measurement" not in sent_entity
     assert "device_class" not in sent_entity
     assert "state_class" not in sent_entity
+
+
+def test_load_config_reuses_snapshot_until_sources_change(isolated_storage, monkeypatch):
+    config_path = isolated_storage["config_file"]
+    config_path.write_text("dph: 21\nprice_provider: spotovaelektrina\n", encoding="utf-8")
+    old_mtime = config_path.stat().st_mtime - 60
+    os.utime(config_path, (old_mtime, old_mtime))
+    config_loader.invalidate_config_snapshot()
+
+    parse_calls = []
+    original = config_loader._load_config_uncached
+
+    def counting_load():
+        parse_calls.append(1)
+        return original()
+
+    monkeypatch.setattr(config_loader, "_load_config_uncached", counting_load)
+
+    first = config_loader.load_config()
+    first["dph"] = 99
+    second = config_loader.load_config()
+    assert second["dph"] == 21
+    assert len(parse_calls) == 1
+    assert config_loader.get_config_snapshot_stats()["cached"] is True
+
+    config_path.write_text("dph: 12\nprice_provider: spotovaelektrina\n", encoding="utf-8")
+    os.utime(config_path, (old_mtime + 1, old_mtime + 1))
+    assert config_loader.load_config()["dph"] == 12
+    assert len(parse_calls) == 2
+
+    config_loader.invalidate_config_snapshot()
+    assert config_loader.get_config_snapshot_stats()["cached"] is False
+
+
+def test_fee_snapshot_lookup_uses_index_until_history_file_changes(isolated_storage, monkeypatch):
+    from datetime import timezone
+
+    cfg = {"dph": 21, "poplatky": {"dan": 1.0}}
+    current = config_loader.build_fee_snapshot(cfg)
+    history = [
+        {"effective_from": "2024-01-01", "effective_to": "2024-06-30", "snapshot": {"tag": "h1"}},
+        {"effective_from": "2024-07-01", "snapshot": current},
+    ]
+    config_loader.save_fee_history(history)
+
+    reads = []
+    original = config_loader.load_fee_history
+
+    def counting_load():
+        reads.append(1)
+        return original()
+
+    monkeypatch.setattr(config_loader, "load_fee_history", counting_load)
+
+    assert config_loader.get_fee_snapshot_for_date(cfg, "2024-03-15", timezone.utc) == {"tag": "h1"}
+    assert config_loader.get_fee_snapshot_for_date(cfg, "2024-07-01", timezone.utc) == current
+    assert config_loader.get_fee_snapshot_for_date(cfg, "2023-12-31", timezone.utc) == {"tag": "h1"}
+    assert reads == []
+
+    fees_file = isolated_storage["storage_dir"] / "fees-history.json"
+    history[0]["snapshot"] = {"tag": "h1-edited"}
+    fees_file.write_text(json.dumps(history), encoding="utf-8")
+    stat = fees_file.stat()
+    os.utime(fees_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert config_loader.get_fee_snapshot_for_date(cfg, "2024-03-15", timezone.utc) == {"tag": "h1-edited"}
+    assert len(reads) == 1
+
+
+def test_fee_snapshot_key_is_precomputed_for_indexed_snapshots(isolated_storage, monkeypatch):
+    from datetime import timezone
+
+    cfg = {"dph": 21, "poplatky": {"dan": 1.0}}
+    config_loader.save_fee_history(
+        [
+            {"effective_from": "2024-01-01", "effective_to": "2024-06-30", "snapshot": {"tag": "h1"}},
+            {"effective_from": "2024-07-01", "snapshot": config_loader.build_fee_snapshot(cfg)},
+        ]
+    )
+    snapshot = config_loader.get_fee_snapshot_for_date(cfg, "2024-03-15", timezone.utc)
+    expected = config_loader.fee_snapshot_hash({"tag": "h1"})
+
+    hashed = []
+    monkeypatch.setattr(config_loader, "fee_snapshot_hash", lambda value: hashed.append(value) or "fresh")
+    assert config_loader.get_fee_snapshot_key(snapshot) == expected
+    assert hashed == []
+    assert config_loader.get_fee_snapshot_key({"tag": "h1"}) == "fresh"
@@ -0,0 +1,40 @@
+from datetime import date
+
+from services.fx_rate_store import FxRateStore
+
+
+def test_fx_rate_store_resolves_gaps_only_inside_checked_ranges(tmp_path):
+    store = FxRateStore(tmp_path / "fx-rates.json")
+    store.add({"2025-05-30": 25.0, "2025-06-02": 25.2}, covered=("2025-05-30", "2025-05-31"))
+
+    assert store.rate_on("2025-05-31") == 25.0
+    # June 1st was never checked against CNB, so a Sunday-only fixing can not be ruled out.
+    assert store.rate_on("2025-06-01") is None
+    assert store.rate_on("2025-06-02") == 25.2
+
+    store.add({}, covered=("2025-06-01", "2025-06-01"))
+    assert store.get_status()["covered"] == [["2025-05-30", "2025-06-01"]]
+    assert FxRateStore(tmp_path / "fx-rates.json").rate_on("2025-06-01") == 25.0
+
+
+def test_get_eur_czk_rate_for_date_answers_repeat_lookups_from_store(monkeypatch, isolated_storage):
+    from services import price_fetcher
+
+    calls = []
+
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return {"rates": [{"validFor": "2025-05-30", "currencyCode": "EUR", "amount": 1, "rate": 25.0}]}
+
+    def fake_get(url, params=None, timeout=None):
+        calls.append(params["date"])
+        return FakeResponse()
+
+    monkeypatch.setattr(price_fetcher.requests, "get", fake_get)
+
+    assert price_fetcher.get_eur_czk_rate_for_date(date(2025, 6, 1)) == 25.0
+    assert price_fetcher.get_eur_czk_rate_for_date(date(2025, 5, 31)) == 25.0
+    assert price_fetcher.get_eur_czk_rate_for_date(date(2025, 6, 1)) == 25.0
+    assert calls == ["2025-06-01"]
@@ -1,9 +1,12 @@
-from services.data_export_service import DataExportService
-from services.billing_service import BillingService
+from services.data_export_service import DataExportService, csv_chunks, month_range
+from services.billing_service import BillingService, build_vt_slot_mask, invoice_kernel, invoice_slot_arrays
 from zoneinfo import ZoneInfo
 
 
 class FakeBillingService:
+    def iter_invoice_detail_rows(self, cfg, month_str, tzinfo, *, kind):
+        return iter(self.get_invoice_detail_rows(cfg, month_str, tzinfo, kind=kind))
+
     def get_invoice_detail_rows(self, cfg, month_str, tzinfo, *, kind):
         return [
             {
@@ -42,6 +45,41 @@ def test_export_invoice_detail_csv_matches_supplier_column_order():
     assert lines[1].startswith("2026-06-01;00:00 - 00:14;150,1400;3646,9000;135,7300;3296,9000")
 
 
+def test_invoice_detail_csv_streams_month_range_in_chunks():
+    class RangeBilling:
+        def __init__(self):
+            self.requested = []
+
+        def iter_invoice_detail_rows(self, cfg, month_str, tzinfo, *, kind):
+            self.requested.append(month_str)
+            row = FakeBillingService().get_invoice_detail_rows(cfg, month_str, tzinfo, kind=kind)[0]
+            return ({**row, "date": f"{month_str}-{day:02d}"} for day in range(1, 29) for _ in range(96))
+
+    billing = RangeBilling()
+    service = DataExportService(billing)
+    months = month_range("2025-11", "2026-02")
+    assert months == ["2025-11", "2025-12", "2026-01", "2026-02"]
+
+    chunks = service.iter_invoice_detail_csv({}, months, None, kind="supply")
+    header = next(chunks)
+    # Only the first month is opened before streaming starts; the rest follow on demand.
+    assert header.startswith("Datum;Interval;EUR/MWh") and header.count("\n") == 1
+    assert billing.requested == ["2025-11"]
+    body = list(chunks)
+    assert len(body) > 4
+    assert billing.requested == months
+    lines = "".join([header] + body).splitlines()
+    assert len(lines) == 1 + 4 * 28 * 96
+    assert lines[-1].startswith("2026-02-28;00:00 - 00:14")
+
+
+def test_csv_chunks_flushes_header_then_by_size():
+    chunks = list(csv_chunks(([str(idx), "x" * 10] for idx in range(100)), chunk_size=120))
+    assert chunks[0] == "0;xxxxxxxxxx\r\n"
+    assert all(len(chunk) >= 120 for chunk in chunks[1:-1])
+    assert "".join(chunks).count("\r\n") == 100
+
+
 def test_invoice_breakdown_reconciles_supplier_invoice_totals():
     tzinfo = ZoneInfo("Europe/Prague")
 
@@ -101,3 +139,88 @@ def test_invoice_breakdown_reconciles_supplier_invoice_totals():
     assert invoice["regulated"]["distribution_vt_kwh"] == 24.0
     assert result["actual"]["kwh_total"] == 185.22
     assert result["invoice"]["billed_quantity_rounding"] == "floor_tariff_kwh"
+
+
+def test_invoice_kernel_splits_vt_nt_from_slot_mask():
+    mask = build_vt_slot_mask([[6, 8], [17, 19]])
+    assert len(mask) == 96
+    assert mask[6 * 4] and mask[7 * 4 + 3] and not mask[8 * 4] and not mask[5 * 4 + 3]
+
+    fees = {"komodita_sluzba": 0.5, "oze": 0.1, "dan": 0.02, "systemove_sluzby": 0.2, "distribuce": {"VT": 2.0, "NT": 1.0}}
+    items, total_kwh, variable_cost = invoice_kernel(
+        [1.0, 2.0, 3.0],
+        [1.5, 2.0, 0.5],
+        [3.0, 4.0, 2.0],
+        [mask[6 * 4], mask[12 * 4], mask[18 * 4]],
+        fees,
+    )
+
+    assert total_kwh == 6.0
+    assert variable_cost == 3.0 + 8.0 + 6.0
+    assert items["vt_kwh"] == 4.0 and items["nt_kwh"] == 2.0
+    assert items["distribution_vt"] == 8.0 and items["distribution_nt"] == 2.0
+    assert items["spot"] == 1.5 + 4.0 + 1.5
+    assert items["supplier_service"] == 3.0
+
+
+def test_invoice_slot_arrays_take_vt_from_the_price_slot():
+    from services.price_vector import DayPriceVector, local_hour_minute
+
+    tzinfo = ZoneInfo("Europe/Prague")
+    entries = [
+        {"time": f"2026-10-25 {hour:02d}:{minute:02d}", "spot": float(hour), "final": float(hour) + 1.0}
+        for hour in range(24)
+        for minute in (0, 15, 30, 45)
+    ]
+    vector = DayPriceVector.from_entries("2026-10-25", entries, tzinfo)
+    assert vector.slot_count == 100
+    mask = build_vt_slot_mask([[6, 8]])
+    points = [
+        # Unparseable local time: the UTC timestamp still places it at 06:00 local (VT), not 00:00 NT.
+        {"time": "garbage", "time_utc": "2026-10-25T05:00:00Z", "kwh": 1.0},
+        {"time": "2026-10-25T00:00:00+02:00", "time_utc": "2026-10-24T22:00:00Z", "kwh": 2.0},
+        {"time": "2026-10-25T00:00:00+02:00", "time_utc": "2026-10-24T22:00:00Z", "kwh": 0.5},
+        {"time": "2026-10-25T01:00:00+02:00", "time_utc": "2026-10-24T23:00:00Z", "kwh": None},
+    ]
+
+    kwh, spot, final, vt = invoice_slot_arrays(vector, points, mask)
+
+    assert kwh == [2.5, 1.0]
+    assert spot == [0.0, 6.0] and final == [1.0, 7.0]
+    assert vt == [False, True]
+    assert local_hour_minute("2026-10-25 06:15:00+01:00") == (6, 15)
+    assert local_hour_minute("garbage") is None
+
+
+def test_invoice_detail_stream_fails_before_streaming_and_aborts_on_later_month():
+    import pytest
+    from fastapi import HTTPException
+
+    tzinfo = ZoneInfo("Europe/Prague")
+
+    def broken_consumption(cfg, date=None, start=None, end=None):
+        raise HTTPException(status_code=500, detail="influx down")
+
+    billing = BillingService(
+        get_consumption_points=broken_consumption,
+        get_export_points=broken_consumption,
+        build_price_map_for_date=lambda cfg, date, tz: ({}, {}),
+        get_export_entity_id=lambda cfg: None,
+        get_fee_snapshot_for_date=lambda cfg, date, tz: {"dph_percent": 21, "kwh_fees": {}, "fixed": {}},
+        compute_fixed_breakdown_for_day=lambda snapshot, days: ({}, {}),
+        calculate_sell_coefficient=lambda cfg, snapshot: 0.0,
+    )
+    # The first day is loaded when the stream is created, not when the body is sent.
+    with pytest.raises(HTTPException):
+        DataExportService(billing).iter_invoice_detail_csv({}, ["2025-06"], tzinfo, kind="supply")
+
+    class LaterMonthFails(FakeBillingService):
+        def iter_invoice_detail_rows(self, cfg, month_str, tzinfo, *, kind):
+            if month_str != "2026-06":
+                raise HTTPException(status_code=500, detail="influx down")
+            return super().iter_invoice_detail_rows(cfg, month_str, tzinfo, kind=kind)
+
+    chunks = DataExportService(LaterMonthFails()).iter_invoice_detail_csv({}, ["2026-06", "2026-07"], None, kind="supply")
+    assert next(chunks).startswith("Datum;")
+    with pytest.raises(HTTPException):
+        list(chunks)
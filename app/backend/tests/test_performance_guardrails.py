@@ -1,8 +1,10 @@
 import time
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 from services.costs_service import CostsService
 from services.export_service import ExportService
+from services.schedule_service import ScheduleService
 
 
 def _build_points(count):
@@ -77,3 +79,38 @@ def test_export_service_large_payload_stays_fast():
 
     assert result["summary"]["export_kwh_total"] == 1250.0
     assert elapsed < 1.5
+
+
+def test_schedule_batch_uses_one_price_load_and_keeps_windows_apart():
+    tzinfo = ZoneInfo("Europe/Prague")
+    tomorrow = (datetime.now(tzinfo) + timedelta(days=1)).strftime("%Y-%m-%d")
+    base = datetime.strptime(tomorrow, "%Y-%m-%d")
+    entries = [
+        {"time": (base + timedelta(minutes=15 * idx)).strftime("%Y-%m-%d %H:%M"), "final": float((idx * 37) % 11)}
+        for idx in range(96)
+    ]
+    loads = []
+
+    def get_prices(cfg, date_str, tz):
+        loads.append(date_str)
+        return entries if date_str == tomorrow else []
+
+    service = ScheduleService(get_prices_for_date=get_prices)
+
+    start_ts = time.perf_counter()
+    result = service.get_schedules(durations=[30, 60, 120, 240, 360], count=3, cfg={}, tzinfo=tzinfo)
+    elapsed = time.perf_counter() - start_ts
+
+    assert len(loads) == 2
+    assert [item["duration"] for item in result["schedules"]] == [30, 60, 120, 240, 360]
+    for schedule in result["schedules"]:
+        starts = [datetime.strptime(item["start"], "%Y-%m-%d %H:%M") for item in schedule["recommendations"]]
+        assert len(starts) == 3
+        for idx, left in enumerate(starts):
+            for right in starts[idx + 1 :]:
+                assert abs((left - right).total_seconds()) >= schedule["duration"] * 60
+    two_hours = result["schedules"][2]["recommendations"][0]
+    window = [e["final"] for e in entries if two_hours["start"] <= e["time"] < two_hours["end"]]
+    assert two_hours["avg_price"] == round(sum(window) / len(window), 5)
+    assert service.get_schedule(duration=120, count=3, cfg={}, tzinfo=tzinfo) == result["schedules"][2]
+    assert elapsed < 0.5
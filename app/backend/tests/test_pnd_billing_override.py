@@ -37,11 +37,19 @@ class _FakePNDDay:
 class _FakePNDService:
     def __init__(self, day):
         self._day = day
+        self.get_data_calls = 0
 
     def has_day(self, date_str):
         return date_str == self._day.date_str
 
+    def get_day_stamp(self, date_str):
+        if not self.has_day(date_str):
+            return None
+        totals = self._day.payload["totals"]
+        return {"intervals": len(self._day.payload["intervals"]), "sha1": f"{totals['consumption_kwh']}:{totals['production_kwh']}"}
+
     def get_data(self, from_date, to_date):
+        self.get_data_calls += 1
         return self._day.get_data(from_date, to_date)
 
 
@@ -82,6 +90,28 @@ def test_get_export_points_uses_pnd_when_available():
     assert total == 7.594, total
 
 
+def test_pnd_points_are_converted_once_per_day_and_kind():
+    service = _FakePNDService(_FakePNDDay("2026-06-21", 8.0, 2.0))
+    cfg = {"influxdb": {"timezone": "Europe/Prague"}}
+    svc.PND_POINTS_CACHE.clear()
+    with _pnd_env(service):
+        first = svc.get_consumption_points(cfg=cfg, date="2026-06-21")
+        second = svc.get_consumption_points(cfg=cfg, date="2026-06-21")
+        svc.get_export_points(cfg=cfg, date="2026-06-21")
+        assert service.get_data_calls == 2
+        assert second["points"] == first["points"] and second is not first
+
+        svc._invalidate_series_cache_for_day("2026-06-21")
+        svc.get_consumption_points(cfg=cfg, date="2026-06-21")
+        assert service.get_data_calls == 2
+
+        # A re-synced day gets a new manifest sha1, so its key misses the cache.
+        service._day = _FakePNDDay("2026-06-21", 9.0, 2.0)
+        refreshed = svc.get_consumption_points(cfg=cfg, date="2026-06-21")
+        assert service.get_data_calls == 3
+        assert refreshed["points"] != first["points"]
+
+
 def test_get_consumption_points_falls_back_to_influx_without_pnd():
     called = {}
 
@@ -1,5 +1,9 @@
-from datetime import date, datetime
+import json
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 import httpx
 import pytest
@@ -173,6 +177,29 @@ def test_http_adapter_accepts_post_login_redirect_without_dashboard_marker(monke
     assert result["details"]["portal_version"] == "1.2.3"
 
 
+def test_http_adapter_reuses_logged_in_session_until_portal_rejects_it(monkeypatch):
+    dashboard = StubResponse(text="Naměřená data<div>Verze aplikace: 1.2.3</div>")
+    data = StubResponse(text='{"series":[]}', json_data=VALID_JSON_PAYLOAD)
+    login = [StubResponse(text='<input type="hidden" name="execution" value="token-123">'), StubResponse(text="Naměřená data")]
+    stub = StubHttpxClient(
+        login + [dashboard, data]
+        # Second job: the cached cookies still open the dashboard.
+        + [dashboard, data]
+        # Third job: the portal shows the login form again, so the client logs in once more.
+        + [StubResponse(text='<form id="loginForm"></form>')] + login + [dashboard, data]
+    )
+    monkeypatch.setattr(pnd_module.httpx, "Client", lambda **kwargs: stub)
+    cfg = {"enabled": True, "username": "user", "password": "pass", "meter_id": "3000012345"}
+
+    client = HttpSessionPNDPortalClient()
+    client.verify(cfg, date(2026, 4, 4))
+    client.fetch_range(cfg, date(2026, 4, 4), date(2026, 4, 4))
+    assert client.logins == 1
+    client.fetch_range(cfg, date(2026, 4, 4), date(2026, 4, 4))
+    assert client.logins == 2
+    assert stub.events == []
+
+
 def test_http_adapter_maps_timeout_to_pnd_service_error(monkeypatch):
     stub = StubHttpxClient(
         [
@@ -240,6 +267,137 @@ def test_pnd_service_verify_fetch_and_query_data(tmp_path):
     assert data["days"][0]["totals"]["consumption_kwh"] == 0.3
 
 
+def test_pnd_service_day_index_tracks_presence_and_gaps(tmp_path):
+    service = build_service(tmp_path)
+    cfg = {"enabled": True, "username": "u", "password": "p", "meter_id": "3000012345"}
+    service.fetch_day(cfg, datetime(2026, 4, 4).date(), reason="manual")
+
+    stamp = service.get_day_stamp("2026-04-04")
+    assert stamp["intervals"] == 2 and len(stamp["sha1"]) == 40
+    assert service.has_day("2026-04-04") and not service.has_day("2026-04-03")
+
+    # A fresh instance answers from the manifest; a lost manifest is rebuilt from the day files.
+    reopened = build_service(tmp_path)
+    assert reopened.has_day("2026-04-04")
+    service.day_index_path.unlink()
+    assert build_service(tmp_path).get_day_stamp("2026-04-04") == stamp
+
+    tz = ZoneInfo("Europe/Prague")
+    yesterday = datetime.now(tz).date() - timedelta(days=1)
+    service._write_normalized_days({
+        (yesterday - timedelta(days=offset)).isoformat(): {"intervals": [{"consumption_kwh": 0.1}]}
+        for offset in (0, 1, 3)
+    })
+    assert service.find_first_missing_date(max_lookback_days=4, tzinfo=tz) == yesterday - timedelta(days=2)
+    service._write_normalized_days({(yesterday - timedelta(days=2)).isoformat(): {"intervals": [{}]}})
+    assert service.find_first_missing_date(max_lookback_days=4, tzinfo=tz) is None
+
+    assert service.remove_day("2026-04-04") is True
+    assert not service.has_day("2026-04-04")
+    service.purge_cache()
+    assert not service.has_day(yesterday.isoformat())
+
+
+def test_pnd_service_folds_legacy_day_files_into_month_files(tmp_path):
+    normalized_dir = tmp_path / "pnd-cache" / "normalized"
+    normalized_dir.mkdir(parents=True)
+    for day in ("2026-03-31", "2026-04-01", "2026-04-02"):
+        payload = {"date": day, "intervals": [{"start": f"{day}T00:00:00+02:00", "consumption_kwh": 0.25}]}
+        (normalized_dir / f"{day}.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    service = build_service(tmp_path)
+    status = service.get_cache_status()
+
+    assert sorted(path.name for path in normalized_dir.iterdir()) == ["2026-03.json", "2026-04.json"]
+    assert status["days_count"] == 3 and status["cached_from"] == "2026-03-31" and status["cached_to"] == "2026-04-02"
+    assert status["size_bytes"] == sum(path.stat().st_size for path in normalized_dir.iterdir())
+    data = service.get_data("2026-04-01", "2026-04-30")
+    assert [day["date"] for day in data["days"]] == ["2026-04-01", "2026-04-02"]
+    assert data["days"][0]["intervals"] == [{"start": "2026-04-01T00:00:00+02:00", "consumption_kwh": 0.25}]
+
+
+def test_pnd_store_parses_each_month_once_until_it_changes(tmp_path, monkeypatch):
+    from services.pnd_store import PNDDayStore
+
+    store = PNDDayStore(tmp_path / "normalized", tmp_path / "days-index.json")
+    store.write_days({
+        f"2026-05-{day:02d}": {"date": f"2026-05-{day:02d}", "intervals": [{"consumption_kwh": day / 100}]}
+        for day in range(1, 32)
+    })
+    reads = []
+    real_read = store._read_month
+    monkeypatch.setattr(store, "_read_month", lambda month: (reads.append(month), real_read(month))[1])
+
+    for day in range(1, 32):
+        days = store.get_range(date(2026, 5, day), date(2026, 5, day))
+        assert days[0]["intervals"] == [{"consumption_kwh": day / 100}]
+    assert reads == []
+
+    # Returned payloads are copies; mutating one does not leak into the cached month.
+    days[0]["intervals"].clear()
+    days[0]["date"] = "changed"
+    assert store.get_range(date(2026, 5, 31), date(2026, 5, 31))[0]["date"] == "2026-05-31"
+
+    store.write_days({"2026-05-02": {"date": "2026-05-02", "intervals": [{"consumption_kwh": 9.0}]}})
+    assert store.get_range(date(2026, 5, 2), date(2026, 5, 2))[0]["intervals"] == [{"consumption_kwh": 9.0}]
+    assert store.remove_day("2026-05-03") is True
+    assert [day["date"] for day in store.get_range(date(2026, 5, 2), date(2026, 5, 4))] == ["2026-05-02", "2026-05-04"]
+    assert reads == []
+
+    reopened = PNDDayStore(tmp_path / "normalized", tmp_path / "days-index.json")
+    assert reopened.get_range(date(2026, 5, 2), date(2026, 5, 2))[0]["intervals"] == [{"consumption_kwh": 9.0}]
+
+
+class SessionClient:
+    """Portal client with one login per session; chunks older than two years have no data."""
+
+    def __init__(self):
+        self.logins = 0
+        self.fetched = []
+
+    @contextmanager
+    def open_session(self, pnd_cfg):
+        self.logins += 1
+        yield self
+
+    def fetch_range(self, start_date, end_date):
+        self.fetched.append((start_date, end_date))
+        if end_date < date.today() - timedelta(days=730):
+            raise PNDServiceError("PND_DATA_NOT_AVAILABLE", "no data", stage="normalize", status_code=409)
+        stamp = f"{end_date.strftime('%d.%m.%Y')} 00:15:00"
+        return PNDExportBundle(
+            portal_version="1.2.3",
+            json_data={"series": [{"name": "+A spotreba", "data": [[stamp, 0.1]]}, {"name": "-A vyroba", "data": [[stamp, 0.0]]}]},
+        )
+
+
+def test_pnd_backfill_job_reuses_one_session_and_reports_progress(tmp_path):
+    client = SessionClient()
+    service = build_service(tmp_path, client_factory=lambda: client)
+    cfg = {"enabled": True, "username": "u", "password": "p", "meter_id": "3000012345"}
+    saved_batches = []
+
+    job = service.start_backfill(cfg, "max", on_days_saved=saved_batches.append)
+    assert job["accepted"] is True and job["chunks_total"] == 10
+
+    deadline = time.monotonic() + 10
+    while service.get_backfill_job(job["job_id"])["state"] == "running" and time.monotonic() < deadline:
+        time.sleep(0.01)
+    finished = service.get_backfill_job(job["job_id"])
+
+    assert finished["state"] == "done" and finished["eta_seconds"] == 0
+    assert client.logins == 1
+    # Chunks go out newest first; the walk stops once a chunk has nothing older.
+    assert client.fetched[0][1] == date.today() - timedelta(days=1)
+    assert len(client.fetched) < 10
+    assert finished["saved_days"] == 2 == sum(len(batch) for batch in saved_batches)
+    assert service.get_status(pnd_cfg=cfg)["last_job"]["job_id"] == job["job_id"]
+
+    with pytest.raises(PNDServiceError) as exc:
+        service.get_backfill_job("missing")
+    assert exc.value.status_code == 404
+
+
 def test_pnd_service_fails_on_empty_payload(tmp_path):
     service = build_service(tmp_path, client_factory=lambda: BundleClient(json_payload={"series": []}))
     cfg = {"enabled": True, "username": "u", "password": "p", "meter_id": "3000012345"}
@@ -150,9 +150,21 @@ def test_dashboard_snapshot_keeps_legacy_and_new_contract_keys(monkeypatch, back
     tzinfo = ZoneInfo("Europe/Prague")
 
     monkeypatch.setattr(backend_main, "get_prices", lambda date=None, cfg=None, tzinfo=None: {"prices": [{"date": date, "final": 1.0}]})
+    async def fake_costs_async(*args, **kwargs):
+        return {"points": [], "summary": {"cost_total": 1}}
+
+    async def fake_battery_async(*args, **kwargs):
+        return {"enabled": False}
+
     monkeypatch.setattr(backend_main, "get_costs", lambda *args, **kwargs: {"points": [], "summary": {"cost_total": 1}})
+    monkeypatch.setattr(backend_main, "get_costs_async", fake_costs_async)
+    async def fake_export_async(*args, **kwargs):
+        return {"points": [], "summary": {"sell_total": 0}}
+
     monkeypatch.setattr(backend_main, "get_export", lambda *args, **kwargs: {"points": [], "summary": {"sell_total": 0}})
+    monkeypatch.setattr(backend_main, "get_export_async", fake_export_async)
     monkeypatch.setattr(backend_main, "get_battery", lambda *args, **kwargs: {"enabled": False})
+    monkeypatch.setattr(backend_main, "get_battery_async", fake_battery_async)
     monkeypatch.setattr(backend_main, "get_alerts", lambda *args, **kwargs: [])
     monkeypatch.setattr(backend_main, "get_comparison", lambda *args, **kwargs: {"ok": True})
     monkeypatch.setattr(backend_main, "get_solar_forecast", lambda *args, **kwargs: None)
@@ -167,3 +179,113 @@ def test_dashboard_snapshot_keeps_legacy_and_new_contract_keys(monkeypatch, back
     assert "tomorrow_prices" in snapshot
     assert snapshot["recommendations"] == {"actions": [], "metrics": []}
     assert snapshot["diagnostics_summary"] == {"cache": {}, "runtime": {}}
+
+
+def test_dashboard_snapshot_computes_shared_inputs_once(monkeypatch, backend_main):
+    tzinfo = ZoneInfo("Europe/Prague")
+    calls = {"prices": [], "costs": 0, "battery": 0}
+
+    class CountingPrices:
+        def get_prices(self, cfg, date, tzinfo, force_refresh=False, include_neighbor_live=False):
+            calls["prices"].append(date)
+            return [{"date": date, "final": 1.0}]
+
+    class CountingCosts:
+        def get_costs(self, **kwargs):
+            calls["costs"] += 1
+            return {"points": [], "summary": {"cost_total": 1}}
+
+    class CountingBattery:
+        def get_battery(self, **kwargs):
+            calls["battery"] += 1
+            return {"enabled": False}
+
+        async def get_battery_async(self, **kwargs):
+            return self.get_battery(**kwargs)
+
+    async def fake_consumption_async(cfg, date=None, start=None, end=None):
+        return {"points": [], "has_series": True}
+
+    monkeypatch.setattr(backend_main, "PRICES_SERVICE", CountingPrices())
+    monkeypatch.setattr(backend_main, "COSTS_SERVICE", CountingCosts())
+    monkeypatch.setattr(backend_main, "BATTERY_SERVICE", CountingBattery())
+    async def fake_export_async(*args, **kwargs):
+        return {"points": [], "summary": {"sell_total": 0}}
+
+    monkeypatch.setattr(backend_main, "get_consumption_points_async", fake_consumption_async)
+    monkeypatch.setattr(backend_main, "get_export_async", fake_export_async)
+    monkeypatch.setattr(backend_main, "get_alerts", lambda *args, **kwargs: [])
+    monkeypatch.setattr(backend_main, "get_comparison", lambda *args, **kwargs: {"ok": True})
+    monkeypatch.setattr(backend_main, "get_solar_forecast", lambda *args, **kwargs: None)
+    monkeypatch.setattr(backend_main, "get_schedule", lambda *args, **kwargs: {"windows": []})
+    monkeypatch.setattr(backend_main, "get_diagnostics", lambda *args, **kwargs: {"cache": {}, "runtime": {}})
+    monkeypatch.setattr(backend_main, "get_solar_overview", lambda *args, **kwargs: {"enabled": False})
+
+    snapshot = asyncio.run(backend_main.get_dashboard_snapshot(date="2026-04-23", cfg={}, tzinfo=tzinfo))
+
+    assert calls["prices"].count("2026-04-23") == 1
+    # get_recommendations (a worker thread) reuses costs/battery only if the coroutine already finished;
+    # otherwise it computes them itself rather than blocking a pool thread on the event loop.
+    assert 1 <= calls["costs"] <= 2
+    assert 1 <= calls["battery"] <= 2
+    assert snapshot["costs"] == {"points": [], "summary": {"cost_total": 1}}
+    assert backend_main.ACTIVE_REQUEST_MEMO.get() is None
+
+
+def test_request_memo_threads_do_not_wait_on_pending_coroutine_keys():
+    import threading
+
+    from services.request_memo import RequestMemo
+
+    memo = RequestMemo()
+    release = threading.Event()
+    thread_results = []
+
+    async def scenario():
+        async def slow():
+            await asyncio.to_thread(release.wait, 5)
+            return "async"
+
+        owner = asyncio.ensure_future(memo.call_async("costs", slow))
+        await asyncio.sleep(0)
+        # A pool thread asking for the pending key computes it instead of blocking.
+        thread_results.append(await asyncio.to_thread(memo.call, "costs", lambda: "thread"))
+        release.set()
+        first = await owner
+        # Once resolved, threads and coroutines share the coroutine's result.
+        thread_results.append(await asyncio.to_thread(memo.call, "costs", lambda: "recomputed"))
+        return first, await memo.call_async("costs", slow)
+
+    first, second = asyncio.run(scenario())
+    assert first == second == "async"
+    assert thread_results == ["thread", "async"]
+
+
+def test_async_influx_service_drops_clients_of_closed_loops(monkeypatch):
+    import logging
+
+    import httpx
+
+    import services.influx_service as influx_module
+
+    handler = lambda request: httpx.Response(200, json={"results": [{"statement_id": 0}]})
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        return real_client(**kwargs)
+
+    monkeypatch.setattr(influx_module.httpx, "AsyncClient", client_factory)
+    service = influx_module.AsyncInfluxService(influx_module.InfluxService(logging.getLogger("test")))
+    influx = {"host": "localhost", "database": "ha"}
+
+    for _ in range(3):
+        asyncio.run(service.influx_query(influx, "SELECT 1"))
+    assert len(service._clients) == 1
+
+    async def last_run():
+        await service.influx_query(influx, "SELECT 1")
+        await service.aclose()
+        return len(service._clients)
+
+    assert asyncio.run(last_run()) == 0
@@ -5,7 +5,7 @@ from fastapi import HTTPException
 from services.energy_balance_service import aggregate_power_points
 from services.energy_balance_service import build_energy_balance_range
 from services.insights_service import InsightsService
-from services.price_fetcher import build_price_map_for_date
+from services.price_fetcher import build_price_map_for_date, build_price_vector_for_date
 
 
 def test_build_price_map_for_date_supports_keyword_only_getters():
@@ -39,6 +39,35 @@ def test_build_price_map_for_date_supports_legacy_positional_getters():
     assert price_map["2026-04-05 13:30"]["final"] == 1.8
 
 
+
+def test_price_vector_has_dst_slot_counts_and_joins_points_by_epoch():
+    tzinfo = ZoneInfo("Europe/Prague")
+    # Fall-back day: 02:00-02:45 occurs twice and the day has 100 quarter-hour slots.
+    entries = []
+    for idx in range(100):
+        hour = idx // 4 if idx < 12 else (idx - 4) // 4
+        minute = (idx % 4) * 15
+        entries.append({"time": f"2026-10-25 {hour:02d}:{minute:02d}", "spot": float(idx), "final": float(idx) + 0.5})
+
+    vector = build_price_vector_for_date({}, "2026-10-25", tzinfo, lambda cfg, date, tz: entries)
+
+    assert vector.slot_count == 100
+    first = vector.price_for_point({"time": "2026-10-25T02:00:00+02:00", "time_utc": "2026-10-25T00:00:00Z"})
+    repeated = vector.price_for_point({"time": "2026-10-25T02:00:00+01:00", "time_utc": "2026-10-25T01:00:00Z"})
+    assert (first["spot"], repeated["spot"]) == (8.0, 12.0)
+    assert vector.price_for_point({"time": "2026-10-25T23:45:00+01:00", "time_utc": "bad"})["spot"] == 99.0
+    assert vector.price_for_point({"time": "2026-10-26T00:00:00+01:00", "time_utc": "2026-10-25T23:00:00Z"}) is None
+
+    spring = build_price_vector_for_date({}, "2026-03-29", tzinfo, lambda cfg, date, tz: [])
+    assert spring.slot_count == 92
+
+    normal_entries = [{"time": "2026-04-05 13:30", "spot": 0.95, "final": 1.8}]
+    normal = build_price_vector_for_date({}, "2026-04-05", tzinfo, lambda cfg, date, tz: normal_entries)
+    price_map, _ = build_price_map_for_date({}, "2026-04-05", tzinfo, lambda cfg, date, tz: normal_entries)
+    point = {"time": "2026-04-05T13:30:00+02:00", "time_utc": "2026-04-05T11:30:00Z"}
+    assert normal.price_for_point(point) == price_map["2026-04-05 13:30"]
+
+
 def test_aggregate_power_points_groups_daily_kwh_from_watts():
     tzinfo = ZoneInfo("Europe/Prague")
     points = [
@@ -74,3 +74,291 @@ def test_export_service_uses_utc_fallback_without_local_iso_parsing():
     assert data["points"][0]["spot_price"] == 2.5
     assert data["points"][0]["sell_price"] == 2.0
     assert data["points"][0]["sell"] == 4.0
+
+
+def test_influx_series_probes_candidates_in_one_request_and_memoises_winner():
+    import logging
+    from datetime import datetime, timezone
+
+    from services.influx_service import InfluxService
+
+    service = InfluxService(logging.getLogger("test"))
+    queries = []
+
+    def fake_query(influx, query):
+        queries.append(query)
+        statements = query.split(";")
+        results = []
+        for index, statement in enumerate(statements):
+            result = {"statement_id": index}
+            if '"kW"' in statement and "'sensor.pv'" in statement:
+                result["series"] = [{"values": [[1767225600, 2.5]]}]
+            results.append(result)
+        return {"results": results}
+
+    service.influx_query = fake_query
+    influx = {"host": "localhost", "database": "ha", "field": "value", "measurement": "kWh"}
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+    points = service.query_entity_series(influx, "pv", start, end, measurement_candidates=["W", "kW"])
+    assert [point["value"] for point in points] == [2.5]
+    assert points[0]["unit"] == "kW"
+    assert len(queries) == 1
+    assert len(queries[0].split(";")) == 6
+
+    points = service.query_entity_series(influx, "pv", start, end, measurement_candidates=["W", "kW"])
+    assert points[0]["unit"] == "kW"
+    assert len(queries) == 2
+    assert ";" not in queries[1]
+
+
+def test_influx_multi_statement_probe_posts_form_and_skips_errored_statements():
+    import logging
+    from datetime import datetime, timezone
+
+    import pytest
+    from fastapi import HTTPException
+
+    from services.influx_service import InfluxService
+
+    service = InfluxService(logging.getLogger("test"))
+    requests_seen = []
+
+    class FakeResponse:
+        def __init__(self, payload):
+            self.payload = payload
+
+        def raise_for_status(self):
+            return None
+
+        def json(self):
+            return self.payload
+
+    def respond(query):
+        results = []
+        for index, statement in enumerate(query.split(";")):
+            if '"W"' in statement:
+                results.append({"statement_id": index, "error": "measurement not found"})
+            elif '"kW"' in statement and "'sensor.pv'" in statement:
+                results.append({"statement_id": index, "series": [{"values": [[1767225600, 2.5]]}]})
+            else:
+                results.append({"statement_id": index})
+        return FakeResponse({"results": results})
+
+    def fake_get(url, params=None, auth=None, timeout=None):
+        requests_seen.append(("GET", params))
+        return respond(params["q"])
+
+    def fake_post(url, params=None, data=None, auth=None, timeout=None):
+        requests_seen.append(("POST", params))
+        return respond(data["q"])
+
+    service.session.get = fake_get
+    service.session.post = fake_post
+    influx = {"host": "localhost", "database": "ha", "field": "value", "measurement": "kWh"}
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2026, 1, 2, tzinfo=timezone.utc)
+
+    # Statement 0 ("W") errors; the probe skips it instead of failing the whole request.
+    points = service.query_entity_series(influx, "pv", start, end, measurement_candidates=["W", "kW"])
+    assert [point["value"] for point in points] == [2.5]
+    assert requests_seen[0][0] == "POST"
+    assert "q" not in requests_seen[0][1]
+
+    service.query_entity_series(influx, "pv", start, end, measurement_candidates=["W", "kW"])
+    assert requests_seen[1][0] == "GET"
+
+    with pytest.raises(HTTPException):
+        service.influx_query(influx, 'SELECT last("value") FROM "W"; SELECT last("value") FROM "W"')
+
+
+def test_influx_query_last_values_batches_entities_into_one_request():
+    import logging
+
+    from services.influx_service import InfluxService
+
+    service = InfluxService(logging.getLogger("test"))
+    queries = []
+
+    def fake_query(influx, query):
+        queries.append(query)
+        results = []
+        for index, statement in enumerate(query.split(";")):
+            result = {"statement_id": index}
+            if '"W"' in statement and "'sensor.load'" in statement:
+                result["series"] = [{"values": [[1767225600, 450]]}]
+            if '"state"' in statement and "'sensor.peak'" in statement:
+                result["series"] = [{"values": [[1767225600, "2026-01-01T12:15:00+00:00"]]}]
+            results.append(result)
+        return {"results": results}
+
+    service.influx_query = fake_query
+    influx = {"host": "localhost", "database": "ha", "field": "value", "measurement": "kWh"}
+    entities = {
+        "house_load": {"entity_id": "sensor.load", "measurement_candidates": ["W", "kW"], "numeric": True},
+        "peak": {"entity_id": "sensor.peak", "measurement_candidates": ["state"], "numeric": False},
+        "missing": {"entity_id": "sensor.none", "measurement_candidates": ["W"], "numeric": True},
+    }
+
+    latest = service.query_last_values(influx, entities)
+    assert latest["house_load"]["value"] == 450.0
+    assert latest["house_load"]["unit"] == "W"
+    assert latest["peak"]["raw_value"] == "2026-01-01T12:15:00+00:00"
+    assert latest["missing"] is None
+    assert len(queries) == 1
+
+    service.query_last_values(influx, entities)
+    assert len(queries) == 2
+    # Resolved entities reuse their memoised pair; only the unresolved one is fully probed.
+    assert len(queries[1].split(";")) == 2 + 4
+
+
+def test_safe_query_last_values_isolates_failed_statements_and_falls_back_per_entity():
+    import logging
+
+    from fastapi import HTTPException
+
+    from services.influx_service import InfluxService, check_influx_response
+
+    service = InfluxService(logging.getLogger("test"))
+    queries = []
+    state = {"batch_fails": False}
+
+    def fake_query(influx, query):
+        queries.append(query)
+        if state["batch_fails"] and "'sensor.load'" in query and "'sensor.broken'" in query:
+            raise HTTPException(status_code=500, detail="request too large")
+        results = []
+        for index, statement in enumerate(query.split(";")):
+            result = {"statement_id": index}
+            if "'sensor.broken'" in statement:
+                result["error"] = "type conflict"
+            elif '"W"' in statement and "'sensor.load'" in statement:
+                result["series"] = [{"values": [[1767225600, 450]]}]
+            results.append(result)
+        return check_influx_response({"results": results})
+
+    service.influx_query = fake_query
+    influx = {"host": "localhost", "database": "ha", "field": "value", "measurement": "kWh"}
+    entities = {
+        "house_load": {"entity_id": "sensor.load", "measurement_candidates": ["W"], "numeric": True},
+        "broken": {"entity_id": "sensor.broken", "measurement_candidates": ["W"], "numeric": True},
+    }
+
+    latest = service.safe_query_last_values(influx, entities)
+    assert latest["house_load"]["value"] == 450.0
+    assert latest["broken"] is None
+    assert len(queries) == 1
+
+    service._resolutions.clear()
+    state["batch_fails"] = True
+    queries.clear()
+    latest = service.safe_query_last_values(influx, entities)
+    assert latest["house_load"]["value"] == 450.0
+    assert latest["broken"] is None
+    # One failed batch, then one request per entity.
+    assert len(queries) == 3
+
+
+def test_async_influx_service_shares_probing_and_pools_one_client(monkeypatch):
+    import asyncio
+    import logging
+
+    import httpx
+    import requests
+
+    import services.influx_service as influx_module
+
+    created = []
+    queries = []
+
+    def handler(request):
+        from urllib.parse import parse_qs
+
+        query = request.url.params.get("q") or parse_qs(request.content.decode())["q"][0]
+        queries.append(query)
+        if "'sensor.broken'" in query:
+            return httpx.Response(503)
+        results = []
+        for index, statement in enumerate(query.split(";")):
+            result = {"statement_id": index}
+            if '"W"' in statement and "'sensor.load'" in statement:
+                result["series"] = [{"values": [[1767225600, 450]]}]
+            results.append(result)
+        return httpx.Response(200, json={"results": results})
+
+    real_client = httpx.AsyncClient
+
+    def client_factory(**kwargs):
+        kwargs["transport"] = httpx.MockTransport(handler)
+        client = real_client(**kwargs)
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(influx_module.httpx, "AsyncClient", client_factory)
+    sync_service = influx_module.InfluxService(logging.getLogger("test"))
+    service = influx_module.AsyncInfluxService(sync_service, max_concurrency=2)
+    influx = {"host": "localhost", "database": "ha", "field": "value", "measurement": "kWh"}
+    entities = {"house_load": {"entity_id": "sensor.load", "measurement_candidates": ["W", "kW"], "numeric": True}}
+
+    async def scenario():
+        first, second = await asyncio.gather(
+            service.query_last_values(influx, entities),
+            service.query_last_values(influx, entities),
+        )
+        failed = await service.safe_query_last_values(
+            influx, {"broken": {"entity_id": "sensor.broken", "measurement_candidates": ["W"]}}
+        )
+        try:
+            await service.influx_query(influx, "SELECT 1 FROM x WHERE \"entity_id\"='sensor.broken'")
+        except requests.RequestException:
+            raised = True
+        else:
+            raised = False
+        await service.aclose()
+        return first, second, failed, raised
+
+    first, second, failed, raised = asyncio.run(scenario())
+    assert first["house_load"]["value"] == 450.0
+    assert second == first
+    assert failed == {"broken": None}
+    assert raised
+    assert len(created) == 1 and created[0].is_closed
+    # The async client resolves through the sync service's memo.
+    key = sync_service._resolution_key(influx, "sensor.load", ["W", "kW", "kWh"])
+    assert sync_service._get_resolution(key) == ("W", "sensor.load")
+    # The failed "broken" batch is retried once per entity before giving up.
+    assert len(queries) == 5
+
+
+def test_run_query_steps_async_offloads_steps_to_worker_threads():
+    import asyncio
+    import threading
+
+    from services.influx_service import run_query_steps_async
+
+    step_threads = []
+
+    def steps():
+        step_threads.append(threading.current_thread())
+        try:
+            yield "bad"
+        except ValueError:
+            step_threads.append(threading.current_thread())
+        data = yield "good"
+        step_threads.append(threading.current_thread())
+        return data["value"]
+
+    async def query(q):
+        if q == "bad":
+            raise ValueError(q)
+        return {"value": 42}
+
+    async def scenario():
+        return await run_query_steps_async(steps(), query, offload=True), threading.current_thread()
+
+    result, loop_thread = asyncio.run(scenario())
+    assert result == 42
+    assert len(step_threads) == 3
+    assert loop_thread not in step_threads
@@ -51,6 +51,7 @@ export const elektroappApi = {
   getPndCacheStatus: () => get("/pnd/cache-status"),
   verifyPnd: () => post("/pnd/verify"),
   backfillPnd: (range: string) => post("/pnd/backfill", { range }),
+  getPndBackfillJob: (jobId: string) => get(`/pnd/backfill/${jobId}`),
   getPndData: (from: string, to: string) => get("/pnd/data", { from, to }),
   purgePndCache: () => post("/pnd/purge-cache"),
   getHpData: (period = "day", anchor?: string) => get("/hp/data", anchor ? { period, anchor } : { period }),
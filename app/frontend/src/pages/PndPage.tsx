@@ -3,6 +3,8 @@ import DataCard from "../components/common/DataCard";
 import { elektroappApi, formatApiError } from "../api/elektroappApi";
 import { Config, PndStatus } from "../types/elektroapp";
 
+const BACKFILL_POLL_MS = 1500;
+
 interface PndPageProps {
   config: Config | null;
   refreshConfig: () => Promise<any>;
@@ -242,9 +244,22 @@ const PndPage: React.FC<PndPageProps> = ({ config, refreshConfig }) => {
     setActionMessage(null);
     setActionError(null);
     try {
-      const response = await elektroappApi.backfillPnd(range);
+      let job = await elektroappApi.backfillPnd(range);
+      // Backfill runs as a background job; poll its progress until it finishes.
+      while (job?.job_id && job.state === "running") {
+        const eta = job.eta_seconds != null ? `, zbyva cca ${Math.ceil(job.eta_seconds)} s` : "";
+        setActionMessage(
+          `Backfill '${job.range ?? range}' bezi: ${job.chunks_done ?? 0}/${job.chunks_total ?? 0} casti, ulozeno ${job.saved_days ?? 0} dni${eta}.`
+        );
+        await new Promise((resolve) => setTimeout(resolve, BACKFILL_POLL_MS));
+        job = await elektroappApi.getPndBackfillJob(job.job_id);
+      }
       await loadStatus();
-      setActionMessage(`Backfill '${range}' dokoncen, ulozeno cca ${response?.estimated_days ?? 0} dni.`);
+      if (job?.state === "failed") {
+        setActionError(job.error?.message || "Backfill PND selhal.");
+      } else {
+        setActionMessage(`Backfill '${range}' dokoncen, ulozeno cca ${job?.estimated_days ?? 0} dni.`);
+      }
     } catch (err) {
       setActionError(formatApiError(err, "Backfill PND selhal."));
     } finally {